@@ -11,7 +11,8 @@ load_dotenv(dotenv_path)
 app = FastAPI()
 
 # === Diretório onde os .parquet estão armazenados ===
-base_path = Path(__file__).resolve().parent.parent / "dados"
+# (DADOS_PATH permite servir outra pasta, como a dos dados sintéticos do benchmark)
+base_path = Path(os.getenv("DADOS_PATH") or Path(__file__).resolve().parent.parent / "dados")
 base_path.mkdir(parents=True, exist_ok=True)  # <- isso garante que a pasta exista
 API_TOKEN = os.getenv("API_TOKEN")
 
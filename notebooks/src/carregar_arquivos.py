@@ -0,0 +1,228 @@
+# carregar_arquivos.py
+#
+# Leitura das exportações brutas (CSV do Elementor/planilhas, Excel de alunos e UTMs).
+# O separador e a codificação do CSV são detectados numa amostra do início do arquivo e a
+# leitura é feita uma única vez pelo leitor CSV multithread do Arrow. Com pasta_cache, o
+# resultado fica salvo em parquet com o hash do arquivo de origem no nome: rodar o
+# notebook de novo com a mesma exportação só lê o parquet.
+
+import csv
+import glob
+import hashlib
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+
+
+FORMATO_CACHE = 1
+SEPARADORES = [",", ";", "\t", "|"]
+CODIFICACOES = ["utf-8", "cp1252"]
+TAMANHO_AMOSTRA = 64 * 1024
+TAMANHO_BLOCO = 1 << 22  # 4 MB por bloco do leitor Arrow
+
+
+# === Detecção de formato ===
+
+def _decodificar_amostra(amostra):
+    """Primeira codificação que decodifica a amostra (o último caractere pode estar cortado)."""
+    for codificacao in CODIFICACOES:
+        try:
+            return amostra.decode(codificacao), codificacao
+        except UnicodeDecodeError as e:
+            if codificacao == "utf-8" and e.start >= len(amostra) - 3:
+                return amostra[:e.start].decode(codificacao), codificacao
+    return amostra.decode("latin-1"), "latin-1"
+
+def _separador_por_contagem(linhas):
+    """Separador presente em todas as linhas da amostra com a mesma contagem (o mais frequente)."""
+    melhor, maior = SEPARADORES[0], 0
+    for sep in SEPARADORES:
+        contagens = [len(next(csv.reader([linha], delimiter=sep))) - 1 for linha in linhas if linha.strip()]
+        if contagens and min(contagens) > 0 and len(set(contagens)) == 1 and contagens[0] > maior:
+            melhor, maior = sep, contagens[0]
+    return melhor
+
+def detectar_formato_csv(caminho, tamanho_amostra=TAMANHO_AMOSTRA):
+    """Separador e codificação do CSV a partir dos primeiros tamanho_amostra bytes."""
+    with open(caminho, "rb") as f:
+        amostra = f.read(tamanho_amostra)
+    texto, codificacao = _decodificar_amostra(amostra.removeprefix(b"\xef\xbb\xbf"))
+
+    # Só linhas completas entram na detecção
+    linhas = texto.splitlines()
+    if len(amostra) == tamanho_amostra and len(linhas) > 1:
+        linhas = linhas[:-1]
+    try:
+        separador = csv.Sniffer().sniff("\n".join(linhas[:50]), delimiters="".join(SEPARADORES)).delimiter
+    except csv.Error:
+        separador = _separador_por_contagem(linhas[:50])
+    return {"separador": separador, "codificacao": codificacao}
+
+
+# === Cache em parquet ===
+
+def hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+def _hash_curto(*partes, n=16):
+    return hashlib.sha256(repr(partes).encode("utf-8")).hexdigest()[:n]
+
+def _caminho_cache(pasta_cache, caminho, *opcoes):
+    """<nome>__<origem>__<conteúdo>.parquet: origem = caminho + opções, conteúdo = hash do arquivo."""
+    origem = _hash_curto(str(Path(caminho).resolve()), opcoes, n=8)
+    conteudo = _hash_curto(FORMATO_CACHE, hash_arquivo(caminho), opcoes)
+    return Path(pasta_cache) / f"{Path(caminho).stem}__{origem}__{conteudo}.parquet"
+
+def _nulos_como_nan(df):
+    """Arrow devolve None nas colunas de texto; o pd.read_csv usa NaN."""
+    for coluna in df.columns[df.dtypes == object]:
+        df[coluna] = df[coluna].where(df[coluna].notna(), np.nan)
+    return df
+
+def _datas_em_ns(df):
+    """Datas sempre em ns: o Arrow devolve datetime64[s] ao ler o CSV e o parquet volta em [ms]."""
+    for coluna in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[coluna]) and df[coluna].dt.unit != "ns":
+            try:
+                df[coluna] = df[coluna].dt.as_unit("ns")
+            except pd.errors.OutOfBoundsDatetime:
+                pass  # datas fora do intervalo de ns ficam na unidade original
+    return df
+
+def _ler_cache(arquivo_cache):
+    if arquivo_cache is None or not arquivo_cache.exists():
+        return None
+    print(f"📦 Cache: {arquivo_cache.name}")
+    return _datas_em_ns(_nulos_como_nan(pd.read_parquet(arquivo_cache)))
+
+def _texto_nas_colunas_mistas(df):
+    """Colunas com números e texto misturados (comum nas planilhas) viram texto: o parquet exige um tipo por coluna."""
+    for coluna in df.columns[df.dtypes == object]:
+        tipo = pd.api.types.infer_dtype(df[coluna], skipna=True)
+        if tipo.startswith("mixed") and tipo != "mixed-integer-float":
+            df[coluna] = df[coluna].map(lambda v: v if pd.isna(v) else str(v))
+    return df
+
+def _gravar_cache(arquivo_cache, df):
+    """Grava o parquet e apaga os caches antigos do mesmo arquivo (mesmo caminho e opções)."""
+    if arquivo_cache is None:
+        return
+    arquivo_cache.parent.mkdir(parents=True, exist_ok=True)
+    temporario = arquivo_cache.with_suffix(".tmp")
+    try:
+        df.to_parquet(temporario, index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError) as e:
+        temporario.unlink(missing_ok=True)
+        print(f"⚠️ Sem cache para {arquivo_cache.name}: {e}")
+        return
+    prefixo = arquivo_cache.name.rsplit("__", 1)[0]
+    for antigo in arquivo_cache.parent.glob(f"{glob.escape(prefixo)}__*.parquet"):
+        antigo.unlink()
+    temporario.replace(arquivo_cache)
+
+
+# === CSV ===
+
+def _nomes_unicos(nomes):
+    """Colunas repetidas viram nome, nome.1, nome.2... (como no pd.read_csv)."""
+    vistos, unicos = {}, []
+    for nome in nomes:
+        if nome in vistos:
+            vistos[nome] += 1
+            nome = f"{nome}.{vistos[nome]}"
+        vistos.setdefault(nome, 0)
+        unicos.append(nome)
+    return unicos
+
+def _opcoes_arrow(formato, tamanho_bloco=TAMANHO_BLOCO):
+    leitura = pv.ReadOptions(encoding=formato["codificacao"], block_size=tamanho_bloco, use_threads=True)
+    parse = pv.ParseOptions(delimiter=formato["separador"], newlines_in_values=True)
+    conversao = pv.ConvertOptions(strings_can_be_null=True)
+    return {"read_options": leitura, "parse_options": parse, "convert_options": conversao}
+
+def _para_pandas(tabela):
+    df = tabela.to_pandas()
+    df.columns = _nomes_unicos(df.columns)
+    return _datas_em_ns(_nulos_como_nan(df))
+
+def ler_csv(caminho, pasta_cache=None, formato=None):
+    """
+    CSV inteiro em um DataFrame com tipos inferidos pelo Arrow (números, booleanos e
+    datas ISO; o resto fica texto). formato ({"separador", "codificacao"}) é detectado
+    se não for informado.
+    """
+    formato = formato or detectar_formato_csv(caminho)
+    arquivo_cache = _caminho_cache(pasta_cache, caminho, formato) if pasta_cache is not None else None
+    df = _ler_cache(arquivo_cache)
+    if df is None:
+        df = _para_pandas(pv.read_csv(caminho, **_opcoes_arrow(formato)))
+        _gravar_cache(arquivo_cache, df)
+    return df
+
+def iterar_csv(caminho, tamanho_bloco=TAMANHO_BLOCO, formato=None):
+    """
+    DataFrames de ~tamanho_bloco bytes cada, lidos em streaming (memória limitada ao bloco).
+    Os tipos são inferidos no primeiro bloco e valem para os demais.
+    """
+    formato = formato or detectar_formato_csv(caminho)
+    with pv.open_csv(caminho, **_opcoes_arrow(formato, tamanho_bloco)) as leitor:
+        for lote in leitor:
+            yield _para_pandas(pa.Table.from_batches([lote]))
+
+def carregar_csv(caminho_arquivo, pasta_cache=None):
+    """ler_csv com as mensagens dos notebooks: None se o arquivo não existir ou não puder ser lido."""
+    caminho = Path(caminho_arquivo)
+    if not caminho.exists():
+        print(f"[ERRO] Arquivo CSV não encontrado: {caminho.resolve()}")
+        return None
+    try:
+        formato = detectar_formato_csv(caminho)
+        df = ler_csv(caminho, pasta_cache, formato)
+    except (pa.ArrowInvalid, UnicodeDecodeError, OSError) as e:
+        print(f"[ERRO] Falha ao carregar CSV '{caminho.name}': {e}")
+        return None
+    print(f"[OK] CSV carregado com separador '{formato['separador']}' ({formato['codificacao']}): {caminho.name}")
+    return df
+
+
+# === Excel ===
+
+def _motor_excel():
+    """calamine (Rust) quando instalado; senão openpyxl."""
+    return "calamine" if importlib.util.find_spec("python_calamine") else "openpyxl"
+
+def ler_excel(caminho, aba=0, pasta_cache=None):
+    """
+    Uma aba (nome ou posição) do arquivo Excel. Com pasta_cache, colunas de tipos mistos
+    voltam como texto já na primeira leitura, para o resultado não mudar quando vier do cache.
+    """
+    arquivo_cache = _caminho_cache(pasta_cache, caminho, aba) if pasta_cache is not None else None
+    df = _ler_cache(arquivo_cache)
+    if df is None:
+        df = pd.read_excel(caminho, sheet_name=aba, engine=_motor_excel())
+        if arquivo_cache is not None:
+            df = _texto_nas_colunas_mistas(df)
+        _gravar_cache(arquivo_cache, df)
+    return df
+
+def carregar_excel(caminho_arquivo, aba=0, pasta_cache=None):
+    """ler_excel com as mensagens dos notebooks: None se o arquivo ou a aba não puderem ser lidos."""
+    caminho = Path(caminho_arquivo)
+    if not caminho.exists():
+        print(f"[ERRO] Arquivo não encontrado: {caminho}")
+        return None
+    try:
+        df = ler_excel(caminho, aba, pasta_cache)
+    except Exception as e:
+        print(f"[ERRO] Falha ao carregar '{caminho.name}': {e}")
+        return None
+    print(f"[OK] Carregado: {caminho.name} (aba {aba!r})")
+    return df
@@ -1,81 +1,584 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 from tqdm import tqdm
+import numpy as np
 import pandas as pd
 import torch
-import pickle
+import torch.nn.functional as F
 from flashtext import KeywordProcessor
-from sentence_transformers import SentenceTransformer, util
-from src.categorizar_texto import termo_em_texto, normalizar_texto, expandir_mapeamento
+from src.categorizar_texto import normalizar_serie, expandir_mapeamento
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+LIMITE_PARALELO = 20_000  # textos distintos a partir dos quais a busca direta usa processos
+TAMANHO_LOTE_BUSCA = 2_000
+
+FORMATO_ARTEFATO = 1
+SUFIXO_INT8 = "@int8"
+
+# === Modelo carregado sob demanda ===
+
+@lru_cache(maxsize=None)
+def carregar_modelo(nome: str) -> "SentenceTransformer":
+    """
+    Nome terminado em @int8 (ex.: "paraphrase-multilingual-MiniLM-L12-v2@int8") liga o modo
+    CPU opcional: camadas Linear com quantização dinâmica int8. Confira a perda de
+    qualidade com relatorio_quantizacao antes de usar.
+    """
+    from sentence_transformers import SentenceTransformer
+    if not nome.endswith(SUFIXO_INT8):
+        modelo = SentenceTransformer(nome)
+    else:
+        modelo = SentenceTransformer(nome.removesuffix(SUFIXO_INT8), device="cpu")
+        modelo = torch.ao.quantization.quantize_dynamic(modelo, {torch.nn.Linear}, dtype=torch.qint8)
+    # Mesmo nome do texto que o carregou: cache, artefatos e embeddings (e os do int8, separados) batem
+    modelo.nome_carregado = _nome_canonico(nome)
+    return modelo
+
+def configurar_threads_cpu(n_threads: int = None) -> int:
+    """Threads intra-op do torch na CPU (padrão: todos os núcleos). Retorna o valor anterior."""
+    anterior = torch.get_num_threads()
+    torch.set_num_threads(n_threads or os.cpu_count() or 1)
+    return anterior
+
+def _obter_modelo(model) -> "SentenceTransformer":
+    """model pode ser o SentenceTransformer ou só o nome: nesse caso, é carregado na primeira codificação."""
+    return carregar_modelo(model) if isinstance(model, str) else model
+
+def preparar_para_categoria(mapeamento: dict, model: "SentenceTransformer | str", pasta_artefato=None):
+    """
+    Mapeamento expandido + embeddings dos termos por categoria. Com pasta_artefato, usa o
+    artefato compilado (compilar_mapeamento) se o hash bater e só recompila quando o
+    mapeamento ou o modelo mudaram.
+    """
+    if pasta_artefato is not None:
+        carregado = carregar_mapeamento_compilado(pasta_artefato, hash_mapeamento(mapeamento, model))
+        if carregado is None:
+            compilar_mapeamento(mapeamento, model, pasta_artefato)
+            carregado = carregar_mapeamento_compilado(pasta_artefato)
+        return carregado
 
-def preparar_para_categoria(mapeamento: dict, model: SentenceTransformer):
     expandido = expandir_mapeamento(mapeamento)
     embeddings = {
-        categoria: model.encode(termos, convert_to_tensor=True)
+        categoria: _obter_modelo(model).encode(termos, convert_to_tensor=True)
         for categoria, termos in expandido.items()
     }
     return expandido, embeddings
 
+# === Busca direta (FlashText) por texto distinto ===
+
+_keyword_processors = {}
+
+def criar_keyword_processor(mapeamento_expandido: dict) -> KeywordProcessor:
+    """KeywordProcessor do mapeamento, guardado pela identidade do objeto (como em compilar_termos)."""
+    entrada = _keyword_processors.get(id(mapeamento_expandido))
+    if entrada is None or entrada[0] is not mapeamento_expandido:
+        keyword_processor = KeywordProcessor()
+        for categoria, termos in mapeamento_expandido.items():
+            for termo in termos:
+                keyword_processor.add_keyword(termo, categoria)
+        entrada = _keyword_processors[id(mapeamento_expandido)] = (mapeamento_expandido, keyword_processor)
+    return entrada[1]
+
+_keyword_processor_worker = None
+
+def _inicializar_busca(keyword_processor: KeywordProcessor):
+    global _keyword_processor_worker
+    _keyword_processor_worker = keyword_processor
+
+def _buscar_lote(textos: list, keyword_processor: KeywordProcessor = None) -> list:
+    if keyword_processor is None:
+        keyword_processor = _keyword_processor_worker
+    resultado = []
+    for texto in textos:
+        encontrados = keyword_processor.extract_keywords(texto, span_info=False)
+        resultado.append(encontrados[0] if encontrados else None)
+    return resultado
+
+def buscar_palavras_chave(
+    textos_unicos: list,
+    mapeamento_expandido: dict,
+    n_processos: int = None,
+    desc: str = "Categorizando"
+) -> list:
+    """
+    Primeira categoria encontrada por palavra-chave em cada texto (None se nenhuma).
+    Acima de LIMITE_PARALELO textos, os lotes são divididos entre processos.
+    """
+    lotes = [textos_unicos[i:i + TAMANHO_LOTE_BUSCA] for i in range(0, len(textos_unicos), TAMANHO_LOTE_BUSCA)]
+    n_processos = n_processos or os.cpu_count() or 1
+    keyword_processor = criar_keyword_processor(mapeamento_expandido)
+
+    if len(textos_unicos) < LIMITE_PARALELO or n_processos == 1:
+        resultados = [_buscar_lote(lote, keyword_processor) for lote in tqdm(lotes, desc=f"{desc} (busca direta)")]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=n_processos, initializer=_inicializar_busca, initargs=(keyword_processor,)
+        ) as executor:
+            resultados = list(tqdm(executor.map(_buscar_lote, lotes), total=len(lotes), desc=f"{desc} (busca direta)"))
+
+    return [categoria for lote in resultados for categoria in lote]
+
+# === Similaridade semântica em bloco ===
+
+def empilhar_embeddings(mapeamento_embeddings: dict):
+    """Embeddings de todos os termos em uma matriz normalizada + categoria (segmento) de cada linha."""
+    nomes = list(mapeamento_embeddings)
+    blocos = [torch.as_tensor(mapeamento_embeddings[categoria]) for categoria in nomes]
+    matriz = F.normalize(torch.cat(blocos), dim=1)
+    segmentos = torch.cat([
+        torch.full((len(bloco),), i, dtype=torch.long, device=matriz.device) for i, bloco in enumerate(blocos)
+    ])
+    return nomes, matriz, segmentos
+
+def classificar_por_similaridade(
+    emb_textos,
+    nomes: list,
+    matriz: torch.Tensor,
+    segmentos: torch.Tensor,
+    threshold: float,
+    tamanho_bloco: int = 4096
+) -> np.ndarray:
+    """
+    Categoria de cada embedding pelo termo mais similar (cosseno), em blocos de textos:
+    um produto de matrizes por bloco, máximo por categoria via scatter_reduce e argmax.
+    Abaixo do threshold (ou sem similaridade positiva) fica "Outros".
+    """
+    emb_textos = F.normalize(torch.as_tensor(emb_textos), dim=1)
+    indices = []
+    for inicio in range(0, len(emb_textos), tamanho_bloco):
+        bloco = emb_textos[inicio:inicio + tamanho_bloco].to(device=matriz.device, dtype=matriz.dtype)
+        sims = bloco @ matriz.T
+        por_categoria = torch.full((len(bloco), len(nomes)), float("-inf"), dtype=sims.dtype, device=sims.device)
+        por_categoria.scatter_reduce_(1, segmentos.expand(len(bloco), -1), sims, reduce="amax")
+        melhor_score, melhor = por_categoria.max(dim=1)
+        aceito = (melhor_score >= threshold) & (melhor_score > 0)
+        indices.append(torch.where(aceito, melhor, -1).cpu())
+
+    # -1 cai no último elemento: "Outros"
+    return np.asarray(nomes + ["Outros"], dtype=object)[torch.cat(indices).numpy()]
+
+# === Cache persistente por texto (SQLite) ===
+
+def _nome_canonico(nome: str) -> str:
+    """
+    Um só nome por modelo, seja ele passado como texto ou informado pelo modelo carregado:
+    nomes sem organização ganham "sentence-transformers/" (como o SentenceTransformer os
+    resolve no Hub), pastas do cache do Hub (.../models--org--nome/snapshots/...) viram "org/nome"
+    e pastas locais, o caminho absoluto.
+    """
+    sufixo = SUFIXO_INT8 if nome.endswith(SUFIXO_INT8) else ""
+    nome = nome.removesuffix(SUFIXO_INT8).rstrip("/\\")
+    cache_hub = re.search(r"models--([^/\\]+?)--([^/\\]+)[/\\]snapshots", nome)
+    if cache_hub:
+        nome = f"{cache_hub[1]}/{cache_hub[2]}"
+    elif Path(nome).exists():
+        nome = Path(nome).resolve().as_posix()
+    elif "/" not in nome:
+        nome = f"sentence-transformers/{nome}"
+    return nome + sufixo
+
+def _nome_modelo(model) -> str:
+    if isinstance(model, str):
+        return _nome_canonico(model)
+    if getattr(model, "nome_carregado", None):
+        return model.nome_carregado
+    nome = getattr(getattr(model, "model_card_data", None), "base_model", None)
+    if not nome:
+        try:
+            nome = model[0].auto_model.config._name_or_path
+        except Exception:
+            return type(model).__name__
+    return _nome_canonico(str(nome))
+
+def assinatura_cache(mapeamento_expandido: dict, model, threshold: float) -> str:
+    """Hash do mapeamento, do modelo e do threshold: muda qualquer um deles, muda a chave."""
+    conteudo = json.dumps(
+        {
+            "mapeamento": {cat: sorted(termos) for cat, termos in mapeamento_expandido.items()},
+            "modelo": _nome_modelo(model),
+            "threshold": float(threshold),
+        },
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+def _abrir_cache(cache_path):
+    caminho = Path(cache_path)
+    if caminho.exists():
+        with open(caminho, "rb") as f:
+            if f.read(16) != b"SQLite format 3\x00":
+                print(f"⚠️ {caminho} não é um cache SQLite (cache antigo em pickle?). Seguindo sem cache.")
+                return None
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    conexao = sqlite3.connect(caminho)
+    conexao.execute(
+        "CREATE TABLE IF NOT EXISTS categorias ("
+        "assinatura TEXT NOT NULL, texto TEXT NOT NULL, categoria TEXT NOT NULL, "
+        "PRIMARY KEY (assinatura, texto))"
+    )
+    return conexao
+
+def _ler_cache(conexao, assinatura: str, textos: list, tamanho_lote: int = 500) -> dict:
+    encontrados = {}
+    for inicio in range(0, len(textos), tamanho_lote):
+        lote = textos[inicio:inicio + tamanho_lote]
+        marcadores = ",".join("?" * len(lote))
+        linhas = conexao.execute(
+            f"SELECT texto, categoria FROM categorias WHERE assinatura = ? AND texto IN ({marcadores})",
+            [assinatura, *lote]
+        )
+        encontrados.update(linhas)
+    return encontrados
+
+def _gravar_cache(conexao, assinatura: str, resultados: dict):
+    with conexao:
+        conexao.executemany(
+            "INSERT OR REPLACE INTO categorias (assinatura, texto, categoria) VALUES (?, ?, ?)",
+            [(assinatura, texto, categoria) for texto, categoria in resultados.items()]
+        )
+
+# === Artefato compilado por mapeamento ===
+
+def hash_mapeamento(mapeamento: dict, model) -> str:
+    conteudo = json.dumps(
+        {
+            "formato_versao": FORMATO_ARTEFATO,
+            "mapeamento": {cat: sorted(termos) for cat, termos in mapeamento.items()},
+            "modelo": _nome_modelo(model),
+        },
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+def compilar_mapeamento(mapeamento: dict, model: "SentenceTransformer | str", pasta) -> Path:
+    """
+    Grava em pasta o mapeamento pronto para uso: termos expandidos e hash (manifesto.json),
+    KeywordProcessor (keyword_processor.pkl) e embeddings normalizados dos termos
+    (embeddings.npy, float32, lido por memory-map).
+    """
+    pasta = Path(pasta)
+    pasta.mkdir(parents=True, exist_ok=True)
+    expandido, embeddings = preparar_para_categoria(mapeamento, model)
+    nomes, matriz, _ = empilhar_embeddings(embeddings)
+
+    np.save(pasta / "embeddings.npy", matriz.detach().cpu().float().numpy())
+    with open(pasta / "keyword_processor.pkl", "wb") as f:
+        pickle.dump(criar_keyword_processor(expandido), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # Manifesto por último: artefato só é válido depois dele
+    manifesto = {
+        "formato_versao": FORMATO_ARTEFATO,
+        "hash": hash_mapeamento(mapeamento, model),
+        "modelo": _nome_modelo(model),
+        "categorias": nomes,
+        "termos_por_categoria": [len(embeddings[categoria]) for categoria in nomes],
+        "expandido": expandido,
+    }
+    (pasta / "manifesto.json").write_text(json.dumps(manifesto, ensure_ascii=False), encoding="utf-8")
+    return pasta
+
+def carregar_mapeamento_compilado(pasta, hash_esperado: str = None):
+    """
+    (expandido, embeddings) a partir do artefato, com os embeddings de cada categoria como
+    fatias da matriz em memory-map. Retorna None se não existir ou se o hash não bater.
+    """
+    pasta = Path(pasta)
+    caminho_manifesto = pasta / "manifesto.json"
+    if not caminho_manifesto.exists():
+        return None
+    manifesto = json.loads(caminho_manifesto.read_text(encoding="utf-8"))
+    if manifesto.get("formato_versao") != FORMATO_ARTEFATO:
+        return None
+    if hash_esperado is not None and manifesto["hash"] != hash_esperado:
+        return None
+
+    matriz = torch.from_numpy(np.load(pasta / "embeddings.npy", mmap_mode="c"))
+    limites = np.cumsum([0] + manifesto["termos_por_categoria"])
+    embeddings = {
+        categoria: matriz[limites[i]:limites[i + 1]] for i, categoria in enumerate(manifesto["categorias"])
+    }
+
+    expandido = manifesto["expandido"]
+    with open(pasta / "keyword_processor.pkl", "rb") as f:
+        _keyword_processors[id(expandido)] = (expandido, pickle.load(f))
+    return expandido, embeddings
+
+# === Embeddings persistentes dos textos ===
+
+def _hash_textos(textos) -> np.ndarray:
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=8).digest(), "little", signed=True) for t in textos),
+        dtype=np.int64, count=len(textos)
+    )
+
+def _pasta_embeddings(pasta, model) -> Path:
+    nome = _nome_modelo(model)
+    return Path(pasta) / hashlib.sha256(nome.encode("utf-8")).hexdigest()[:16]
+
+def _abrir_embeddings(pasta: Path):
+    """Índice (hash -> linha) e matriz float16 em memory-map; (None, None) se o repositório estiver vazio."""
+    if not (pasta / "manifesto.json").exists():
+        return None, None
+    manifesto = json.loads((pasta / "manifesto.json").read_text(encoding="utf-8"))
+    indice = pd.Index(np.load(pasta / "indice.npy")[:manifesto["n"]])
+    vetores = np.memmap(pasta / "vetores.f16", dtype=np.float16, mode="r", shape=(manifesto["n"], manifesto["dimensao"]))
+    return indice, vetores
+
+def codificar_textos(textos: list, model, pasta_embeddings=None, batch_size: int = 32) -> torch.Tensor:
+    """
+    Embeddings dos textos. Com pasta_embeddings, os vetores (normalizados, float16) ficam
+    num repositório por modelo, indexado pelo hash do texto: só os textos ausentes são
+    codificados e o modelo só é carregado se houver algum.
+    """
+    if pasta_embeddings is None:
+        return _obter_modelo(model).encode(textos, batch_size=batch_size, convert_to_tensor=True, show_progress_bar=False)
+
+    pasta = _pasta_embeddings(pasta_embeddings, model)
+    hashes = _hash_textos(textos)
+    indice, vetores = _abrir_embeddings(pasta)
+    posicoes = indice.get_indexer(hashes) if indice is not None else np.full(len(textos), -1)
+    ausentes = np.flatnonzero(posicoes == -1)
+
+    if len(ausentes):
+        hashes_novos, primeira = np.unique(hashes[ausentes], return_index=True)
+        novos = _obter_modelo(model).encode(
+            [textos[i] for i in ausentes[primeira]], batch_size=batch_size, convert_to_tensor=True, show_progress_bar=False
+        )
+        novos = F.normalize(novos.float(), dim=1).cpu().numpy().astype(np.float16)
+
+        # Grava a partir da última linha registrada (descarta sobras de uma gravação interrompida)
+        pasta.mkdir(parents=True, exist_ok=True)
+        n_antes = 0 if indice is None else len(indice)
+        caminho_vetores = pasta / "vetores.f16"
+        with open(caminho_vetores, "r+b" if caminho_vetores.exists() else "wb") as f:
+            f.seek(n_antes * novos.shape[1] * novos.itemsize)
+            f.write(novos.tobytes())
+            f.truncate()
+        hashes_todos = hashes_novos if indice is None else np.concatenate([indice.to_numpy(), hashes_novos])
+        np.save(pasta / "indice.npy", hashes_todos)
+        manifesto = {"modelo": _nome_modelo(model), "dimensao": novos.shape[1], "n": len(hashes_todos)}
+        (pasta / "manifesto.json").write_text(json.dumps(manifesto, ensure_ascii=False), encoding="utf-8")
+
+        indice, vetores = _abrir_embeddings(pasta)
+        posicoes = indice.get_indexer(hashes)
+        print(f"📦 Embeddings: {len(hashes_novos)} textos novos codificados ({n_antes} já no repositório)")
+
+    return torch.from_numpy(np.asarray(vetores[posicoes], dtype=np.float32))
+
 def categorizar_coluna_batch(
     serie_textos: pd.Series,
     mapeamento_expandido: dict,
     mapeamento_embeddings: dict,
-    model: SentenceTransformer,
+    model: "SentenceTransformer | str",
     threshold: float = 0.6,
     desc: str = "Categorizando",
     use_cache: bool = True,
-    cache_path: str = None
+    cache_path: str = None,
+    tamanho_bloco: int = 4096,
+    n_processos: int = None,
+    pasta_embeddings=None
 ) -> pd.Series:
+    """
+    Categoriza cada texto por palavra-chave (FlashText) e, sem correspondência, por
+    similaridade semântica. Com use_cache e cache_path (arquivo .sqlite), o resultado de cada
+    texto normalizado fica guardado sob a assinatura (mapeamento, modelo, threshold) e só
+    textos ainda não vistos são processados. Com pasta_embeddings, os vetores dos textos
+    também são reaproveitados entre chamadas (ver codificar_textos).
+    """
     textos = serie_textos.fillna("").astype(str)
-    textos_norm = textos.map(normalizar_texto)
-
-    # Opcional: carregar cache
-    if use_cache and cache_path:
-        try:
-            with open(cache_path, "rb") as f:
-                return pickle.load(f)
-        except:
-            pass
-
-    # Criar keyword processor para busca rápida
-    keyword_processor = KeywordProcessor()
-    for categoria, termos in mapeamento_expandido.items():
-        for termo in termos:
-            keyword_processor.add_keyword(termo, categoria)
-
-    # Pré-alocação
+    textos_norm = normalizar_serie(textos)
     categorias = pd.Series(index=serie_textos.index, dtype=object)
 
-    # 1. Busca direta com FlashText
-    for i, texto in enumerate(tqdm(textos_norm, desc=f"{desc} (busca direta)")):
-        resultado = keyword_processor.extract_keywords(texto, span_info=False)
-        if resultado:
-            categorias.iat[i] = resultado[0]
-
-    # 2. Deduplicar os que ainda estão sem categoria
-    faltantes = categorias[categorias.isna()]
-    unicos = [u for u in faltantes.unique() if isinstance(u, str) and u.strip()]
-    mapa_resultado = {}
-
-    with torch.no_grad():
-        emb_unicos = model.encode(unicos, batch_size=32, convert_to_tensor=True, show_progress_bar=False)
-
-        for i, texto_vec in enumerate(emb_unicos):
-            melhor_score = 0.0
-            melhor_categoria = "Outros"
-            for categoria, emb_categoria in mapeamento_embeddings.items():
-                score = util.cos_sim(texto_vec, emb_categoria).max().item()
-                if score > melhor_score and score >= threshold:
-                    melhor_score = score
-                    melhor_categoria = categoria
-            mapa_resultado[unicos[i]] = melhor_categoria
+    # Opcional: consultar cache (apenas textos ainda não vistos seguem adiante)
+    conexao = _abrir_cache(cache_path) if use_cache and cache_path else None
+    if conexao is not None:
+        assinatura = assinatura_cache(mapeamento_expandido, model, threshold)
+        cacheados = _ler_cache(conexao, assinatura, textos_norm.unique().tolist())
+        categorias = textos_norm.map(cacheados).astype(object)
+        print(f"📦 Cache: {len(cacheados)} textos distintos já categorizados")
+
+    pendentes = categorias.isna()
+    if not pendentes.any():
+        if conexao is not None:
+            conexao.close()
+        return categorias
+
+    # 1. Busca direta com FlashText, uma vez por texto distinto
+    codigos, unicos_pendentes = pd.factorize(textos_norm[pendentes])
+    resultado_unicos = np.asarray(
+        buscar_palavras_chave(unicos_pendentes.tolist(), mapeamento_expandido, n_processos, desc), dtype=object
+    )
+
+    # 2. Similaridade semântica só para os textos distintos sem correspondência
+    sem_categoria = np.flatnonzero([c is None and bool(t.strip()) for t, c in zip(unicos_pendentes, resultado_unicos)])
+    if len(sem_categoria):
+        nomes, matriz, segmentos = empilhar_embeddings(mapeamento_embeddings)
+        # Ordena por tamanho: blocos com textos de comprimento parecido têm menos padding
+        sem_categoria = sem_categoria[np.argsort([len(t) for t in unicos_pendentes[sem_categoria]], kind="stable")]
+        with torch.no_grad():
+            # Em blocos de tamanho_bloco textos: a memória não cresce com o total de faltantes
+            for inicio in range(0, len(sem_categoria), tamanho_bloco):
+                bloco = sem_categoria[inicio:inicio + tamanho_bloco]
+                emb_bloco = codificar_textos(unicos_pendentes[bloco].tolist(), model, pasta_embeddings)
+                resultado_unicos[bloco] = classificar_por_similaridade(
+                    emb_bloco, nomes, matriz, segmentos, threshold, tamanho_bloco
+                )
+    resultado_unicos[pd.isna(resultado_unicos)] = "Outros"
 
     # Mapear de volta para os índices originais
-    for i, texto in faltantes.items():
-        categorias.at[i] = mapa_resultado.get(texto, "Outros")
+    categorias[pendentes] = resultado_unicos[codigos]
 
-    # Opcional: salvar cache
-    if use_cache and cache_path:
-        with open(cache_path, "wb") as f:
-            pickle.dump(categorias, f)
+    # Opcional: gravar no cache só os textos novos
+    if conexao is not None:
+        _gravar_cache(conexao, assinatura, dict(zip(unicos_pendentes, resultado_unicos)))
+        conexao.close()
 
     return categorias
+
+# === Modo CPU int8: relatório de qualidade ===
+
+def relatorio_quantizacao(
+    textos: pd.Series,
+    rotulos: pd.Series,
+    mapeamento: dict,
+    nome_modelo: str,
+    threshold: float = 0.6,
+    n_threads: int = None
+):
+    """
+    Categoriza uma amostra rotulada com o modelo fp32 e com o int8 (carregar_modelo com
+    @int8) e compara acerto, concordância e tempo. Retorna (resumo, divergências).
+    """
+    anterior = configurar_threads_cpu(n_threads)
+    resultados, tempos = {}, {}
+    try:
+        for modo, nome in [("fp32", nome_modelo), ("int8", nome_modelo + SUFIXO_INT8)]:
+            modelo = carregar_modelo(nome)
+            expandido, embeddings = preparar_para_categoria(mapeamento, modelo)
+            inicio = time.perf_counter()
+            resultados[modo] = categorizar_coluna_batch(
+                textos, expandido, embeddings, modelo, threshold, desc=modo, use_cache=False
+            )
+            tempos[modo] = time.perf_counter() - inicio
+    finally:
+        torch.set_num_threads(anterior)
+
+    resumo = pd.DataFrame([
+        {
+            "modo": modo,
+            "acerto_rotulos": (resultados[modo] == rotulos).mean(),
+            "concordancia_fp32": (resultados[modo] == resultados["fp32"]).mean(),
+            "tempo_s": tempos[modo],
+            "aceleracao": tempos["fp32"] / tempos[modo] if tempos[modo] else float("nan"),
+        }
+        for modo in resultados
+    ])
+    divergentes = resultados["fp32"] != resultados["int8"]
+    divergencias = pd.DataFrame({
+        "texto": textos[divergentes],
+        "rotulo": rotulos[divergentes],
+        "fp32": resultados["fp32"][divergentes],
+        "int8": resultados["int8"][divergentes],
+    })
+
+    print(f"✅ int8: {resumo.loc[1, 'aceleracao']:.2f}x mais rápido | acerto {resumo.loc[0, 'acerto_rotulos']:.1%} (fp32) "
+          f"x {resumo.loc[1, 'acerto_rotulos']:.1%} (int8) | {divergentes.sum()} textos mudaram de categoria")
+    return resumo, divergencias
+
+# === Categorização de arquivos grandes em chunks ===
+
+def ler_coluna_em_chunks(caminho, coluna: str, tamanho_chunk: int = 100_000):
+    """Gera a coluna de um .csv ou .parquet em pedaços de até tamanho_chunk linhas."""
+    caminho = Path(caminho)
+    if caminho.suffix.lower() == ".parquet":
+        import pyarrow.parquet as pq
+        for lote in pq.ParquetFile(caminho).iter_batches(batch_size=tamanho_chunk, columns=[coluna]):
+            yield lote.column(0).to_pandas()
+    else:
+        for chunk in pd.read_csv(caminho, usecols=[coluna], dtype=str, chunksize=tamanho_chunk):
+            yield chunk[coluna]
+
+def categorizar_arquivo(
+    caminho_entrada,
+    coluna: str,
+    pasta_saida,
+    mapeamento_expandido: dict,
+    mapeamento_embeddings: dict,
+    model: "SentenceTransformer | str",
+    threshold: float = 0.6,
+    tamanho_chunk: int = 100_000,
+    **kwargs
+):
+    """
+    Categoriza a coluna de um arquivo grande chunk a chunk, com memória limitada ao chunk.
+    Cada chunk vira pasta_saida/parte_NNNNN.parquet (linha, categoria) e o checkpoint.json
+    registra os chunks concluídos: rodar de novo retoma de onde parou. É um gerador que
+    devolve o progresso (chunk, linhas, contagem por categoria) a cada chunk gravado.
+    Os demais argumentos (cache_path, pasta_embeddings, n_processos...) vão para
+    categorizar_coluna_batch; desc, se informado, vira o prefixo da barra de cada chunk.
+    O checkpoint também guarda tamanho e data de modificação da entrada: se o arquivo mudar,
+    a retomada é recusada em vez de misturar partes de versões diferentes.
+    """
+    prefixo = kwargs.pop("desc", None)
+    info_entrada = Path(caminho_entrada).stat()
+    pasta_saida = Path(pasta_saida)
+    pasta_saida.mkdir(parents=True, exist_ok=True)
+    caminho_checkpoint = pasta_saida / "checkpoint.json"
+    identificacao = {
+        "entrada": str(Path(caminho_entrada).resolve()),
+        "tamanho_entrada": info_entrada.st_size,
+        "mtime_ns_entrada": info_entrada.st_mtime_ns,
+        "coluna": coluna,
+        "tamanho_chunk": tamanho_chunk,
+        "assinatura": assinatura_cache(mapeamento_expandido, model, threshold),
+    }
+
+    checkpoint = {**identificacao, "chunks_concluidos": 0, "linhas": 0}
+    if caminho_checkpoint.exists():
+        anterior = json.loads(caminho_checkpoint.read_text(encoding="utf-8"))
+        if any(anterior.get(chave) != valor for chave, valor in identificacao.items()):
+            raise ValueError(f"❌ {caminho_checkpoint} é de outra entrada/configuração. Use outra pasta de saída ou apague-o.")
+        checkpoint = anterior
+        print(f"📦 Retomando do chunk {checkpoint['chunks_concluidos']} ({checkpoint['linhas']:,} linhas já categorizadas)")
+
+    linha_inicial = 0
+    for i, serie in enumerate(ler_coluna_em_chunks(caminho_entrada, coluna, tamanho_chunk)):
+        if i < checkpoint["chunks_concluidos"]:
+            linha_inicial += len(serie)
+            continue
+
+        serie.index = pd.RangeIndex(linha_inicial, linha_inicial + len(serie))
+        categorias = categorizar_coluna_batch(
+            serie, mapeamento_expandido, mapeamento_embeddings, model, threshold,
+            desc=f"{prefixo} · chunk {i}" if prefixo else f"Chunk {i}", **kwargs
+        )
+
+        # Parte gravada num temporário e renomeada antes do checkpoint: nunca fica meia parte
+        parte = pasta_saida / f"parte_{i:05d}.parquet"
+        temporario = parte.with_suffix(".tmp")
+        pd.DataFrame({"linha": categorias.index, "categoria": categorias.to_numpy()}).to_parquet(temporario, index=False)
+        temporario.replace(parte)
+
+        linha_inicial += len(serie)
+        checkpoint.update(chunks_concluidos=i + 1, linhas=linha_inicial)
+        caminho_checkpoint.write_text(json.dumps(checkpoint, ensure_ascii=False), encoding="utf-8")
+
+        yield {"chunk": i, "linhas": linha_inicial, "categorias": categorias.value_counts().to_dict()}
+
+def juntar_partes(pasta_saida) -> pd.Series:
+    """Categorias de todas as partes gravadas por categorizar_arquivo, indexadas pela linha de origem."""
+    partes = sorted(Path(pasta_saida).glob("parte_*.parquet"))
+    df = pd.concat([pd.read_parquet(parte) for parte in partes], ignore_index=True)
+    return df.set_index("linha")["categoria"]
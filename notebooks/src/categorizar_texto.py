@@ -3,6 +3,10 @@
 import unicodedata
 import re
 from collections import defaultdict
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
 from src.mapeamento_escolaridade import mapeamento_escolaridade
 from src.mapeamento_estados import mapeamento_estados
 from src.mapeamento_outros_idiomas import mapeamento_outros_idiomas
@@ -14,11 +18,35 @@ from src.mapeamento_profissoes import mapeamento_profissoes
 # ========================================
 # 🔧 FUNÇÃO DE NORMALIZAÇÃO
 # ========================================
+class _TabelaAcentos(dict):
+    """Tabela para str.translate montada sob demanda: cada caractere vira sua forma NFKD
+    só com letras a-z e espaços ASCII (mesmo resultado de NFKD + encode ASCII + re.sub)."""
+    def __missing__(self, codigo):
+        decomposto = unicodedata.normalize('NFKD', chr(codigo))
+        self[codigo] = ''.join(c for c in decomposto if 'a' <= c <= 'z' or (c.isascii() and c.isspace()))
+        return self[codigo]
+
+_TABELA_ACENTOS = _TabelaAcentos()
+
+@lru_cache(maxsize=200_000)
+def _normalizar(texto):
+    return texto.lower().strip().translate(_TABELA_ACENTOS)
+
 def normalizar_texto(texto):
-    texto = str(texto).lower().strip()
-    texto = unicodedata.normalize('NFKD', texto).encode('ASCII', 'ignore').decode('utf-8')
-    texto = re.sub(r'[^a-z\s]', '', texto)
-    return texto
+    return _normalizar(str(texto))
+
+def _por_valor_distinto(serie, funcao, dtype=object):
+    """Aplica funcao uma vez por valor distinto (nulos, raros, um a um, como no Series.map)."""
+    codigos, unicos = pd.factorize(serie)
+    resultado = np.asarray([funcao(u) for u in unicos] + [None], dtype=object)[codigos]
+    nulos = codigos == -1
+    if nulos.any():
+        resultado[nulos] = [funcao(v) for v in serie.to_numpy()[nulos]]
+    return pd.Series(resultado.astype(dtype), index=serie.index, name=serie.name)
+
+def normalizar_serie(serie):
+    """normalizar_texto aplicado uma vez por valor distinto da Series."""
+    return _por_valor_distinto(serie, normalizar_texto)
 
 # ========================================
 # 🔁 GERAR VARIAÇÕES DE UM TERMO
@@ -58,7 +86,24 @@ def expandir_mapeamento(mapeamento_original):
 # ========================================
 #  NOVO: FUNÇÃO DE CHECAGEM MAIS ROBUSTA (por palavra inteira)
 # ========================================
+_matchers = {}
+
+def compilar_termos(termos):
+    """
+    Um único regex \\b(?:t1|t2|...)\\b por conjunto de termos, guardado pela identidade do
+    objeto e pelo seu tamanho (consulta O(1) por linha). Uma lista alterada sem mudar de
+    tamanho não é percebida: nesse caso, passe uma lista nova.
+    """
+    entrada = _matchers.get(id(termos))
+    if entrada is None or entrada[0] is not termos or entrada[1] != len(termos):
+        padrao = re.compile(rf"\b(?:{'|'.join(re.escape(t) for t in termos)})\b") if len(termos) else None
+        entrada = _matchers[id(termos)] = (termos, len(termos), padrao)
+    return entrada[2]
+
 def termo_em_texto(termos, texto):
-    texto = normalizar_texto(texto)  # <= Isso precisa estar aqui!
-    return any(re.search(rf"\b{re.escape(termo)}\b", texto) for termo in termos)
+    padrao = compilar_termos(termos)
+    return padrao is not None and padrao.search(normalizar_texto(texto)) is not None
 
+def termos_em_serie(termos, serie):
+    """termo_em_texto para cada linha, testando cada texto distinto uma única vez."""
+    return _por_valor_distinto(serie, lambda texto: termo_em_texto(termos, texto), dtype=bool)
@@ -0,0 +1,305 @@
+import asyncio
+import email.utils
+import hashlib
+import json
+import random
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, quote, urlparse
+
+import httpx
+import pandas as pd
+
+
+LIMITE_PAGINA = 100
+CONCORRENCIA = 8
+REQUISICOES_POR_SEGUNDO = 5  # limite padrão da API (ActiveCampaign) por conta
+TENTATIVAS = 5
+STATUS_REPETIR = {429, 500, 502, 503, 504}
+
+
+# === Limite de taxa ===
+
+class LimitadorTaxa:
+    """Token bucket assíncrono: no máximo `taxa` requisições por segundo (rajadas de até `rajada`)."""
+
+    def __init__(self, taxa, rajada=None):
+        self.taxa = float(taxa)
+        self.rajada = float(rajada or taxa)
+        self.fichas = self.rajada
+        self.ultimo = time.monotonic()
+        self.trava = asyncio.Lock()
+
+    async def aguardar(self):
+        async with self.trava:
+            while True:
+                agora = time.monotonic()
+                self.fichas = min(self.rajada, self.fichas + (agora - self.ultimo) * self.taxa)
+                self.ultimo = agora
+                if self.fichas >= 1:
+                    self.fichas -= 1
+                    return
+                await asyncio.sleep((1 - self.fichas) / self.taxa)
+
+
+# === Checkpoint das páginas ===
+
+def _pasta_consulta(pasta_checkpoint, url_base):
+    """Uma subpasta por consulta (URL sem offset): filtros diferentes não se misturam."""
+    return Path(pasta_checkpoint) / hashlib.sha256(url_base.encode("utf-8")).hexdigest()[:16]
+
+def _ler_paginas_salvas(pasta):
+    paginas = {}
+    for arquivo in pasta.glob("pagina_*.json"):
+        paginas[int(arquivo.stem.removeprefix("pagina_"))] = json.loads(arquivo.read_text(encoding="utf-8"))
+    return paginas
+
+def _salvar_pagina(pasta, offset, dados):
+    arquivo = pasta / f"pagina_{offset:09d}.json"
+    temporario = arquivo.with_suffix(".tmp")
+    temporario.write_text(json.dumps(dados, ensure_ascii=False), encoding="utf-8")
+    temporario.replace(arquivo)
+
+
+# === Coleta concorrente ===
+
+def _segundos_retry_after(valor):
+    """Retry-After em segundos ou como data HTTP; None se ausente ou inválido."""
+    if not valor:
+        return None
+    try:
+        return max(float(valor), 0.0)
+    except ValueError:
+        pass
+    try:
+        data = email.utils.parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    if data.tzinfo is None:
+        data = data.replace(tzinfo=timezone.utc)
+    return max((data - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+async def _buscar_pagina(cliente, limitador, url, tentativas):
+    """GET com limite de taxa e novas tentativas (backoff exponencial com jitter; respeita Retry-After)."""
+    for tentativa in range(tentativas):
+        await limitador.aguardar()
+        try:
+            resp = await cliente.get(url)
+            if resp.status_code not in STATUS_REPETIR:
+                resp.raise_for_status()
+                return resp.json()
+            espera = _segundos_retry_after(resp.headers.get("Retry-After")) or 2 ** tentativa
+            motivo = f"HTTP {resp.status_code}"
+        except httpx.TransportError as e:
+            espera = 2 ** tentativa
+            motivo = type(e).__name__
+
+        if tentativa == tentativas - 1:
+            raise RuntimeError(f"❌ Falha após {tentativas} tentativas ({motivo}): {url}")
+        espera = min(espera, 60) * random.uniform(0.8, 1.2)
+        print(f"⚠️ {motivo} — nova tentativa em {espera:.1f}s")
+        await asyncio.sleep(espera)
+
+async def buscar_todos_contatos_async(
+    api_url,
+    headers,
+    data_inicio=None,
+    pasta_checkpoint=None,
+    concorrencia=CONCORRENCIA,
+    requisicoes_por_segundo=REQUISICOES_POR_SEGUNDO,
+    tentativas=TENTATIVAS,
+    limit=LIMITE_PAGINA,
+    limpar_checkpoint=False
+):
+    """
+    Mesma coleta de buscar_todos_contatos_incremental, com `concorrencia` páginas em voo
+    sobre um único cliente HTTP (conexões reaproveitadas). Retorna (contatos, field_values)
+    na ordem das páginas. Com limpar_checkpoint, ao terminar apaga só a subpasta desta
+    consulta dentro de pasta_checkpoint (a pasta em si e as outras consultas ficam).
+    """
+    filtro_data = ""
+    if data_inicio is not None and not pd.isna(data_inicio):
+        data_formatada = quote(data_inicio.strftime("%Y-%m-%dT%H:%M:%S-03:00"))
+        filtro_data = f"&filters[created_after]={data_formatada}"
+        print(f"📆 Buscando contatos após: {data_inicio}")
+    else:
+        print("⚠️ Nenhuma data válida encontrada. Coletando tudo.")
+    url_base = f"{api_url}/contacts?limit={limit}&include=fieldValues{filtro_data}"
+
+    paginas = {}
+    pasta = None
+    if pasta_checkpoint is not None:
+        pasta = _pasta_consulta(pasta_checkpoint, url_base)
+        pasta.mkdir(parents=True, exist_ok=True)
+        paginas = _ler_paginas_salvas(pasta)
+        if paginas:
+            print(f"📦 Checkpoint: {len(paginas)} páginas já coletadas em {pasta}")
+
+    limitador = LimitadorTaxa(requisicoes_por_segundo)
+    estado = {"proximo": 0, "fim": None}
+
+    def encerrar_em(offset):
+        estado["fim"] = offset if estado["fim"] is None else min(estado["fim"], offset)
+
+    async def trabalhador(cliente):
+        while True:
+            offset = estado["proximo"]
+            if estado["fim"] is not None and offset >= estado["fim"]:
+                return
+            estado["proximo"] += limit
+            if offset in paginas:
+                dados = paginas[offset]
+            else:
+                dados = await _buscar_pagina(cliente, limitador, f"{url_base}&offset={offset}", tentativas)
+                paginas[offset] = dados
+                if pasta is not None:
+                    _salvar_pagina(pasta, offset, dados)
+
+            # Total informado pela API (meta.total) ou primeira página vazia encerram a paginação
+            total = (dados.get("meta") or {}).get("total")
+            if total is not None:
+                encerrar_em(int(total))
+            if not dados.get("contacts"):
+                encerrar_em(offset)
+                return
+            print(f"🔄 Offset {offset} | +{len(dados['contacts'])} contatos")
+
+    limites = httpx.Limits(max_connections=concorrencia, max_keepalive_connections=concorrencia)
+    async with httpx.AsyncClient(headers=headers, limits=limites, timeout=60) as cliente:
+        tarefas = [asyncio.create_task(trabalhador(cliente)) for _ in range(concorrencia)]
+        try:
+            await asyncio.gather(*tarefas)
+        except BaseException:
+            # Um trabalhador falhou: os demais são cancelados antes de o cliente ser fechado
+            for tarefa in tarefas:
+                tarefa.cancel()
+            await asyncio.gather(*tarefas, return_exceptions=True)
+            raise
+
+    contatos, field_values = [], []
+    for offset in sorted(paginas):
+        if estado["fim"] is not None and offset >= estado["fim"]:
+            break
+        contatos.extend(paginas[offset].get("contacts", []))
+        field_values.extend(paginas[offset].get("fieldValues", []))
+
+    if pasta is not None and limpar_checkpoint:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    print(f"✅ Coleta finalizada com {len(contatos)} novos contatos.")
+    return contatos, field_values
+
+def _executar(corrotina):
+    """asyncio.run que também funciona dentro do Jupyter (onde já há um loop rodando)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(corrotina)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, corrotina).result()
+
+def buscar_todos_contatos_incremental(api_url, headers, data_inicio=None, pasta_checkpoint=None, limpar_checkpoint=True, **kwargs):
+    """
+    Todos os contatos (+ fieldValues) criados após data_inicio. Com pasta_checkpoint, cada
+    página fica salva em disco e uma execução interrompida retoma sem baixar de novo;
+    ao terminar, as páginas desta consulta são apagadas (a menos que limpar_checkpoint=False).
+    """
+    return _executar(buscar_todos_contatos_async(
+        api_url, headers, data_inicio, pasta_checkpoint, limpar_checkpoint=limpar_checkpoint, **kwargs
+    ))
+
+
+# === Servidor local para testes ===
+
+def _contatos_stub(n_contatos, seed):
+    rng = random.Random(seed)
+    inicio = pd.Timestamp("2025-01-01T00:00:00-03:00")
+    contatos, field_values = [], []
+    for i in range(1, n_contatos + 1):
+        cdate = inicio + pd.Timedelta(minutes=i * 7)
+        contatos.append({
+            "id": str(i), "firstName": f"Lead {i}", "email": f"lead{i}@exemplo.com.br",
+            "phone": f"+55119{rng.randint(10**7, 10**8 - 1)}", "cdate": cdate.isoformat(),
+        })
+        field_values.append({"contact": str(i), "field": "1", "value": cdate.strftime("%Y-%m-%d %H:%M:%S")})
+        field_values.append({"contact": str(i), "field": "2", "value": rng.choice(["sim", "não"])})
+    return contatos, field_values
+
+@contextmanager
+def servidor_stub(n_contatos=1_000, latencia=0.05, taxa_falhas=0.0, seed=42):
+    """
+    API falsa em 127.0.0.1 (porta livre) com /contacts (limit, offset, include=fieldValues,
+    filters[created_after], meta.total) e /fields. Cada requisição espera `latencia`
+    segundos e falha com 429/503 na proporção taxa_falhas. Devolve a URL base e o dict de
+    controle (requisições e falhas contadas; taxa_falhas pode ser alterada com o servidor no ar).
+    """
+    contatos, field_values = _contatos_stub(n_contatos, seed)
+    por_contato = {}
+    for fv in field_values:
+        por_contato.setdefault(fv["contact"], []).append(fv)
+    controle = {"requisicoes": 0, "falhas": 0, "taxa_falhas": taxa_falhas}
+    rng = random.Random(seed)
+    trava = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _responder(self, status, corpo, extras=None):
+            dados = json.dumps(corpo).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(dados)))
+            for chave, valor in (extras or {}).items():
+                self.send_header(chave, valor)
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def do_GET(self):
+            with trava:
+                controle["requisicoes"] += 1
+                falhar = rng.random() < controle["taxa_falhas"]
+                controle["falhas"] += falhar
+            time.sleep(latencia)
+            if falhar:
+                return self._responder(rng.choice([429, 503]), {"message": "tente novamente"}, {"Retry-After": "0"})
+
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if url.path.endswith("/fields"):
+                return self._responder(200, {"fields": [{"id": "1", "title": "data inscrição lançamento"},
+                                                        {"id": "2", "title": "filhos"}]})
+            if not url.path.endswith("/contacts"):
+                return self._responder(404, {"message": "não encontrado"})
+
+            selecionados = contatos
+            if "filters[created_after]" in params:
+                corte = pd.Timestamp(params["filters[created_after]"])
+                selecionados = [c for c in contatos if pd.Timestamp(c["cdate"]) > corte]
+            offset, limit = int(params.get("offset", 0)), int(params.get("limit", 20))
+            pagina = selecionados[offset:offset + limit]
+            corpo = {"contacts": pagina, "meta": {"total": str(len(selecionados))}}
+            if params.get("include") == "fieldValues":
+                corpo["fieldValues"] = [fv for c in pagina for fv in por_contato[c["id"]]]
+            self._responder(200, corpo)
+
+    class Servidor(ThreadingHTTPServer):
+        daemon_threads = True
+
+        def handle_error(self, request, client_address):
+            pass  # cliente que desistiu da conexão (ex.: coleta interrompida)
+
+    servidor = Servidor(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{servidor.server_address[1]}/api/3", controle
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
@@ -0,0 +1,126 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# === Esquema dos dados reais (categorias e pesos aproximados) ===
+LANCAMENTOS = ["L28", "L29", "L30", "L31", "L32", "L33", "L34"]
+
+CATEGORIAS = {
+    "renda": (["de 1.000 a 3.000", "de 3.000 a 5.000", "desempregado", "acima de 5.000", "até 1.000"],
+              [0.50, 0.25, 0.08, 0.07, 0.10]),
+    "escolaridade": (["médio completo", "superior completo", "superior incompleto", "fundamental completo",
+                      "técnico", "fundamental incompleto"],
+                     [0.38, 0.25, 0.20, 0.06, 0.08, 0.03]),
+    "idade": (["36 - 45 anos", "26 - 35 anos", "46 - 55 anos", "até 25 anos", "acima de 56 anos"],
+              [0.32, 0.30, 0.16, 0.17, 0.05]),
+    "filhos": (["sim", "não"], [0.55, 0.45]),
+    "estado_civil": (["casado(a)", "solteiro(a)", "união estável", "divorciado(a) ou separado(a)", "outros", "viúvo(a)"],
+                     [0.38, 0.35, 0.14, 0.09, 0.02, 0.02]),
+    "escolheu_profissao": (["sonho de criança", "gosta da profissão", "prestígio da carreira",
+                            "estabilidade de emprego", "segurança", "outros"],
+                           [0.30, 0.22, 0.10, 0.25, 0.08, 0.05]),
+    "dificuldade": (["tempo", "disciplina", "conteúdo", "dinheiro", "concentração"],
+                    [0.35, 0.20, 0.20, 0.15, 0.10]),
+}
+
+ORIGENS = (["facebook-ads", "google-ads", "organico", "email", "youtube"], [0.55, 0.20, 0.10, 0.10, 0.05])
+N_CRIATIVOS = 200
+N_CAMPANHAS_GOOGLE = 30
+PROPORCAO_FALTANTES = 0.03
+
+
+def _amostrar(rng, n, categorias, pesos, proporcao_faltantes=0.0):
+    """Índices sorteados + array de valores (strings compartilhadas, sem cópia por linha)."""
+    codigos = rng.choice(len(categorias), size=n, p=np.asarray(pesos) / np.sum(pesos))
+    valores = np.asarray(categorias + [None], dtype=object)
+    if proporcao_faltantes:
+        codigos[rng.random(n) < proporcao_faltantes] = len(categorias)
+    return codigos, valores[codigos]
+
+
+def _score_map_sintetico(rng):
+    """score_map com o mesmo formato do modelo (variável -> {resposta: score})."""
+    return {
+        var: {cat: round(float(s), 2) for cat, s in zip(cats, rng.uniform(5, 160, len(cats)))}
+        for var, (cats, _) in CATEGORIAS.items()
+        if var != "dificuldade"
+    }
+
+
+def gerar_dados_sinteticos(n_leads, seed=42, score_map=None, taxa_conversao=0.01):
+    """
+    Leads, alunos e tabelas de CPL sintéticos no mesmo esquema dos .parquet do painel
+    (lancamentos, data, variáveis da pesquisa, utm_*, leadscore_mapeado, leadscore_faixa, comprou).
+    """
+    rng = np.random.default_rng(seed)
+    score_map = score_map or _score_map_sintetico(rng)
+    df = pd.DataFrame(index=pd.RangeIndex(n_leads))
+
+    # Lançamentos com volume crescente, cada um em uma janela de 30 dias
+    pesos_lanc = np.linspace(1, 2, len(LANCAMENTOS))
+    cod_lanc, df["lancamentos"] = _amostrar(rng, n_leads, LANCAMENTOS, pesos_lanc)
+    inicio = pd.Timestamp("2024-06-01") + pd.to_timedelta(cod_lanc * 45, unit="D")
+    df["data"] = inicio + pd.to_timedelta(rng.integers(0, 30 * 24 * 3600, n_leads), unit="s")
+    df["email"] = pd.Series(np.arange(n_leads)).map("lead{}@exemplo.com.br".format)
+
+    score = np.zeros(n_leads)
+    for var, (cats, pesos) in CATEGORIAS.items():
+        codigos, df[var] = _amostrar(rng, n_leads, cats, pesos, PROPORCAO_FALTANTES)
+        if var in score_map:
+            lookup = np.append([score_map[var].get(c, 0) for c in cats], 0.0)
+            score += lookup[codigos]
+    df["leadscore_mapeado"] = score
+
+    # UTMs: criativos no Facebook, campanhas no Google, o resto com valores genéricos
+    cod_origem, df["utm_source"] = _amostrar(rng, n_leads, *ORIGENS, PROPORCAO_FALTANTES)
+    criativos = [f"Criativo {i:03d}" for i in range(N_CRIATIVOS)]
+    campanhas_google = [f"[QG] Pesquisa {i:02d}" for i in range(N_CAMPANHAS_GOOGLE)]
+    _, conteudo = _amostrar(rng, n_leads, criativos, np.ones(N_CRIATIVOS))
+    _, campanha_google = _amostrar(rng, n_leads, campanhas_google, np.ones(N_CAMPANHAS_GOOGLE))
+    campanha = np.asarray([f"{l}_captacao" for l in LANCAMENTOS], dtype=object)[cod_lanc]
+    df["utm_content"] = np.where(cod_origem == 0, conteudo, None)
+    df["utm_campaign"] = np.where(cod_origem == 1, campanha_google, campanha)
+    _, df["utm_medium"] = _amostrar(rng, n_leads, ["cpc", "social", "email", "organic"], [0.6, 0.2, 0.1, 0.1], 0.05)
+    _, df["utm_term"] = _amostrar(rng, n_leads, [f"termo_{i}" for i in range(500)], np.ones(500), 0.2)
+
+    # Conversão cresce com o leadscore; alunos são os leads que compraram
+    z = (score - score.mean()) / (score.std() or 1)
+    chance = 1 / (1 + np.exp(-(1.2 * z + np.log(taxa_conversao / (1 - taxa_conversao)))))
+    df["comprou"] = (rng.random(n_leads) < chance).astype(int)
+
+    # Faixas como no notebook: limites proporcionais à média dos alunos
+    media = score[df["comprou"].to_numpy() == 1].mean() if df["comprou"].any() else score.mean()
+    limites = {
+        "media_compradores": media,
+        "limite_a": media * 1.10,
+        "limite_b": media * 0.90,
+        "limite_c": media * 0.70,
+        "limite_d": media * 0.50,
+    }
+    cortes = [limites["limite_c"], limites["limite_b"], limites["limite_a"]]
+    df["leadscore_faixa"] = np.array(["D", "C", "B", "A"])[np.searchsorted(cortes, score, side="right")]
+
+    df_alunos = df[df["comprou"] == 1].reset_index(drop=True)
+    df_cpl_face = pd.DataFrame({"criativo": criativos, "cpl": rng.uniform(2, 25, N_CRIATIVOS).round(2)})
+    df_cpl_google = pd.DataFrame({"campanha": campanhas_google, "cpl": rng.uniform(3, 30, N_CAMPANHAS_GOOGLE).round(2)})
+
+    return {
+        "leads_leadscore": df,
+        "alunos_leadscore": df_alunos,
+        "invest_trafego_face": df_cpl_face,
+        "invest_trafego_google": df_cpl_google,
+        "score_map": score_map,
+        "limites": limites,
+    }
+
+
+def salvar_dados_sinteticos(dados, pasta):
+    """Grava os DataFrames como <nome>.parquet (mesmos nomes da pasta dados/)."""
+    pasta = Path(pasta)
+    pasta.mkdir(parents=True, exist_ok=True)
+    for nome, valor in dados.items():
+        if isinstance(valor, pd.DataFrame):
+            valor.to_parquet(pasta / f"{nome}.parquet", index=False)
+    return pasta
@@ -0,0 +1,126 @@
+# gravar_parquet.py
+#
+# Gravação dos .parquet do pipeline (leads, alunos, investimento) num layout próprio para
+# consultas por lançamento: linhas ordenadas por lancamentos e data, um ou mais row groups
+# por lançamento (com estatísticas min/max por coluna), dicionário nas colunas de poucos
+# valores distintos e metadados com o esquema e a versão dos dados. Leitores com filtro
+# de lançamento (pd.read_parquet(..., filters=...)) pulam os row groups dos outros.
+#
+# O arquivo não tem data de geração: os mesmos dados geram os mesmos bytes, e o
+# pipeline (scripts/pipeline.py) não refaz as etapas seguintes sem necessidade.
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+FORMATO_VERSAO = 1
+CHAVE_METADADOS = b"leadscore"
+ORDENACAO = ["lancamentos", "data"]
+LINHAS_POR_GRUPO = 64_000
+LIMITE_DICIONARIO = 0.5  # fração máxima de valores distintos para usar dicionário
+
+
+# === Layout ===
+
+def _ordenar(df, ordenar_por):
+    """Ordenação estável pelas colunas de ordenar_por presentes em df (nulos no fim)."""
+    colunas = [coluna for coluna in ordenar_por if coluna in df.columns]
+    if colunas:
+        return df.sort_values(colunas, kind="stable", na_position="last", ignore_index=True), colunas
+    return df.reset_index(drop=True), colunas
+
+def _limites_grupos(df, coluna, linhas_por_grupo):
+    """(início, fim) de cada row group: um novo a cada valor de `coluna`, com no máximo linhas_por_grupo linhas."""
+    inicios = np.array([0])
+    if coluna is not None and len(df):
+        codigos = pd.factorize(df[coluna])[0]
+        inicios = np.flatnonzero(np.r_[True, codigos[1:] != codigos[:-1]])
+    fins = np.r_[inicios[1:], len(df)]
+    return [
+        (i, min(i + linhas_por_grupo, fim))
+        for inicio, fim in zip(inicios, fins)
+        for i in range(inicio, fim, linhas_por_grupo)
+    ]
+
+def _colunas_dicionario(df, limite=LIMITE_DICIONARIO):
+    """Colunas com poucos valores distintos em relação ao total de linhas (categorias, UTMs, faixas...)."""
+    colunas = []
+    for coluna in df.columns:
+        try:
+            distintos = df[coluna].nunique(dropna=True)
+        except TypeError:  # listas/dicts nas células
+            continue
+        if distintos <= limite * max(len(df), 1):
+            colunas.append(coluna)
+    return colunas
+
+def versao_dados(df):
+    """Hash curto do conteúdo (independe do índice); None se houver valores não hasheáveis."""
+    try:
+        hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    except TypeError:
+        return None
+    sha = hashlib.sha256(hashes.tobytes())
+    sha.update(repr(list(df.columns)).encode("utf-8"))
+    return sha.hexdigest()[:16]
+
+
+# === Gravação e leitura ===
+
+def gravar_parquet(df, caminho, ordenar_por=ORDENACAO, linhas_por_grupo=LINHAS_POR_GRUPO, metadados=None):
+    """
+    Grava df (sem o índice) em `caminho` com o layout descrito no topo do módulo.
+    `metadados` (dict serializável em JSON) é acrescentado aos metadados do arquivo.
+    O df recebido não é alterado; a escrita é atômica (arquivo temporário + replace).
+    """
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    df, colunas_ordem = _ordenar(df, ordenar_por)
+
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    descricao = {
+        "formato_versao": FORMATO_VERSAO,
+        "versao_dados": versao_dados(df),
+        "linhas": len(df),
+        "ordenado_por": colunas_ordem,
+        "esquema": {str(coluna): str(tipo) for coluna, tipo in df.dtypes.items()},
+        **(metadados or {}),
+    }
+    tabela = tabela.replace_schema_metadata({
+        **(tabela.schema.metadata or {}),
+        CHAVE_METADADOS: json.dumps(descricao, ensure_ascii=False, default=str).encode("utf-8"),
+    })
+
+    ordenacao = list(pq.SortingColumn.from_ordering(
+        tabela.schema, [(coluna, "ascending") for coluna in colunas_ordem], null_placement="at_end"
+    )) if colunas_ordem else None
+
+    temporario = caminho.with_suffix(".tmp")
+    try:
+        with pq.ParquetWriter(
+            temporario, tabela.schema,
+            use_dictionary=_colunas_dicionario(df),
+            write_statistics=True,
+            sorting_columns=ordenacao,
+        ) as escritor:
+            grupos = _limites_grupos(df, colunas_ordem[0] if colunas_ordem else None, linhas_por_grupo)
+            for inicio, fim in grupos or [(0, 0)]:
+                escritor.write_table(tabela.slice(inicio, fim - inicio))
+    except BaseException:
+        temporario.unlink(missing_ok=True)
+        raise
+    temporario.replace(caminho)
+    return caminho
+
+def ler_metadados_parquet(caminho):
+    """Metadados gravados por gravar_parquet ({} para arquivos gravados de outra forma)."""
+    metadados = pq.read_schema(caminho).metadata or {}
+    if CHAVE_METADADOS not in metadados:
+        return {}
+    return json.loads(metadados[CHAVE_METADADOS].decode("utf-8"))
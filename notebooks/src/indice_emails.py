@@ -0,0 +1,132 @@
+# indice_emails.py
+#
+# Índice persistente por e-mail (hash do e-mail normalizado) usado para ligar os leads do
+# ActiveCampaign às UTMs das submissões do Elementor e à lista de alunos (comprou).
+# Cada execução só registra o que é novo; anexar UTMs e marcar compras são buscas no
+# índice, sem refazer o merge com todo o histórico.
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+FORMATO_VERSAO = 1
+UTMS = ["utm_source", "utm_campaign", "utm_medium", "utm_content", "utm_term"]
+
+
+# === Hash dos e-mails ===
+
+def normalizar_emails(emails):
+    return pd.Series(emails, dtype="string").str.strip().str.lower()
+
+def hash_emails(emails):
+    """
+    (hashes int64, válidos) dos e-mails normalizados; vazios e nulos não são válidos.
+    pd.util.hash_array usa chave fixa, então o mesmo e-mail tem o mesmo hash em toda execução.
+    """
+    normalizados = normalizar_emails(emails)
+    validos = (normalizados.notna() & (normalizados != "")).to_numpy()
+    hashes = np.zeros(len(normalizados), dtype=np.int64)
+    hashes[validos] = pd.util.hash_array(normalizados[validos].to_numpy(dtype=object)).view(np.int64)
+    return hashes, validos
+
+def _novos_primeiros(hashes, validos, existentes):
+    """Posições da primeira ocorrência de cada hash válido ainda fora de `existentes`."""
+    primeiro = ~pd.Index(hashes).duplicated(keep="first")
+    return np.flatnonzero(validos & primeiro & ~np.isin(hashes, existentes))
+
+
+# === Estado do índice ===
+
+def criar_indice_emails(utms=UTMS):
+    return {
+        "utms": pd.DataFrame(columns=list(utms), index=pd.Index([], dtype=np.int64), dtype=object),
+        "compradores": np.array([], dtype=np.int64),
+    }
+
+def salvar_indice_emails(indice, pasta):
+    pasta = Path(pasta)
+    pasta.mkdir(parents=True, exist_ok=True)
+    (pasta / "manifesto.json").unlink(missing_ok=True)
+    (pasta / "leads.parquet").unlink(missing_ok=True)  # mapa e-mail -> lead das versões anteriores, nunca lido
+
+    indice["utms"].rename_axis("hash").reset_index().to_parquet(pasta / "utms.parquet", index=False)
+    np.save(pasta / "compradores.npy", indice["compradores"])
+
+    manifesto = {
+        "formato_versao": FORMATO_VERSAO,
+        "utms": list(indice["utms"].columns),
+        "emails_com_utm": len(indice["utms"]),
+        "compradores": len(indice["compradores"]),
+    }
+    # Manifesto por último: sem ele a pasta é tratada como índice vazio
+    (pasta / "manifesto.json").write_text(json.dumps(manifesto, ensure_ascii=False, indent=2), encoding="utf-8")
+
+def carregar_indice_emails(pasta, utms=UTMS):
+    """Índice salvo em `pasta` ou um índice vazio se ainda não houver (ou estiver incompleto)."""
+    pasta = Path(pasta)
+    if not (pasta / "manifesto.json").exists():
+        return criar_indice_emails(utms)
+
+    manifesto = json.loads((pasta / "manifesto.json").read_text(encoding="utf-8"))
+    if manifesto.get("formato_versao") != FORMATO_VERSAO:
+        raise ValueError(f"Formato do índice de e-mails não suportado: {manifesto.get('formato_versao')}")
+    if manifesto["utms"] != list(utms):
+        raise ValueError(f"Índice salvo com outras colunas de UTM: {manifesto['utms']}")
+
+    df_utms = pd.read_parquet(pasta / "utms.parquet")
+    return {
+        "utms": df_utms.set_index("hash").astype(object),
+        "compradores": np.load(pasta / "compradores.npy"),
+    }
+
+
+# === Registro incremental ===
+
+def registrar_utms(indice, df_submissoes, col_email="email"):
+    """
+    Guarda as UTMs da primeira submissão de cada e-mail ainda sem UTM (mesma regra do
+    drop_duplicates("email") sobre o CSV do Elementor). Retorna quantos e-mails entraram.
+    """
+    hashes, validos = hash_emails(df_submissoes[col_email])
+    novos = _novos_primeiros(hashes, validos, indice["utms"].index)
+    if len(novos):
+        acrescimo = df_submissoes[list(indice["utms"].columns)].iloc[novos].astype(object)
+        acrescimo.index = pd.Index(hashes[novos], dtype=np.int64)
+        indice["utms"] = pd.concat([indice["utms"], acrescimo]) if len(indice["utms"]) else acrescimo
+    return len(novos)
+
+def registrar_compras(indice, emails):
+    """Acrescenta os e-mails de compradores ao conjunto. Retorna quantos eram novos."""
+    hashes, validos = hash_emails(emails)
+    antes = len(indice["compradores"])
+    indice["compradores"] = np.union1d(indice["compradores"], hashes[validos])
+    return len(indice["compradores"]) - antes
+
+
+# === Consultas ===
+
+def anexar_utms(df, indice, col_email="email"):
+    """
+    UTMs do Elementor nas linhas de df, preferindo o valor do Elementor e mantendo o que
+    já havia em df quando o e-mail não tem UTM registrada (o antigo merge + combine_first).
+    """
+    df = df.copy()
+    hashes, validos = hash_emails(df[col_email])
+    posicoes = np.where(validos, indice["utms"].index.get_indexer(hashes), -1)
+    encontrados = posicoes >= 0
+
+    for utm in indice["utms"].columns:
+        valores = np.full(len(df), np.nan, dtype=object)
+        valores[encontrados] = indice["utms"][utm].to_numpy()[posicoes[encontrados]]
+        if utm in df.columns:
+            valores = np.where(pd.isna(valores), df[utm].to_numpy(dtype=object), valores)
+        df[utm] = valores
+    return df
+
+def marcar_comprou(df, indice, col_email="email"):
+    """1 para os e-mails registrados como compradores, 0 para os demais."""
+    hashes, validos = hash_emails(df[col_email])
+    return pd.Series((validos & np.isin(hashes, indice["compradores"])).astype(int), index=df.index)
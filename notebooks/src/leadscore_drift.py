@@ -0,0 +1,219 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+FORMATO_VERSAO = 3
+FAIXAS = ["D", "C", "B", "A"]
+PSI_MODERADO = 0.10
+PSI_ALTO = 0.25
+MINIMO_LEADS = 100
+
+
+# === Estado do monitor ===
+
+def criar_monitor_drift(scores_referencia, limites, n_bins=20):
+    """
+    Monitor com a distribuição de referência (leads usados no treino): bordas por quantis
+    do leadscore_mapeado, histograma e quantidade por faixa. Os grupos começam vazios.
+    "dias" guarda, por dia, os histogramas de cada lançamento; por_lancamento e por_dia
+    são somas deles. "vistos" tem os hashes (ordenados) dos leads já contados.
+    """
+    scores = np.asarray(scores_referencia, dtype=float)
+    scores = scores[~np.isnan(scores)]
+    bordas = np.unique(np.quantile(scores, np.linspace(0, 1, n_bins + 1)[1:-1]))
+    cortes = [float(limites["limite_c"]), float(limites["limite_b"]), float(limites["limite_a"])]
+
+    estado = {
+        "formato_versao": FORMATO_VERSAO,
+        "bordas": bordas.tolist(),
+        "cortes_faixa": cortes,
+        "referencia": {"n": 0, "contagens": [0] * (len(bordas) + 1), "faixas": [0] * len(FAIXAS)},
+        "dias": {},
+        "por_lancamento": {},
+        "por_dia": {},
+        "vistos": [],
+        "ultima_data": None,
+    }
+    _acumular(estado["referencia"], *_contar(estado, scores))
+    return estado
+
+
+def _contar(estado, scores):
+    bins = np.searchsorted(estado["bordas"], scores, side="right")
+    faixas = np.searchsorted(estado["cortes_faixa"], scores, side="right")
+    n_bins = len(estado["bordas"]) + 1
+    return len(scores), np.bincount(bins, minlength=n_bins), np.bincount(faixas, minlength=len(FAIXAS))
+
+
+def _acumular(grupo, n, contagens, faixas):
+    grupo["n"] += int(n)
+    grupo["contagens"] = (np.asarray(grupo["contagens"]) + contagens).astype(int).tolist()
+    grupo["faixas"] = (np.asarray(grupo["faixas"]) + faixas).astype(int).tolist()
+
+
+def _grupo_vazio(n_bins):
+    return {"n": 0, "contagens": [0] * n_bins, "faixas": [0] * len(FAIXAS)}
+
+
+def _contar_por_chave(estado, chaves, bins, faixas):
+    """Histogramas de todos os grupos de uma vez (um bincount sobre grupo x bin): {chave: grupo}."""
+    n_bins = len(estado["bordas"]) + 1
+    codigos, unicos = pd.factorize(chaves)
+    n_grupos = len(unicos)
+    hist = np.bincount(codigos * n_bins + bins, minlength=n_grupos * n_bins).reshape(n_grupos, n_bins)
+    por_faixa = np.bincount(codigos * len(FAIXAS) + faixas, minlength=n_grupos * len(FAIXAS)).reshape(n_grupos, len(FAIXAS))
+
+    grupos = {}
+    for i, chave in enumerate(unicos):
+        grupos[chave] = _grupo_vazio(n_bins)
+        _acumular(grupos[chave], hist[i].sum(), hist[i], por_faixa[i])
+    return grupos
+
+
+def _somar_grupos(estado):
+    """Refaz por_lancamento e por_dia a partir dos histogramas de cada dia x lançamento."""
+    n_bins = len(estado["bordas"]) + 1
+    estado["por_lancamento"], estado["por_dia"] = {}, {}
+    for dia, registro in sorted(estado["dias"].items()):
+        for lancamento, grupo in registro["lancamentos"].items():
+            contagens, faixas = np.asarray(grupo["contagens"]), np.asarray(grupo["faixas"])
+            _acumular(estado["por_lancamento"].setdefault(lancamento, _grupo_vazio(n_bins)), grupo["n"], contagens, faixas)
+            _acumular(estado["por_dia"].setdefault(dia, _grupo_vazio(n_bins)), grupo["n"], contagens, faixas)
+
+
+def _hash_leads(emails, lancamentos):
+    """Hash int64 de cada par (e-mail, lançamento): identifica o lead entre execuções."""
+    chaves = pd.DataFrame({"email": np.asarray(emails, dtype=object), "lancamento": np.asarray(lancamentos, dtype=object)})
+    return pd.util.hash_pandas_object(chaves, index=False).to_numpy().view(np.int64)
+
+
+def atualizar_monitor_drift(
+    estado, df_leads, col_score="leadscore_mapeado", col_data="data", col_lancamento="lancamentos", col_email="email"
+):
+    """
+    Acrescenta ao monitor os leads de df_leads que ele ainda não contou (mesmo e-mail e
+    lançamento). df_leads pode ser o histórico inteiro ou só os leads novos; leads retroativos
+    ou com o mesmo horário do último processado também entram. Leads sem data, score ou
+    e-mail são ignorados. Retorna quantos leads o monitor ganhou.
+    """
+    datas = pd.to_datetime(df_leads[col_data], errors="coerce")
+    scores = pd.to_numeric(df_leads[col_score], errors="coerce")
+    emails = df_leads[col_email].astype("string").str.strip().str.lower()
+    validos = (datas.notna() & scores.notna() & emails.notna() & (emails != "")).to_numpy()
+    if not validos.any():
+        return 0
+
+    lancamentos = df_leads.loc[validos, col_lancamento].astype(str).to_numpy()
+    hashes = _hash_leads(emails[validos].to_numpy(dtype=object), lancamentos)
+    vistos = np.asarray(estado["vistos"], dtype=np.int64)
+    novos = ~pd.Index(hashes).duplicated(keep="first") & ~np.isin(hashes, vistos)
+    estado["ultima_data"] = max(filter(None, [estado["ultima_data"], datas[validos].max().isoformat()]))
+    if not novos.any():
+        return 0
+
+    scores = scores[validos].to_numpy(dtype=float)[novos]
+    bins = np.searchsorted(estado["bordas"], scores, side="right")
+    faixas = np.searchsorted(estado["cortes_faixa"], scores, side="right")
+    chaves = pd.MultiIndex.from_arrays([datas[validos].dt.strftime("%Y-%m-%d").to_numpy()[novos], lancamentos[novos]])
+
+    n_bins = len(estado["bordas"]) + 1
+    for (dia, lancamento), grupo in _contar_por_chave(estado, chaves, bins, faixas).items():
+        registro = estado["dias"].setdefault(dia, {"lancamentos": {}})["lancamentos"]
+        contagens, por_faixa = np.asarray(grupo["contagens"]), np.asarray(grupo["faixas"])
+        _acumular(registro.setdefault(lancamento, _grupo_vazio(n_bins)), grupo["n"], contagens, por_faixa)
+
+    estado["vistos"] = np.union1d(vistos, hashes[novos]).tolist()
+    _somar_grupos(estado)
+    return int(novos.sum())
+
+
+def salvar_monitor_drift(estado, caminho):
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    caminho.write_text(json.dumps(estado, ensure_ascii=False), encoding="utf-8")
+
+
+def carregar_monitor_drift(caminho):
+    """
+    Monitor salvo em `caminho`. Os das versões 1 e 2 (sem os leads já contados) mantêm a
+    referência e recomeçam os grupos: a próxima atualização reconta todo o histórico.
+    """
+    estado = json.loads(Path(caminho).read_text(encoding="utf-8"))
+    if estado.get("formato_versao") in (1, 2):
+        estado.update({
+            "formato_versao": FORMATO_VERSAO, "dias": {}, "por_lancamento": {}, "por_dia": {},
+            "vistos": [], "ultima_data": None,
+        })
+    if estado.get("formato_versao") != FORMATO_VERSAO:
+        raise ValueError(f"Formato do monitor de drift não suportado: {estado.get('formato_versao')}")
+    return estado
+
+
+# === Métricas ===
+
+def calcular_psi(contagens_atual, contagens_referencia, epsilon=1e-4):
+    """Population Stability Index entre duas distribuições (contagens nos mesmos bins)."""
+    atual = np.asarray(contagens_atual, dtype=float)
+    referencia = np.asarray(contagens_referencia, dtype=float)
+    p_atual = np.clip(atual / max(atual.sum(), 1), epsilon, None)
+    p_ref = np.clip(referencia / max(referencia.sum(), 1), epsilon, None)
+    return float(np.sum((p_atual - p_ref) * np.log(p_atual / p_ref)))
+
+
+def calcular_ks(contagens_atual, contagens_referencia):
+    """Estatística KS (maior distância entre as CDFs) calculada sobre os histogramas."""
+    atual = np.asarray(contagens_atual, dtype=float)
+    referencia = np.asarray(contagens_referencia, dtype=float)
+    cdf_atual = np.cumsum(atual) / max(atual.sum(), 1)
+    cdf_ref = np.cumsum(referencia) / max(referencia.sum(), 1)
+    return float(np.max(np.abs(cdf_atual - cdf_ref)))
+
+
+def _situacao(n, psi):
+    if n < MINIMO_LEADS:
+        return "poucos dados"
+    if psi >= PSI_ALTO:
+        return "alto"
+    if psi >= PSI_MODERADO:
+        return "moderado"
+    return "estável"
+
+
+def resumo_drift(estado, por="lancamento"):
+    """PSI/KS do leadscore e PSI das faixas de cada lançamento (ou dia) contra a referência."""
+    grupos = estado["por_lancamento"] if por == "lancamento" else estado["por_dia"]
+    referencia = estado["referencia"]
+    ref_faixas = np.asarray(referencia["faixas"], dtype=float) / max(referencia["n"], 1) * 100
+
+    linhas = []
+    for chave in sorted(grupos):
+        grupo = grupos[chave]
+        psi = calcular_psi(grupo["contagens"], referencia["contagens"])
+        faixas = np.asarray(grupo["faixas"], dtype=float) / max(grupo["n"], 1) * 100
+        linha = {
+            por: chave,
+            "leads": grupo["n"],
+            "psi_score": round(psi, 4),
+            "ks_score": round(calcular_ks(grupo["contagens"], referencia["contagens"]), 4),
+            "psi_faixas": round(calcular_psi(grupo["faixas"], referencia["faixas"]), 4),
+        }
+        for i in reversed(range(len(FAIXAS))):
+            linha[f"% {FAIXAS[i]}"] = round(faixas[i], 1)
+            linha[f"% {FAIXAS[i]} ref."] = round(ref_faixas[i], 1)
+        linha["situacao"] = _situacao(grupo["n"], psi)
+        linhas.append(linha)
+
+    return pd.DataFrame(linhas)
+
+
+def resumo_drift_json(estado):
+    """Resumo serializável (lançamentos, dias e referência) para a API e o painel."""
+    return {
+        "ultima_data": estado["ultima_data"],
+        "referencia": {"leads": estado["referencia"]["n"], "faixas": dict(zip(FAIXAS, estado["referencia"]["faixas"]))},
+        "por_lancamento": resumo_drift(estado, "lancamento").to_dict(orient="records"),
+        "por_dia": resumo_drift(estado, "dia").to_dict(orient="records"),
+    }
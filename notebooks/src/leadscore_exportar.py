@@ -0,0 +1,337 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.dummy import DummyClassifier, DummyRegressor
+from sklearn.ensemble import (
+    GradientBoostingClassifier, GradientBoostingRegressor,
+    HistGradientBoostingClassifier, HistGradientBoostingRegressor
+)
+from scipy.special import expit
+
+
+# Incrementar sempre que o layout do .npz mudar
+FORMATO_VERSAO = 2
+
+
+# === Exportação (scikit-learn -> arrays) ===
+
+def _arvores_gradient_boosting(modelo):
+    """Nós das árvores de GradientBoosting*, com o learning_rate já aplicado nas folhas."""
+    if modelo.estimators_.shape[1] != 1:
+        raise ValueError("Apenas classificação binária ou regressão são suportadas.")
+
+    if modelo.init_ == "zero":
+        base = 0.0
+    elif isinstance(modelo.init_, (DummyClassifier, DummyRegressor)):
+        base = float(modelo._raw_predict_init(np.zeros((1, modelo.n_features_in_)))[0, 0])
+    else:
+        raise ValueError("Estimador inicial (init) não constante não é suportado.")
+
+    arvores = []
+    for estimador in modelo.estimators_[:, 0]:
+        t = estimador.tree_
+        n = t.node_count
+        arvores.append({
+            "feature": t.feature.astype(np.int32),
+            "limiar": t.threshold.astype(np.float64),
+            "esquerda": t.children_left.astype(np.int32),
+            "direita": t.children_right.astype(np.int32),
+            "valor": t.value[:, 0, 0] * modelo.learning_rate,
+            "faltante_esquerda": np.asarray(getattr(t, "missing_go_to_left", np.zeros(n)), dtype=bool),
+            "categorica": np.zeros(n, dtype=bool),
+            "bitset": np.zeros(n, dtype=np.int32),
+            "bitsets": np.zeros((0, 8), dtype=np.uint32),
+        })
+
+    conhecidas = np.zeros((modelo.n_features_in_, 8), dtype=np.uint32)
+    return arvores, base, conhecidas, True
+
+
+def _arvores_hist_gradient_boosting(modelo):
+    """Nós das árvores de HistGradientBoosting* (folhas já incluem o learning_rate)."""
+    if modelo.n_trees_per_iteration_ != 1:
+        raise ValueError("Apenas classificação binária ou regressão são suportadas.")
+
+    arvores = []
+    for (preditor,) in modelo._predictors:
+        nos = preditor.nodes
+        folha = nos["is_leaf"].astype(bool)
+        arvores.append({
+            "feature": np.where(folha, -2, nos["feature_idx"]).astype(np.int32),
+            "limiar": nos["num_threshold"].astype(np.float64),
+            "esquerda": np.where(folha, -1, nos["left"]).astype(np.int32),
+            "direita": np.where(folha, -1, nos["right"]).astype(np.int32),
+            "valor": nos["value"].astype(np.float64),
+            "faltante_esquerda": nos["missing_go_to_left"].astype(bool),
+            "categorica": nos["is_categorical"].astype(bool),
+            "bitset": nos["bitset_idx"].astype(np.int32),
+            "bitsets": np.asarray(preditor.raw_left_cat_bitsets, dtype=np.uint32).reshape(-1, 8),
+        })
+
+    # Categorias vistas no treino: as desconhecidas seguem o caminho dos faltantes
+    conhecidas_cat, mapa = modelo._bin_mapper.make_known_categories_bitsets()
+    conhecidas = np.zeros((modelo.n_features_in_, 8), dtype=np.uint32)
+    indices = np.flatnonzero(modelo._bin_mapper.is_categorical_)
+    conhecidas[indices] = conhecidas_cat[mapa[indices]]
+
+    return arvores, float(np.ravel(modelo._baseline_prediction)[0]), conhecidas, False
+
+
+def _preprocessamento_hist_gradient_boosting(modelo):
+    """
+    ColumnTransformer interno do HistGradientBoosting* (features categóricas nativas): as
+    árvores veem as categóricas codificadas como 0..k-1 (desconhecidas e faltantes = NaN) e
+    colocadas antes das demais. Guarda a ordem das colunas e as categorias de cada uma.
+    """
+    preprocessador = getattr(modelo, "_preprocessor", None)
+    if preprocessador is None:
+        return {}
+
+    n = modelo.n_features_in_
+    ordem, categorias = [], []
+    blocos = sorted(
+        (preprocessador.output_indices_[nome].start, nome, transformador, colunas)
+        for nome, transformador, colunas in preprocessador.transformers_
+        if transformador != "drop" and preprocessador.output_indices_[nome].stop > preprocessador.output_indices_[nome].start
+    )
+    for _, nome, transformador, colunas in blocos:
+        indices = np.arange(n)[colunas]
+        if nome == "encoder":
+            if not (np.isnan(transformador.unknown_value) and np.isnan(transformador.encoded_missing_value)):
+                raise ValueError("Codificação de categorias não suportada no _preprocessor do modelo.")
+            if ordem:
+                raise ValueError("As categóricas deveriam vir antes das demais colunas no _preprocessor.")
+            for cats in transformador.categories_:
+                cats = cats[~pd.isna(cats)]
+                try:
+                    categorias.append(np.asarray(cats, dtype=np.float64))
+                except (TypeError, ValueError):
+                    categorias.append(np.asarray(cats, dtype=str))
+        ordem.extend(indices)
+
+    if sorted(ordem) != list(range(n)):
+        raise ValueError("O _preprocessor do modelo não repassa cada coluna exatamente uma vez.")
+    return {
+        "pre_ordem": np.asarray(ordem, dtype=np.int32),
+        "pre_n_cat": np.int32(len(categorias)),
+        **{f"pre_cat{j}": cats for j, cats in enumerate(categorias)},
+    }
+
+
+def _ligacao(modelo):
+    """Função que leva o score bruto ao resultado de predict_proba/predict."""
+    if isinstance(modelo, GradientBoostingClassifier):
+        return ("logistica", 2.0) if modelo.loss == "exponential" else ("logistica", 1.0)
+    if isinstance(modelo, HistGradientBoostingClassifier):
+        return "logistica", 1.0
+    if isinstance(modelo, HistGradientBoostingRegressor) and modelo.loss in ("poisson", "gamma"):
+        return "exponencial", 1.0
+    return "identidade", 1.0
+
+
+def _achatar_ensemble(modelo):
+    preprocessamento = {}
+    if isinstance(modelo, (GradientBoostingClassifier, GradientBoostingRegressor)):
+        arvores, base, conhecidas, float32 = _arvores_gradient_boosting(modelo)
+    elif isinstance(modelo, (HistGradientBoostingClassifier, HistGradientBoostingRegressor)):
+        arvores, base, conhecidas, float32 = _arvores_hist_gradient_boosting(modelo)
+        preprocessamento = _preprocessamento_hist_gradient_boosting(modelo)
+    else:
+        raise TypeError(f"Modelo não suportado: {type(modelo).__name__}")
+
+    # Todas as árvores em arrays únicos, com índices globais de nós e bitsets
+    raizes, deslocamento, deslocamento_bitset = [], 0, 0
+    partes = {chave: [] for chave in arvores[0]}
+    for arvore in arvores:
+        raizes.append(deslocamento)
+        interno = arvore["esquerda"] != -1
+        arvore["esquerda"] = np.where(interno, arvore["esquerda"] + deslocamento, -1).astype(np.int32)
+        arvore["direita"] = np.where(interno, arvore["direita"] + deslocamento, -1).astype(np.int32)
+        arvore["bitset"] = arvore["bitset"] + deslocamento_bitset
+        for chave, valor in arvore.items():
+            partes[chave].append(valor)
+        deslocamento += len(arvore["feature"])
+        deslocamento_bitset += len(arvore["bitsets"])
+
+    ensemble = {chave: np.concatenate(valores) for chave, valores in partes.items()}
+    ligacao, fator = _ligacao(modelo)
+    ensemble.update({
+        "raizes": np.asarray(raizes, dtype=np.int32),
+        "base": np.float64(base),
+        "conhecidas": conhecidas,
+        "float32": np.bool_(float32),
+        "ligacao": np.str_(ligacao),
+        "fator": np.float64(fator),
+        **preprocessamento,
+    })
+    return ensemble
+
+
+def _achatar_calibracao(calibrado):
+    """Mapeamento sigmoide/isotônico de um _CalibratedClassifier binário."""
+    if len(calibrado.calibrators) != 1:
+        raise ValueError("Apenas calibração binária é suportada.")
+    calibrador = calibrado.calibrators[0]
+    if calibrado.method == "sigmoid":
+        return {"calibracao": np.str_("sigmoide"), "cal_a": np.float64(calibrador.a_), "cal_b": np.float64(calibrador.b_)}
+    return {
+        "calibracao": np.str_("isotonica"),
+        "cal_x": np.asarray(calibrador.X_thresholds_, dtype=np.float64),
+        "cal_y": np.asarray(calibrador.y_thresholds_, dtype=np.float64),
+    }
+
+
+def exportar_modelo_npz(modelo, caminho, colunas=None):
+    """
+    Achata as árvores (e a calibração, se houver) em arrays NumPy e salva em um .npz
+    versionado, que pode ser avaliado sem scikit-learn por prever_npz.
+    """
+    if isinstance(modelo, CalibratedClassifierCV):
+        ensembles = [
+            {**_achatar_ensemble(c.estimator), **_achatar_calibracao(c)}
+            for c in modelo.calibrated_classifiers_
+        ]
+    else:
+        ensembles = [{**_achatar_ensemble(modelo), "calibracao": np.str_("nenhuma")}]
+
+    if colunas is None:
+        colunas = getattr(modelo, "feature_names_in_", [])
+
+    arrays = {
+        "formato_versao": np.int32(FORMATO_VERSAO),
+        "sklearn_versao": np.str_(sklearn.__version__),
+        "tipo": np.str_("classificador" if hasattr(modelo, "predict_proba") else "regressor"),
+        "colunas": np.asarray(list(colunas), dtype=str),
+        "n_modelos": np.int32(len(ensembles)),
+    }
+    for k, ensemble in enumerate(ensembles):
+        arrays.update({f"m{k}_{chave}": valor for chave, valor in ensemble.items()})
+
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(caminho, **arrays)
+    return caminho
+
+
+# === Avaliação em NumPy puro ===
+
+def carregar_modelo_npz(caminho):
+    with np.load(caminho, allow_pickle=False) as dados:
+        arrays = {chave: dados[chave] for chave in dados.files}
+
+    if int(arrays["formato_versao"]) != FORMATO_VERSAO:
+        raise ValueError(
+            f"Formato {int(arrays['formato_versao'])} não suportado (esperado {FORMATO_VERSAO}). Exporte o modelo novamente."
+        )
+
+    modelo = {
+        "tipo": str(arrays["tipo"]),
+        "colunas": arrays["colunas"].tolist(),
+        "sklearn_versao": str(arrays["sklearn_versao"]),
+        "ensembles": [],
+    }
+    for k in range(int(arrays["n_modelos"])):
+        prefixo = f"m{k}_"
+        ensemble = {chave[len(prefixo):]: valor for chave, valor in arrays.items() if chave.startswith(prefixo)}
+        for chave in ("ligacao", "calibracao"):
+            ensemble[chave] = str(ensemble[chave])
+        modelo["ensembles"].append(ensemble)
+    return modelo
+
+
+def _em_bitset(bitsets, linhas, codigos):
+    return ((bitsets[linhas, codigos // 32] >> (codigos % 32)) & 1).astype(bool)
+
+
+def _somar_arvores(ensemble, X):
+    """Percorre todas as árvores para todas as linhas em paralelo e soma as folhas."""
+    if ensemble["float32"]:
+        X = X.astype(np.float32).astype(np.float64)
+
+    esquerda, direita, feature = ensemble["esquerda"], ensemble["direita"], ensemble["feature"]
+    nos = np.tile(ensemble["raizes"], (X.shape[0], 1))
+
+    while True:
+        idx_linha, idx_arvore = np.nonzero(esquerda[nos] != -1)
+        if idx_linha.size == 0:
+            break
+        no = nos[idx_linha, idx_arvore]
+        valores = X[idx_linha, feature[no]]
+        faltante = np.isnan(valores)
+        vai_esquerda = np.where(faltante, ensemble["faltante_esquerda"][no], valores <= ensemble["limiar"][no])
+
+        categorica = ensemble["categorica"][no]
+        if categorica.any():
+            c = np.flatnonzero(categorica)
+            invalido = faltante[c] | (valores[c] < 0)
+            codigos = np.where(invalido, 0, valores[c]).astype(np.int64) & 255
+            na_esquerda = _em_bitset(ensemble["bitsets"], ensemble["bitset"][no[c]], codigos)
+            conhecida = _em_bitset(ensemble["conhecidas"], feature[no[c]], codigos)
+            como_faltante = invalido | (~na_esquerda & ~conhecida)
+            vai_esquerda[c] = np.where(como_faltante, ensemble["faltante_esquerda"][no[c]], na_esquerda)
+
+        nos[idx_linha, idx_arvore] = np.where(vai_esquerda, esquerda[no], direita[no])
+
+    return ensemble["base"] + ensemble["valor"][nos].sum(axis=1)
+
+
+def _aplicar_calibracao(ensemble, bruto):
+    if ensemble["calibracao"] == "sigmoide":
+        return expit(-(ensemble["cal_a"] * bruto + ensemble["cal_b"]))
+    if ensemble["calibracao"] == "isotonica":
+        return np.interp(bruto, ensemble["cal_x"], ensemble["cal_y"])
+    if ensemble["ligacao"] == "logistica":
+        return expit(ensemble["fator"] * bruto)
+    if ensemble["ligacao"] == "exponencial":
+        return np.exp(bruto)
+    return bruto
+
+
+def _codificar_categorias(valores, categorias):
+    """Posição de cada valor em categorias (como o OrdinalEncoder); faltantes e desconhecidos viram NaN."""
+    codigos = pd.Index(categorias).get_indexer(pd.Index(valores, dtype=object)).astype(np.float64)
+    codigos[(codigos == -1) | pd.isna(valores)] = np.nan
+    return codigos
+
+
+def _matriz(modelo, ensemble, X):
+    """X na ordem de colunas do modelo, com o pré-processamento do ensemble (categóricas na frente) aplicado."""
+    if isinstance(X, pd.DataFrame):
+        if modelo["colunas"]:
+            X = X.reindex(columns=modelo["colunas"], fill_value=0)
+        X = X.to_numpy(dtype=None if "pre_ordem" in ensemble else np.float64)
+    if "pre_ordem" not in ensemble:
+        return np.asarray(X, dtype=np.float64)
+
+    X = np.asarray(X)
+    n_cat = int(ensemble["pre_n_cat"])
+    colunas = [
+        _codificar_categorias(X[:, origem], ensemble[f"pre_cat{j}"]) if j < n_cat else np.asarray(X[:, origem], dtype=np.float64)
+        for j, origem in enumerate(ensemble["pre_ordem"])
+    ]
+    return np.column_stack(colunas) if colunas else np.empty((X.shape[0], 0))
+
+
+def prever_npz(modelo, X):
+    """
+    Probabilidade da classe positiva (classificador) ou previsão (regressor)
+    para todas as linhas de X, equivalente a predict_proba(X)[:, 1] / predict(X).
+    """
+    resultados = [_aplicar_calibracao(e, _somar_arvores(e, _matriz(modelo, e, X))) for e in modelo["ensembles"]]
+    return np.mean(resultados, axis=0)
+
+
+def validar_exportacao(modelo_sklearn, modelo_npz, X, tolerancia=1e-6):
+    """Maior diferença absoluta entre scikit-learn e o avaliador NumPy (levanta erro acima da tolerância)."""
+    if modelo_npz["tipo"] == "classificador":
+        esperado = modelo_sklearn.predict_proba(X)[:, 1]
+    else:
+        esperado = modelo_sklearn.predict(X)
+    diferenca = float(np.max(np.abs(esperado - prever_npz(modelo_npz, X)))) if len(esperado) else 0.0
+    if diferenca > tolerancia:
+        raise ValueError(f"Diferença máxima {diferenca:.2e} acima da tolerância {tolerancia:.0e}.")
+    return diferenca
@@ -0,0 +1,164 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+VARIAVEIS_LIFT = ["renda", "escolaridade", "idade", "filhos", "estado_civil", "escolheu_profissao"]
+NULOS_DISFARCADOS = ["", "nan", "NaN", "None", "none"]
+COLUNAS_ESTATISTICAS = ["lancamento", "variavel", "categoria", "qtd_leads", "qtd_alunos"]
+
+
+# === Estatísticas por (lançamento, variável, categoria) ===
+
+def contar_categorias(df, variaveis=VARIAVEIS_LIFT, col_lancamento="lancamentos"):
+    """
+    Contagem de respostas por lançamento, variável e categoria
+    (mesma limpeza de nulos reais e disfarçados de gerar_tabela_lift_score_ponderado).
+    """
+    partes = []
+    for var in variaveis:
+        if var not in df.columns:
+            continue
+        validos = df[var].notna() & ~df[var].astype(str).str.strip().isin(NULOS_DISFARCADOS)
+        contagem = (
+            df.loc[validos & df[col_lancamento].notna(), [col_lancamento, var]]
+            .value_counts()
+            .rename("qtd")
+            .reset_index()
+            .rename(columns={col_lancamento: "lancamento", var: "categoria"})
+        )
+        contagem["variavel"] = var
+        partes.append(contagem)
+
+    if not partes:
+        return pd.DataFrame(columns=["lancamento", "variavel", "categoria", "qtd"])
+    resultado = pd.concat(partes, ignore_index=True)
+    resultado["categoria"] = resultado["categoria"].astype(str)
+    return resultado[["lancamento", "variavel", "categoria", "qtd"]]
+
+
+def _somar_contagens(estatisticas, contagem, coluna):
+    """Soma as contagens novas em `coluna` (qtd_leads/qtd_alunos) sem tocar nas demais linhas."""
+    chaves = ["lancamento", "variavel", "categoria"]
+    novas = contagem.rename(columns={"qtd": coluna}).set_index(chaves)[[coluna]]
+    base = estatisticas.set_index(chaves)
+    base = base.reindex(base.index.union(novas.index), fill_value=0)
+    base.loc[novas.index, coluna] += novas[coluna]
+    return base.reset_index()
+
+
+def calcular_estatisticas_lift(df_leads, df_alunos, variaveis=VARIAVEIS_LIFT, col_lancamento="lancamentos"):
+    """Monta o store de estatísticas a partir do histórico completo de leads e alunos."""
+    estatisticas = pd.DataFrame(columns=COLUNAS_ESTATISTICAS)
+    return atualizar_estatisticas_lift(estatisticas, df_leads, df_alunos, variaveis, col_lancamento)
+
+
+def atualizar_estatisticas_lift(estatisticas, df_leads=None, df_alunos=None, variaveis=VARIAVEIS_LIFT,
+                                col_lancamento="lancamentos", lancamentos=None):
+    """
+    Atualiza o store apenas com os dados novos.
+
+    - Sem `lancamentos`: as contagens de df_leads/df_alunos são somadas às existentes
+      (novos cadastros ou novos alunos de um lançamento).
+    - Com `lancamentos`: as linhas desses lançamentos são recalculadas a partir dos
+      DataFrames informados (ex.: reprocessamento completo do lançamento atual).
+    """
+    estatisticas = estatisticas[COLUNAS_ESTATISTICAS].copy()
+
+    if lancamentos is not None:
+        lancamentos = list(lancamentos)
+        estatisticas = estatisticas[~estatisticas["lancamento"].isin(lancamentos)]
+        if df_leads is not None:
+            df_leads = df_leads[df_leads[col_lancamento].isin(lancamentos)]
+        if df_alunos is not None:
+            df_alunos = df_alunos[df_alunos[col_lancamento].isin(lancamentos)]
+
+    for df, coluna in [(df_leads, "qtd_leads"), (df_alunos, "qtd_alunos")]:
+        if df is not None:
+            estatisticas = _somar_contagens(estatisticas, contar_categorias(df, variaveis, col_lancamento), coluna)
+
+    estatisticas[["qtd_leads", "qtd_alunos"]] = estatisticas[["qtd_leads", "qtd_alunos"]].astype("int64")
+    return estatisticas.sort_values(["variavel", "lancamento", "categoria"], ignore_index=True)
+
+
+def salvar_estatisticas_lift(estatisticas, caminho):
+    Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+    estatisticas.to_parquet(caminho, index=False)
+
+
+def carregar_estatisticas_lift(caminho):
+    caminho = Path(caminho)
+    if not caminho.exists():
+        return pd.DataFrame(columns=COLUNAS_ESTATISTICAS)
+    return pd.read_parquet(caminho)
+
+
+# === Tabelas de lift e score_map a partir das estatísticas ===
+
+def gerar_tabela_lift_de_estatisticas(estatisticas, variavel, min_leads=5):
+    """
+    Mesma tabela de gerar_tabela_lift_score_ponderado (lift ponderado por lançamento),
+    calculada a partir das contagens em vez das linhas de leads e alunos.
+    """
+    stats = estatisticas[estatisticas["variavel"] == variavel]
+    stats = stats[(stats["qtd_leads"] > 0) | (stats["qtd_alunos"] > 0)]
+    stats = stats.sort_values(["categoria", "lancamento"], kind="stable")
+
+    qtd_leads = stats["qtd_leads"].to_numpy()
+    qtd_alunos = stats["qtd_alunos"].to_numpy()
+    total_leads = stats.groupby("lancamento")["qtd_leads"].transform("sum").to_numpy()
+    total_alunos = stats.groupby("lancamento")["qtd_alunos"].transform("sum").to_numpy()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        perc_leads = np.where(qtd_leads > 0, qtd_leads / total_leads * 100, 0.0)
+        perc_alunos = np.where(qtd_alunos > 0, qtd_alunos / total_alunos * 100, 0.0)
+        lift = np.where(perc_leads > 0, perc_alunos / perc_leads, 0.0)
+    score = np.round(lift * qtd_alunos, 2)
+
+    validas = qtd_leads >= min_leads
+
+    # Categoria ausente em leads (ou alunos) de um lançamento vira NaN -> 0 no cálculo
+    # original, o que transforma aquela quantidade em float; o dtype é mantido igual.
+    ciclo_com_validas = pd.Series(validas).groupby(stats["lancamento"].to_numpy()).transform("any").to_numpy()
+    tipo_leads = float if (ciclo_com_validas & (qtd_leads == 0)).any() else np.int64
+    tipo_alunos = float if (ciclo_com_validas & (qtd_alunos == 0)).any() else np.int64
+
+    categorias = stats["categoria"].to_numpy()[validas]
+    qtd_leads, qtd_alunos = qtd_leads[validas].astype(tipo_leads), qtd_alunos[validas].astype(tipo_alunos)
+    perc_leads, perc_alunos = perc_leads[validas], perc_alunos[validas]
+    lift, score = lift[validas], score[validas]
+
+    resultados = []
+    inicios = np.flatnonzero(np.r_[True, categorias[1:] != categorias[:-1]]) if len(categorias) else []
+    fins = np.r_[inicios[1:], len(categorias)] if len(categorias) else []
+    for inicio, fim in zip(inicios, fins):
+        g = slice(inicio, fim)
+        soma_leads = qtd_leads[g].sum()
+        soma_alunos = qtd_alunos[g].sum()
+        resultados.append({
+            variavel: categorias[inicio],
+            "qtd_leads": round(soma_leads, 2),
+            "qtd_alunos": round(soma_alunos, 2),
+            "percentual_leads": round((perc_leads[g] * qtd_leads[g]).sum() / soma_leads, 2),
+            "percentual_alunos": round((perc_alunos[g] * qtd_alunos[g]).sum() / soma_alunos, 2) if soma_alunos > 0 else 0,
+            "lift": round((lift[g] * qtd_alunos[g]).sum() / soma_alunos, 2) if soma_alunos > 0 else 0,
+            "score": round(score[g].sum(), 2),
+        })
+
+    if not resultados:
+        return pd.DataFrame(columns=["qtd_leads", "qtd_alunos", "percentual_leads", "percentual_alunos", "lift", "score"],
+                            index=pd.Index([], name=variavel))
+    tabela_final = pd.DataFrame(resultados).set_index(variavel)
+    return tabela_final.sort_values(by="score", ascending=False)
+
+
+def gerar_tabelas_lift_e_score_map(estatisticas, variaveis=VARIAVEIS_LIFT, min_leads=5):
+    """tabelas_lift e score_map (respostas só com strip, sem lower) a partir das estatísticas."""
+    tabelas_lift = {}
+    score_map = {}
+    for var in variaveis:
+        tabela = gerar_tabela_lift_de_estatisticas(estatisticas, var, min_leads)
+        tabelas_lift[var] = tabela
+        score_map[var] = {str(k).strip(): v for k, v in zip(tabela.index, tabela["score"])}
+    return tabelas_lift, score_map
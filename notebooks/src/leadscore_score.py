@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+
+FAIXAS = np.array(["D", "C", "B", "A"])
+
+
+def compilar_score_map(score_map):
+    """
+    Converte o score_map (variável -> {resposta: score}) em arrays de lookup:
+    para cada variável, um Index com as respostas e um array com os scores.
+    A última posição do array guarda o score das respostas fora do mapa (0).
+    """
+    compilado = {}
+    for var, scores_var in score_map.items():
+        respostas = pd.Index(list(scores_var.keys()), dtype=object)
+        valores = np.append(np.asarray(list(scores_var.values()), dtype=float), 0.0)
+        compilado[var] = (respostas, valores)
+    return compilado
+
+
+def _posicoes_no_mapa(serie, respostas):
+    """
+    Posição de cada linha no Index de respostas (-1 = fora do mapa).
+    A resposta é comparada como str(valor).strip(), igual ao cálculo linha a linha.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy().astype(np.intp)
+        unicos = np.append(np.asarray(serie.cat.categories, dtype=object), np.nan)
+        codigos[codigos == -1] = len(unicos) - 1
+    else:
+        codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+        unicos = np.asarray(unicos, dtype=object)
+        if serie.dtype == object and len(serie):
+            # factorize junta None com NaN e 1 com 1.0, que viram chaves diferentes em str();
+            # separando também pelo tipo, cada código tem um único str(valor). Entre textos não há
+            # essa junção, então com só textos o tipo é consultado apenas nas linhas nulas
+            so_textos = pd.api.types.infer_dtype(unicos, skipna=True) in ("string", "empty")
+            consultar = serie.isna().to_numpy() if so_textos else np.ones(len(serie), dtype=bool)
+            tipos = np.zeros(len(serie), dtype=np.int64)
+            if consultar.any():
+                tipos[consultar] = pd.factorize(serie[consultar].map(type))[0]
+            if tipos.any():
+                # factorize numera na ordem de aparição: a primeira linha de cada código o representa
+                codigos = pd.factorize(codigos.astype(np.int64) * (tipos.max() + 1) + tipos)[0]
+                primeiras = np.flatnonzero(~pd.Index(codigos).duplicated())
+                unicos = serie.to_numpy(dtype=object)[primeiras]
+
+    chaves = pd.Index([str(u).strip() for u in unicos], dtype=object)
+    return respostas.get_indexer(chaves)[codigos]
+
+
+def calcular_contribuicoes(df, score_map, compilado=None):
+    """
+    Score de cada variável para todas as linhas: {variável: array de scores}.
+    Variáveis ausentes no DataFrame contam como resposta "None".
+    """
+    if compilado is None:
+        compilado = compilar_score_map(score_map)
+
+    contribuicoes = {}
+    for var, (respostas, valores) in compilado.items():
+        if var in df.columns:
+            contribuicoes[var] = valores[_posicoes_no_mapa(df[var], respostas)]
+        else:
+            contribuicoes[var] = np.full(len(df), valores[respostas.get_indexer(["None"])[0]])
+    return contribuicoes
+
+
+def somar_contribuicoes(contribuicoes):
+    """Soma as contribuições na ordem do score_map (mesma ordem da soma linha a linha)."""
+    total = np.zeros(len(next(iter(contribuicoes.values()), [])))
+    for valores in contribuicoes.values():
+        total += valores
+    return total
+
+
+def calcular_leadscore(df, score_map, compilado=None):
+    """
+    Leadscore total de cada linha (equivalente a aplicar calcular_leadscore_total
+    com df.apply(..., axis=1), mas com lookup por código e soma em NumPy).
+    """
+    return somar_contribuicoes(calcular_contribuicoes(df, score_map, compilado))
+
+
+def classificar_faixas(scores, limites):
+    """
+    Classifica scores em faixas A, B, C, D a partir dos limites salvos
+    (score >= limite_a -> A, >= limite_b -> B, >= limite_c -> C, senão D).
+    """
+    scores = np.asarray(scores, dtype=float)
+    cortes = np.array([limites["limite_c"], limites["limite_b"], limites["limite_a"]], dtype=float)
+    posicoes = np.searchsorted(cortes, scores, side="right")
+    posicoes[np.isnan(scores)] = 0
+    return FAIXAS[posicoes]
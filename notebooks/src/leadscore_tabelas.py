@@ -1,7 +1,14 @@
+import json
 import pandas as pd
 import numpy as np
 import streamlit as st
 
+from notebooks.src.leadscore_drift import (
+    atualizar_monitor_drift, carregar_monitor_drift, resumo_drift, resumo_drift_json
+)
+from notebooks.src.leadscore_score import calcular_contribuicoes, classificar_faixas, somar_contribuicoes
+
+
 def gerar_tabela_faixas_leads_alunos(df_leads, df_alunos):
     total_leads = df_leads.groupby("leadscore_faixa").size()
     total_alunos = df_alunos.groupby("leadscore_faixa").size()
@@ -128,143 +135,204 @@ def top1_utms_por_leads_A(df_leads, colunas_utm=["utm_source", "utm_campaign", "
     return resultados
 
 
-def destacar_maiores_com_ponderacao(col_vals, cor="green", minimo_absoluto=3):
-    pct_vals = col_vals.str.extract(r"\(([\d.]+)%\)")[0]
-    abs_vals = col_vals.str.extract(r"^(\d+)\s+\(")[0]
-
-    pct_vals = pd.to_numeric(pct_vals, errors='coerce').fillna(0)
-    abs_vals = pd.to_numeric(abs_vals, errors='coerce').fillna(0)
+def destacar_maiores_com_ponderacao(percentuais, absolutos, cores, minimo_absoluto=3):
+    """
+    Calcula os estilos de destaque (z-score do percentual x log do absoluto)
+    para várias colunas de uma vez, direto dos arrays numéricos.
+    """
+    pct = np.asarray(percentuais, dtype=float)
+    absolutos = np.asarray(absolutos, dtype=float)
 
-    abs_log = np.log1p(abs_vals)
-    pct_zscore = (pct_vals - pct_vals.mean()) / (pct_vals.std() + 1e-6)
+    abs_log = np.log1p(absolutos)
+    desvio = pct.std(axis=0, ddof=1) if pct.shape[0] > 1 else np.full(pct.shape[1], np.nan)
+    pct_zscore = (pct - pct.mean(axis=0)) / (desvio + 1e-6)
     score = pct_zscore * abs_log
 
-    limiar = score[abs_vals >= minimo_absoluto].quantile(0.70)
+    validos = absolutos >= minimo_absoluto
+    score_validos = np.where(validos & ~np.isnan(score), score, np.nan)
+    limiar = np.full(pct.shape[1], np.inf)
+    colunas_com_dados = ~np.isnan(score_validos).all(axis=0)
+    if colunas_com_dados.any():
+        limiar[colunas_com_dados] = np.nanquantile(score_validos[:, colunas_com_dados], 0.70, axis=0)
 
-    return [f'color: {cor};' if s >= limiar and a >= minimo_absoluto else ''
-            for s, a in zip(score, abs_vals)]
+    destaque = validos & (score >= limiar)
+    estilos = np.array([f"color: {cor};" for cor in cores], dtype=object)
+    return np.where(destaque, estilos, "")
 
 
-def gerar_tabela_utm_personalizada(df, campo_utm, filtro_faixa="Todos"):
-    df_valido = df[df[campo_utm].notna() & (df[campo_utm] != "")].copy()
-    df_valido = df_valido[~df_valido[campo_utm].astype(str).str.contains(r"\{\{.*?\}\}")]
-    
+def calcular_distribuicao_utm(df, campo_utm):
+    """
+    Distribuição numérica de leads por valor da UTM e faixa, já ordenada por total
+    e com a linha "TOTAL GERAL" no final. Retorna (contagens, percentuais) ou None.
+    """
+    valores = df[campo_utm]
+    valido = valores.notna() & (valores != "")
+    valores = valores[valido].astype(str)
+    valido = ~valores.str.contains(r"\{\{.*?\}\}")
+
     # 🔒 Garantir que o índice do groupby não contenha 'nan' (como string ou valor real)
-    df_valido[campo_utm] = df_valido[campo_utm].astype(str).str.strip()
-    df_valido = df_valido[df_valido[campo_utm].str.lower() != "nan"]
+    valores = valores[valido].str.strip()
+    valores = valores[valores.str.lower() != "nan"]
 
-    if df_valido.empty:
+    if valores.empty:
         return None
 
-    dist = df_valido.groupby([campo_utm, "leadscore_faixa"]).size().unstack(fill_value=0)
-    dist["Total"] = dist.sum(axis=1)
+    faixas = df.loc[valores.index, "leadscore_faixa"]
+    contagens = pd.crosstab(valores.rename(campo_utm), faixas)
+    contagens.columns.name = None
+    contagens = contagens.loc[contagens.index != "TOTAL GERAL"]
+
+    totais = contagens.sum(axis=1)
+    ordem = np.argsort(-totais.to_numpy(), kind="stable")
+    contagens = contagens.iloc[ordem]
+    contagens.loc["TOTAL GERAL"] = contagens.sum(axis=0)
+    contagens["Total"] = contagens.sum(axis=1)
+
+    valores_faixa = contagens.drop(columns="Total").to_numpy(dtype=float)
+    percentuais = pd.DataFrame(
+        valores_faixa / contagens["Total"].to_numpy(dtype=float)[:, None] * 100,
+        index=contagens.index,
+        columns=contagens.columns.drop("Total")
+    ).round(1)
 
-    percentuais = (dist.drop(columns="Total").T / dist["Total"]).T * 100
-    combinado = dist.drop(columns="Total").astype(str) + " (" + percentuais.round(1).astype(str) + "%)"
-    combinado["Total"] = dist["Total"]
+    return contagens, percentuais
 
-    combinado = combinado.sort_values(by="Total", ascending=False)
 
-    # 🔒 Remover qualquer índice residual que seja "nan"
-    combinado = combinado[combinado.index.astype(str).str.lower() != "nan"]
+def gerar_tabela_utm_personalizada(df, campo_utm, filtro_faixa="Todos"):
+    resultado = calcular_distribuicao_utm(df, campo_utm)
+    if resultado is None:
+        return None
+    contagens, percentuais = resultado
+
+    # Formatação apenas para exibição: "12 (34.5%)"
+    faixas = list(percentuais.columns)
+    exibicao = contagens[faixas].astype(str) + " (" + percentuais.astype(str) + "%)"
+    exibicao["Total"] = contagens["Total"]
+
+    # Estilos calculados a partir dos arrays numéricos
+    cores_destaque = {"A": "green", "B": "green", "D": "red"}
+    colunas_destaque = [faixa for faixa in cores_destaque if faixa in faixas]
+    estilos = pd.DataFrame("", index=exibicao.index, columns=exibicao.columns)
+    if colunas_destaque:
+        estilos[colunas_destaque] = destacar_maiores_com_ponderacao(
+            percentuais[colunas_destaque].to_numpy(),
+            contagens[colunas_destaque].to_numpy(),
+            cores=[cores_destaque[faixa] for faixa in colunas_destaque]
+        )
 
-    soma_col = dist.sum()
-    linha_total = soma_col.drop("Total").astype(int).astype(str) + " (" + \
-                  (soma_col.drop("Total") / soma_col["Total"] * 100).round(1).astype(str) + "%)"
-    linha_total["Total"] = int(soma_col["Total"])
+    return exibicao.style.apply(lambda _: estilos, axis=None)
+
+
+# === Plataformas de anúncio ===
+# Para incluir uma nova plataforma (ex.: TikTok, YouTube), basta adicionar uma entrada aqui
+# e disponibilizar o parquet de investimento correspondente.
+PLATAFORMAS_ANUNCIO = {
+    "facebook": {
+        "titulo": "Facebook Ads",
+        "utm_source": "facebook-ads",
+        "chave_lead": "utm_content",
+        "chave_cpl": "criativo",
+        "coluna_cpl": "cpl",
+        "arquivo_cpl": "invest_trafego_face.parquet",
+    },
+    "google": {
+        "titulo": "Google Ads",
+        "utm_source": "google-ads",
+        "chave_lead": "utm_campaign",
+        "chave_cpl": "campanha",
+        "coluna_cpl": "cpl",
+        "arquivo_cpl": "invest_trafego_google.parquet",
+    },
+}
+
+
+def _normalizar_codigos(serie, maiusculo=False):
+    """
+    Normaliza (strip + lower/upper) apenas os valores distintos da série.
+    Retorna os códigos por linha (-1 para nulos/vazios) e os valores normalizados.
+    """
+    codigos, unicos = pd.factorize(serie)
+    unicos = pd.Index(unicos.astype(str)).str.strip()
+    unicos = unicos.str.upper() if maiusculo else unicos.str.lower()
 
-    combinado_sem_total = combinado.loc[combinado.index != "TOTAL GERAL"]
-    combinado = pd.concat([combinado_sem_total, pd.DataFrame([linha_total], index=["TOTAL GERAL"])])
+    # Valores que viram iguais após normalizar passam a compartilhar o mesmo código
+    codigos_norm, valores = pd.factorize(unicos)
+    codigos_norm = np.append(codigos_norm, -1)
+    codigos = codigos_norm[codigos]
 
-    styled = combinado.style
-    for col in ["A", "B"]:
-        if col in combinado.columns:
-            styled = styled.apply(destacar_maiores_com_ponderacao, subset=[col], axis=0, cor="green")
-    if "D" in combinado.columns:
-        styled = styled.apply(destacar_maiores_com_ponderacao, subset=["D"], axis=0, cor="red")
+    vazio = np.flatnonzero(valores == "")
+    if len(vazio):
+        codigos[codigos == vazio[0]] = -1
 
-    return styled
+    return codigos, valores
 
 
-def gerar_tabela_facebook_com_cpl(df_base, df_cpl_face):
-    df = df_base.copy()
-    df["utm_source"] = df["utm_source"].astype(str).str.strip().str.lower()
-    df["utm_content"] = df["utm_content"].astype(str).str.strip().str.lower()
-    df["leadscore_faixa"] = df["leadscore_faixa"].astype(str).str.strip().str.upper()
-
-    df = df[
-        (df["utm_source"] == "facebook-ads") &
-        df["utm_content"].notna() &
-        (df["utm_content"] != "")
-    ].copy()
-
-    dist = df.groupby(["utm_content", "leadscore_faixa"]).size().unstack(fill_value=0)
-    for faixa in ["A", "B", "C", "D"]:
-        if faixa not in dist.columns:
-            dist[faixa] = 0
-    dist["total"] = dist[["A", "B", "C", "D"]].sum(axis=1)
-    for faixa in ["A", "B", "C", "D"]:
-        dist[faixa] = (dist[faixa] / dist["total"] * 100).round(1)
-
-    df_cpl = df_cpl_face.copy()
-    df_cpl["criativo"] = df_cpl["criativo"].astype(str).str.strip().str.lower()
-    cpl_info = df_cpl[["criativo", "cpl"]].drop_duplicates().set_index("criativo")
-
-    tabela = dist.merge(cpl_info, left_index=True, right_index=True, how="left").reset_index()
-    tabela.rename(columns={
-        "utm_content": "criativo",
-        "A": "% faixa A",
-        "B": "% faixa B",
-        "C": "% faixa C",
-        "D": "% faixa D",
-        "total": "total leads",
-        "cpl": "CPL"
-    }, inplace=True)
-    # Converter para número (coerção segura)
-    tabela["CPL"] = pd.to_numeric(tabela["CPL"], errors="coerce")
-    
-    # Remover linhas com CPL inválido (NaN)
-    tabela = tabela[~tabela["CPL"].isna()].copy()
-    
-    return tabela
+def preparar_tabela_cpl(df_cpl, plataforma):
+    """
+    Normaliza a chave de junção da tabela de CPL uma única vez (no carregamento)
+    e devolve o CPL numérico indexado por essa chave.
+    """
+    config = PLATAFORMAS_ANUNCIO[plataforma]
+    chaves = df_cpl[config["chave_cpl"]].astype(str).str.strip().str.lower()
+    cpl = pd.to_numeric(df_cpl[config["coluna_cpl"]], errors="coerce")
 
+    tabela_cpl = pd.Series(cpl.to_numpy(), index=pd.Index(chaves, name=config["chave_cpl"]), name="CPL")
+    tabela_cpl = tabela_cpl.dropna()
+    return tabela_cpl[~tabela_cpl.index.duplicated(keep="first")]
 
 
-def gerar_tabela_google_com_cpl(df_base, df_cpl_google):
-    df = df_base[
-        (df_base["utm_source"] == "google-ads") &
-        df_base["utm_campaign"].notna()
-    ].copy()
-
-    df["utm_campaign"] = df["utm_campaign"].str.strip().str.lower()
-    df["leadscore_faixa"] = df["leadscore_faixa"].astype(str).str.strip().str.upper()
-
-    dist = df.groupby(["utm_campaign", "leadscore_faixa"]).size().unstack(fill_value=0)
-    for faixa in ["A", "B", "C", "D"]:
-        if faixa not in dist.columns:
-            dist[faixa] = 0
-    dist["total"] = dist[["A", "B", "C", "D"]].sum(axis=1)
-    for faixa in ["A", "B", "C", "D"]:
-        dist[faixa] = (dist[faixa] / dist["total"] * 100).round(1)
-
-    df_cpl = df_cpl_google.copy()
-    df_cpl["campanha"] = df_cpl["campanha"].astype(str).str.strip().str.lower()
-    cpl_info = df_cpl[["campanha", "cpl"]].drop_duplicates().set_index("campanha")
-
-    tabela = dist.merge(cpl_info, left_index=True, right_index=True, how="left").reset_index()
-    tabela.rename(columns={
-        "utm_campaign": "campanha",
-        "A": "% faixa A",
-        "B": "% faixa B",
-        "C": "% faixa C",
-        "D": "% faixa D",
-        "total": "total leads",
-        "cpl": "CPL"
-    }, inplace=True)
-    tabela = tabela[~tabela["CPL"].isna()].copy()
-    
-    return tabela
+def gerar_tabela_atribuicao_com_cpl(df_base, tabela_cpl, plataforma):
+    """
+    Distribuição percentual das faixas por criativo/campanha de uma plataforma,
+    calculada em uma única passada agrupada e cruzada com o CPL indexado.
+    """
+    config = PLATAFORMAS_ANUNCIO[plataforma]
+    if not isinstance(tabela_cpl, pd.Series):
+        tabela_cpl = preparar_tabela_cpl(tabela_cpl, plataforma)
+
+    faixas = ["A", "B", "C", "D"]
+    colunas_saida = [config["chave_cpl"]] + [f"% faixa {f}" for f in faixas] + ["total leads", "CPL"]
+
+    codigos_source, sources = _normalizar_codigos(df_base["utm_source"])
+    codigos_chave, chaves = _normalizar_codigos(df_base[config["chave_lead"]])
+    codigos_faixa, valores_faixa = _normalizar_codigos(df_base["leadscore_faixa"], maiusculo=True)
+
+    # Traduz os códigos de faixa para a posição em A, B, C, D (-1 se fora)
+    posicao_faixa = np.append(pd.Index(faixas).get_indexer(valores_faixa), -1)[codigos_faixa]
+
+    idx_source = np.flatnonzero(sources == config["utm_source"])
+    mascara = (
+        (codigos_source == (idx_source[0] if len(idx_source) else -2)) &
+        (codigos_chave >= 0) &
+        (posicao_faixa >= 0)
+    )
+    if not mascara.any():
+        return pd.DataFrame(columns=colunas_saida)
 
+    # Contagem chave x faixa em uma única passada
+    combinados = codigos_chave[mascara] * len(faixas) + posicao_faixa[mascara]
+    contagens = np.bincount(combinados, minlength=len(chaves) * len(faixas)).reshape(len(chaves), len(faixas))
+    total = contagens.sum(axis=1)
+    presentes = total > 0
+
+    contagens, total = contagens[presentes], total[presentes]
+    percentuais = np.round(contagens / total[:, None] * 100, 1)
+
+    tabela = pd.DataFrame(percentuais, columns=[f"% faixa {f}" for f in faixas])
+    tabela.insert(0, config["chave_cpl"], chaves[presentes])
+    tabela["total leads"] = total
+    tabela["CPL"] = tabela_cpl.reindex(chaves[presentes]).to_numpy()
+
+    # Remover linhas sem CPL válido
+    return tabela[tabela["CPL"].notna()].reset_index(drop=True)[colunas_saida]
+
+
+def gerar_tabela_facebook_com_cpl(df_base, df_cpl_face):
+    return gerar_tabela_atribuicao_com_cpl(df_base, df_cpl_face, "facebook")
+
+
+def gerar_tabela_google_com_cpl(df_base, df_cpl_google):
+    return gerar_tabela_atribuicao_com_cpl(df_base, df_cpl_google, "google")
 
 
 def gerar_tabela_estatisticas_leadscore(df_leads):
@@ -309,21 +377,113 @@ def gerar_tabela_estatisticas_leadscore(df_leads):
     )
 
 
-def detalhar_leadscore_por_variavel(df, indice, score_map):
+def calcular_contribuicoes_leadscore(df, score_map, limites=None):
+    """
+    Contribuição de cada variável no leadscore para todos os leads de uma vez
+    (lookup por código em notebooks/src/leadscore_score.py).
+    """
+    contribuicoes = calcular_contribuicoes(df, score_map)
+    resultado = pd.DataFrame(contribuicoes, index=df.index)
+    resultado["Score Total"] = somar_contribuicoes(contribuicoes)
+    if limites is not None:
+        resultado["Faixa"] = classificar_faixas(resultado["Score Total"], limites)
+    return resultado
+
+
+@st.cache_data(show_spinner=False)
+def _calcular_contribuicoes_cache(_df, score_map, limites, chave):
+    return calcular_contribuicoes_leadscore(_df, score_map, limites)
+
+
+def detalhar_leadscore_por_variavel(df, indice, score_map, contribuicoes=None):
+    if contribuicoes is None:
+        contribuicoes = calcular_contribuicoes_leadscore(df.iloc[[indice]], score_map)
+        posicao = 0
+    else:
+        posicao = indice
+
     row = df.iloc[indice]
-    detalhes = []
-    for var in score_map.keys():
-        resposta = str(row.get(var)).strip()
-        score = score_map[var].get(resposta, 0)
-        detalhes.append({
-            "Variável": var,
-            "Resposta": resposta,
-            "Score": round(score, 2)
-        })
-    return pd.DataFrame(detalhes)
-
-
-def gerar_comparativo_faixas(df_leads):
+    linha_scores = contribuicoes.iloc[posicao]
+    return pd.DataFrame({
+        "Variável": list(score_map.keys()),
+        "Resposta": [str(row.get(var)).strip() for var in score_map],
+        "Score": [round(linha_scores[var], 2) for var in score_map]
+    })
+
+
+def gerar_ranking_leadscore(contribuicoes, ordenar_por="Score Total", crescente=False, busca=None, df_respostas=None):
+    """
+    Ranking dos leads a partir da matriz de contribuições, com busca opcional
+    pelo texto das respostas. A coluna "ID" é a posição do lead no DataFrame filtrado.
+    """
+    ranking = contribuicoes.reset_index(drop=True)
+    ranking.insert(0, "ID", np.arange(len(ranking)))
+
+    if busca and df_respostas is not None:
+        busca = busca.strip().lower()
+        encontrados = np.zeros(len(ranking), dtype=bool)
+        for col in df_respostas.columns:
+            codigos, unicos = pd.factorize(df_respostas[col])
+            bate = pd.Index(unicos).astype(str).str.lower().str.contains(busca, regex=False)
+            encontrados |= np.append(bate, False)[codigos]
+        ranking = ranking[encontrados]
+
+    return ranking.sort_values(by=ordenar_por, ascending=crescente, kind="stable")
+
+
+@st.cache_data(show_spinner=False)
+def _gerar_ranking_cache(_contribuicoes, _df_respostas, chave, ordenar_por, crescente, busca):
+    return gerar_ranking_leadscore(_contribuicoes, ordenar_por, crescente, busca, _df_respostas)
+
+
+def calcular_matriz_faixas(df_leads, colunas):
+    """
+    Matriz normalizada faixa x (variável, categoria) com o percentual de leads
+    de cada faixa em cada categoria, calculada com um crosstab por variável.
+    """
+    partes = {}
+    for col in colunas:
+        if col in df_leads.columns:
+            partes[col] = pd.crosstab(df_leads["leadscore_faixa"], df_leads[col], normalize="index") * 100
+
+    matriz = pd.concat(partes, axis=1, names=["variavel", "categoria"]).fillna(0)
+    return matriz.sort_index()
+
+
+@st.cache_data(show_spinner=False)
+def _calcular_matriz_faixas_cache(_df_leads, colunas, versao_dados):
+    return calcular_matriz_faixas(_df_leads, list(colunas))
+
+
+def comparar_faixas(matriz, faixa1, faixa2, diferenca=None):
+    """
+    Compara duas faixas quaisquer a partir da matriz de percentuais.
+    A diferença pode ser passada já calculada (ex.: diferenças consecutivas).
+    """
+    col_diff = f"diferença entre {faixa1} e {faixa2}"
+    pct1 = matriz.loc[faixa1].to_numpy() if faixa1 in matriz.index else np.zeros(matriz.shape[1])
+    pct2 = matriz.loc[faixa2].to_numpy() if faixa2 in matriz.index else np.zeros(matriz.shape[1])
+    if diferenca is None:
+        diferenca = pct1 - pct2
+
+    # Apenas categorias presentes em pelo menos uma das duas faixas
+    presentes = (pct1 > 0) | (pct2 > 0)
+    categorias = matriz.columns[presentes]
+
+    resultado = pd.DataFrame({
+        "faixa_origem": faixa1,
+        "faixa_destino": faixa2,
+        "variavel": categorias.get_level_values("variavel"),
+        "categoria": categorias.get_level_values("categoria"),
+        f"% {faixa1}": np.round(pct1[presentes], 2),
+        f"% {faixa2}": np.round(pct2[presentes], 2),
+        col_diff: np.round(diferenca[presentes], 2)
+    })
+
+    return resultado.sort_values(by=col_diff, key=abs, ascending=False, kind="stable")
+
+
+def gerar_comparativo_faixas(df_leads, versao_dados=None):
     st.markdown("---")
     st.markdown("### Comparação entre Faixas de Leadscore")
     st.markdown("""
@@ -333,31 +493,11 @@ def gerar_comparativo_faixas(df_leads):
 
     cols_to_analyze = ["renda", "escolaridade", "idade", "filhos", "estado_civil", "escolheu_profissao"]
 
-    # Função auxiliar para comparar faixas
-    def comparar_faixas(df, colunas, faixa1, faixa2):
-        resultados = []
-        for col in colunas:
-            dist1 = df[df["leadscore_faixa"] == faixa1][col].value_counts(normalize=True) * 100
-            dist2 = df[df["leadscore_faixa"] == faixa2][col].value_counts(normalize=True) * 100
-            todas_categorias = set(dist1.index).union(dist2.index)
-
-            for cat in todas_categorias:
-                pct1 = dist1.get(cat, 0)
-                pct2 = dist2.get(cat, 0)
-                diff = round(pct1 - pct2, 2)
-                resultados.append({
-                    "faixa_origem": faixa1,
-                    "faixa_destino": faixa2,
-                    "variavel": col,
-                    "categoria": cat,
-                    f"% {faixa1}": round(pct1, 2),
-                    f"% {faixa2}": round(pct2, 2),
-                    f"diferença entre {faixa1} e {faixa2}": diff
-                })
-
-        return pd.DataFrame(resultados).sort_values(
-            by=f"diferença entre {faixa1} e {faixa2}", key=abs, ascending=False
-        )
+    # Matriz única por versão dos dados (cacheada entre reruns do Streamlit)
+    if versao_dados is None:
+        matriz = calcular_matriz_faixas(df_leads, cols_to_analyze)
+    else:
+        matriz = _calcular_matriz_faixas_cache(df_leads, tuple(cols_to_analyze), versao_dados)
 
     # Função para colorir diferença
     def colorir_diferenca(val):
@@ -388,15 +528,15 @@ def gerar_comparativo_faixas(df_leads):
 
         st.dataframe(styled, use_container_width=True, hide_index=True)
 
-    # Comparações
-    comparacao_ab = comparar_faixas(df_leads, cols_to_analyze, "A", "B")
-    comparacao_bc = comparar_faixas(df_leads, cols_to_analyze, "B", "C")
-    comparacao_cd = comparar_faixas(df_leads, cols_to_analyze, "C", "D")
+    # Diferenças entre faixas consecutivas em uma única subtração
+    faixas = ["A", "B", "C", "D"]
+    matriz = matriz.reindex(faixas, fill_value=0)
+    diferencas = matriz.to_numpy()[:-1] - matriz.to_numpy()[1:]
 
-    # Mostrar
-    formatar_e_mostrar(comparacao_ab, "A", "B", "🟢")
-    formatar_e_mostrar(comparacao_bc, "B", "C", "🟡")
-    formatar_e_mostrar(comparacao_cd, "C", "D", "🔴")
+    for i, cor_emoji in enumerate(["🟢", "🟡", "🔴"]):
+        faixa1, faixa2 = faixas[i], faixas[i + 1]
+        comparacao = comparar_faixas(matriz, faixa1, faixa2, diferenca=diferencas[i])
+        formatar_e_mostrar(comparacao, faixa1, faixa2, cor_emoji)
 
 
 def gerar_tabela_distribuicao_categorias(df_leads):
@@ -444,7 +584,7 @@ def gerar_tabela_distribuicao_categorias(df_leads):
     st.dataframe(df_resumo_pivot, use_container_width=True, hide_index=True)
 
 
-def mostrar_lift_e_calculo_individual(tabelas_lift, df_leads, score_map, limites):
+def mostrar_lift_e_calculo_individual(tabelas_lift, df_leads, score_map, limites, versao_dados=None):
     col1, col2 = st.columns(2)
 
     with col1:
@@ -484,25 +624,25 @@ def mostrar_lift_e_calculo_individual(tabelas_lift, df_leads, score_map, limites
 
         st.caption(f"📊 Total de leads disponíveis: {len(df_filtrado):,}")
 
+        # Contribuições de todos os leads filtrados (cacheadas por versão dos dados + lançamento)
+        if versao_dados is None:
+            contribuicoes = calcular_contribuicoes_leadscore(df_filtrado, score_map, limites)
+        else:
+            contribuicoes = _calcular_contribuicoes_cache(
+                df_filtrado, score_map, limites, (versao_dados, filtro_lancamento)
+            )
+
         indice = st.number_input(
             "Selecione o ID do Lead para visualizar o cálculo de Leadscore sendo aplicado:",
             min_value=0, max_value=len(df_filtrado) - 1,
             value=0, step=1
         )
 
-        detalhes = detalhar_leadscore_por_variavel(df_filtrado, indice, score_map)
+        detalhes = detalhar_leadscore_por_variavel(df_filtrado, indice, score_map, contribuicoes)
         st.dataframe(detalhes, use_container_width=True, hide_index=True)
 
-        score_calc = detalhes["Score"].sum()
-
-        if score_calc >= limites["limite_a"]:
-            faixa = "A"
-        elif score_calc >= limites["limite_b"]:
-            faixa = "B"
-        elif score_calc >= limites["limite_c"]:
-            faixa = "C"
-        else:
-            faixa = "D"
+        score_calc = contribuicoes["Score Total"].iloc[indice]
+        faixa = contribuicoes["Faixa"].iloc[indice]
 
         st.markdown(
             f"""
@@ -511,4 +651,88 @@ def mostrar_lift_e_calculo_individual(tabelas_lift, df_leads, score_map, limites
             </div>
             """,
             unsafe_allow_html=True
-        )
\ No newline at end of file
+        )
+
+    # === Ranking navegável dos leads ===
+    st.write("")
+    st.markdown("#### Ranking de Leads por Leadscore")
+
+    col_ordem, col_sentido, col_busca, col_tamanho = st.columns([1, 1, 2, 1])
+    with col_ordem:
+        ordenar_por = st.selectbox("Ordenar por:", ["Score Total"] + list(score_map.keys()), key="ranking_ordem")
+    with col_sentido:
+        sentido = st.selectbox("Ordem:", ["Maior para menor", "Menor para maior"], key="ranking_sentido")
+    with col_busca:
+        busca = st.text_input("Buscar nas respostas:", key="ranking_busca")
+    with col_tamanho:
+        tamanho_pagina = st.selectbox("Leads por página:", [25, 50, 100], key="ranking_tamanho")
+
+    # Ordenação/busca cacheadas: trocar de página não recalcula o ranking
+    colunas_respostas = [var for var in score_map if var in df_filtrado.columns]
+    crescente = sentido == "Menor para maior"
+    if versao_dados is None:
+        ranking = gerar_ranking_leadscore(contribuicoes, ordenar_por, crescente, busca, df_filtrado[colunas_respostas])
+    else:
+        ranking = _gerar_ranking_cache(
+            contribuicoes, df_filtrado[colunas_respostas], (versao_dados, filtro_lancamento),
+            ordenar_por, crescente, busca
+        )
+
+    total_paginas = max(1, int(np.ceil(len(ranking) / tamanho_pagina)))
+    col_pagina, _ = st.columns([1, 4])
+    with col_pagina:
+        pagina = st.number_input("Página:", min_value=1, max_value=total_paginas, value=1, step=1, key="ranking_pagina")
+
+    inicio = (pagina - 1) * tamanho_pagina
+    st.caption(f"Página {pagina} de {total_paginas} | {len(ranking):,} leads encontrados")
+    st.dataframe(
+        ranking.iloc[inicio:inicio + tamanho_pagina].round(2),
+        use_container_width=True,
+        hide_index=True
+    )
+
+
+@st.cache_data(show_spinner=False)
+def carregar_monitor_drift_atualizado(caminho, _df_leads, versao_dados):
+    """
+    Carrega o monitor de drift e acrescenta os leads que ele ainda não contou (uma vez por
+    versão dos dados). A atualização fica só em memória: quem grava o monitor é
+    scripts/atualizar_drift.py.
+    """
+    estado = carregar_monitor_drift(caminho)
+    atualizar_monitor_drift(estado, _df_leads)
+    return estado
+
+
+def mostrar_monitor_drift(estado):
+    def colorir_situacao(val):
+        return {"alto": "color: red", "moderado": "color: orange", "estável": "color: green"}.get(val, "color: gray")
+
+    col_filtro, _ = st.columns([1, 5])
+    with col_filtro:
+        por = st.selectbox("Agrupar por:", ["lancamento", "dia"], key="drift_agrupamento")
+
+    resumo = resumo_drift(estado, por)
+    if resumo.empty:
+        st.info("Nenhum lead acompanhado pelo monitor ainda.")
+        return
+
+    st.caption(
+        f"Referência: {estado['referencia']['n']:,} leads do treino | "
+        f"Leads até: {estado['ultima_data']} | PSI ≥ 0.10 moderado, ≥ 0.25 alto".replace(",", ".")
+    )
+    st.dataframe(
+        resumo.style.format(precision=3).applymap(colorir_situacao, subset=["situacao"]),
+        use_container_width=True,
+        hide_index=True
+    )
+    if por == "dia":
+        st.line_chart(resumo.set_index("dia")[["psi_score", "psi_faixas"]])
+
+    st.download_button(
+        "Baixar resumo de drift (JSON)",
+        data=json.dumps(resumo_drift_json(estado), ensure_ascii=False, indent=2),
+        file_name="drift_leadscore.json",
+        mime="application/json"
+    )
+
@@ -0,0 +1,234 @@
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from sklearn.ensemble import (
+    GradientBoostingClassifier, GradientBoostingRegressor,
+    HistGradientBoostingClassifier, HistGradientBoostingRegressor
+)
+from sklearn.metrics import mean_absolute_error, r2_score, roc_auc_score
+from sklearn.model_selection import RandomizedSearchCV, StratifiedKFold, KFold, train_test_split
+from sklearn.utils import compute_sample_weight
+
+
+VARIAVEIS_PESQUISA = ["renda", "escolaridade", "idade", "estado_civil", "filhos", "escolheu_profissao", "dificuldade"]
+VARIAVEIS_UTM = ["utm_source", "utm_medium", "utm_campaign", "utm_content"]
+VARIAVEIS_ALUNOS = ["renda", "escolaridade", "idade", "filhos", "estado_civil", "escolheu_profissao"]
+
+# O boosting por histograma aceita até 255 categorias por coluna
+MAX_CATEGORIAS = 250
+
+ESPACO_BUSCA = {
+    "learning_rate": [0.03, 0.05, 0.1, 0.2],
+    "max_leaf_nodes": [15, 31, 63],
+    "min_samples_leaf": [20, 50, 100],
+    "l2_regularization": [0.0, 0.1, 1.0],
+}
+
+
+# === Preparação das variáveis ===
+
+def mapear_categorias(df, colunas, max_categorias=MAX_CATEGORIAS):
+    """Categorias mais frequentes de cada coluna (as demais são tratadas como desconhecidas)."""
+    return {
+        col: df[col].dropna().astype(str).str.strip().value_counts().index[:max_categorias].tolist()
+        for col in colunas
+        if col in df.columns
+    }
+
+
+def codificar_categoricas(df, categorias, numericas=()):
+    """
+    Codifica as colunas categóricas como códigos inteiros (NaN = ausente/desconhecida)
+    na ordem de `categorias`, seguidas das colunas numéricas.
+    """
+    X = pd.DataFrame(index=df.index)
+    for col, cats in categorias.items():
+        valores = df[col].astype(str).str.strip() if col in df.columns else pd.Series("", index=df.index)
+        codigos = pd.Categorical(valores, categories=cats).codes.astype(float)
+        codigos[codigos < 0] = np.nan
+        X[col] = codigos
+    for col in numericas:
+        X[col] = df[col].astype(float)
+    return X
+
+
+def _mascara_categoricas(categorias, numericas):
+    return np.array([True] * len(categorias) + [False] * len(numericas))
+
+
+def _modelo_hist(classificacao, mascara, random_state=42):
+    classe = HistGradientBoostingClassifier if classificacao else HistGradientBoostingRegressor
+    return classe(
+        categorical_features=mascara,
+        max_iter=500,
+        early_stopping=True,
+        validation_fraction=0.1,
+        n_iter_no_change=20,
+        random_state=random_state
+    )
+
+
+def buscar_hiperparametros(X, y, mascara, classificacao=True, sample_weight=None, n_iter=20, n_jobs=-1, random_state=42):
+    """Busca aleatória em paralelo (um candidato x fold por core), com early stopping em cada ajuste."""
+    cv = StratifiedKFold(3, shuffle=True, random_state=random_state) if classificacao else KFold(3, shuffle=True, random_state=random_state)
+    busca = RandomizedSearchCV(
+        _modelo_hist(classificacao, mascara, random_state),
+        ESPACO_BUSCA,
+        n_iter=n_iter,
+        scoring="roc_auc" if classificacao else "r2",
+        cv=cv,
+        n_jobs=n_jobs,
+        random_state=random_state
+    )
+    if sample_weight is None:
+        busca.fit(X, y)
+    else:
+        busca.fit(X, y, sample_weight=sample_weight)
+    return busca
+
+
+# === Modelo de conversão (lead -> aluno) ===
+
+def treinar_modelo_conversao(df_leads, colunas=VARIAVEIS_PESQUISA + VARIAVEIS_UTM, usar_leadscore=True,
+                             n_iter=20, n_jobs=-1, random_state=42):
+    """
+    Treina o modelo de conversão com boosting por histograma e categorias nativas,
+    no mesmo split treino/teste e com os mesmos pesos balanceados do notebook.
+    """
+    y = df_leads["comprou"].to_numpy()
+    idx_treino, idx_teste = train_test_split(np.arange(len(df_leads)), stratify=y, random_state=random_state)
+
+    numericas = ["leadscore_mapeado"] if usar_leadscore else []
+    categorias = mapear_categorias(df_leads.iloc[idx_treino], colunas)
+    X = codificar_categoricas(df_leads, categorias, numericas)
+    mascara = _mascara_categoricas(categorias, numericas)
+    sample_weight = compute_sample_weight(class_weight="balanced", y=y[idx_treino])
+
+    inicio = time.time()
+    busca = buscar_hiperparametros(
+        X.iloc[idx_treino], y[idx_treino], mascara, True, sample_weight, n_iter, n_jobs, random_state
+    )
+    tempo = time.time() - inicio
+
+    return {
+        "modelo": busca.best_estimator_,
+        "categorias": categorias,
+        "numericas": numericas,
+        "melhores_parametros": busca.best_params_,
+        "tempo_treino_s": round(tempo, 2),
+        "roc_auc": roc_auc_score(y[idx_teste], busca.best_estimator_.predict_proba(X.iloc[idx_teste])[:, 1]),
+    }
+
+
+def treinar_conversao_atual(df_leads, colunas=VARIAVEIS_PESQUISA, random_state=42):
+    """Modelo atual do notebook (one-hot + GradientBoostingClassifier com pesos balanceados), como referência."""
+    X = pd.get_dummies(df_leads[colunas], drop_first=False)
+    X["leadscore_mapeado"] = df_leads["leadscore_mapeado"]
+    y = df_leads["comprou"]
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, stratify=y, random_state=random_state)
+    sample_weight = compute_sample_weight(class_weight="balanced", y=y_train)
+
+    inicio = time.time()
+    modelo = GradientBoostingClassifier(random_state=random_state)
+    modelo.fit(X_train, y_train, sample_weight=sample_weight)
+    tempo = time.time() - inicio
+
+    return {
+        "modelo": modelo,
+        "colunas": X.columns.tolist(),
+        "tempo_treino_s": round(tempo, 2),
+        "roc_auc": roc_auc_score(y_test, modelo.predict_proba(X_test)[:, 1]),
+    }
+
+
+def comparar_modelos_conversao(df_leads, n_iter=20, n_jobs=-1):
+    """Tempo de treino e ROC AUC (mesmo conjunto de teste) do modelo atual x boosting por histograma."""
+    atual = treinar_conversao_atual(df_leads)
+    hist_pesquisa = treinar_modelo_conversao(df_leads, VARIAVEIS_PESQUISA, n_iter=n_iter, n_jobs=n_jobs)
+    hist_utm = treinar_modelo_conversao(df_leads, VARIAVEIS_PESQUISA + VARIAVEIS_UTM, n_iter=n_iter, n_jobs=n_jobs)
+
+    comparativo = pd.DataFrame([
+        {"modelo": "GradientBoosting (one-hot)", "variaveis": "pesquisa", "ajustes": 1,
+         "tempo_treino_s": atual["tempo_treino_s"], "roc_auc": atual["roc_auc"]},
+        {"modelo": "HistGradientBoosting (categorias nativas)", "variaveis": "pesquisa", "ajustes": n_iter * 3,
+         "tempo_treino_s": hist_pesquisa["tempo_treino_s"], "roc_auc": hist_pesquisa["roc_auc"]},
+        {"modelo": "HistGradientBoosting (categorias nativas)", "variaveis": "pesquisa + UTMs", "ajustes": n_iter * 3,
+         "tempo_treino_s": hist_utm["tempo_treino_s"], "roc_auc": hist_utm["roc_auc"]},
+    ])
+    comparativo["roc_auc"] = comparativo["roc_auc"].round(3)
+    return comparativo, hist_utm
+
+
+# === Modelo de regressão do leadscore ===
+
+def treinar_modelo_regressao(df_alunos, colunas=VARIAVEIS_ALUNOS, n_iter=20, n_jobs=-1, random_state=42):
+    """Regressão do leadscore_mapeado com boosting por histograma (mesmo split do notebook)."""
+    y = df_alunos["leadscore_mapeado"].to_numpy()
+    idx_treino, idx_teste = train_test_split(np.arange(len(df_alunos)), random_state=random_state)
+
+    categorias = mapear_categorias(df_alunos.iloc[idx_treino], colunas)
+    X = codificar_categoricas(df_alunos, categorias)
+    mascara = _mascara_categoricas(categorias, [])
+
+    inicio = time.time()
+    busca = buscar_hiperparametros(X.iloc[idx_treino], y[idx_treino], mascara, False, None, n_iter, n_jobs, random_state)
+    tempo = time.time() - inicio
+
+    y_pred = busca.best_estimator_.predict(X.iloc[idx_teste])
+    return {
+        "modelo": busca.best_estimator_,
+        "categorias": categorias,
+        "numericas": [],
+        "melhores_parametros": busca.best_params_,
+        "tempo_treino_s": round(tempo, 2),
+        "r2": r2_score(y[idx_teste], y_pred),
+        "mae": mean_absolute_error(y[idx_teste], y_pred),
+    }
+
+
+def comparar_modelos_regressao(df_alunos, n_iter=20, n_jobs=-1, random_state=42):
+    """Tempo de treino, R² e MAE do GradientBoostingRegressor atual x boosting por histograma."""
+    X_reg = pd.get_dummies(df_alunos[VARIAVEIS_ALUNOS], drop_first=False)
+    y_reg = df_alunos["leadscore_mapeado"]
+    X_train_r, X_test_r, y_train_r, y_test_r = train_test_split(X_reg, y_reg, random_state=random_state)
+
+    inicio = time.time()
+    modelo_reg = GradientBoostingRegressor(random_state=random_state)
+    modelo_reg.fit(X_train_r, y_train_r)
+    tempo = time.time() - inicio
+    y_pred_r = modelo_reg.predict(X_test_r)
+
+    hist = treinar_modelo_regressao(df_alunos, n_iter=n_iter, n_jobs=n_jobs, random_state=random_state)
+
+    comparativo = pd.DataFrame([
+        {"modelo": "GradientBoosting (one-hot)", "ajustes": 1, "tempo_treino_s": round(tempo, 2),
+         "r2": r2_score(y_test_r, y_pred_r), "mae": mean_absolute_error(y_test_r, y_pred_r)},
+        {"modelo": "HistGradientBoosting (categorias nativas)", "ajustes": n_iter * 3, "tempo_treino_s": hist["tempo_treino_s"],
+         "r2": hist["r2"], "mae": hist["mae"]},
+    ])
+    comparativo[["r2", "mae"]] = comparativo[["r2", "mae"]].round(3)
+    return comparativo, hist
+
+
+# === Uso e exportação ===
+
+def prever_probabilidade(resultado, df):
+    """Probabilidade de conversão para novos leads com o modelo treinado por treinar_modelo_conversao."""
+    X = codificar_categoricas(df, resultado["categorias"], resultado["numericas"])
+    return resultado["modelo"].predict_proba(X)[:, 1]
+
+
+def salvar_modelo_hist(resultado, path_modelos, nome):
+    """Salva o modelo e a codificação das colunas no padrão modelo_<nome>.pkl / colunas_<nome>.pkl."""
+    path_modelos = Path(path_modelos)
+    path_modelos.mkdir(parents=True, exist_ok=True)
+    joblib.dump(resultado["modelo"], path_modelos / f"modelo_{nome}.pkl")
+    joblib.dump(
+        {"categorias": resultado["categorias"], "numericas": resultado["numericas"]},
+        path_modelos / f"colunas_{nome}.pkl"
+    )
@@ -0,0 +1,443 @@
+# normalizacao_respostas.py
+#
+# Regras de limpeza das respostas da pesquisa (estado, escolaridade, estado civil,
+# profissão e dificuldade) usadas pelos notebooks de tratamento de leads, e
+# normalizar_coluna, que aplica qualquer uma delas uma vez por resposta distinta.
+
+import hashlib
+import json
+import re
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# === Estado ===
+
+# Ordem importa: vale o primeiro nome contido na resposta
+ESTADO_SIGLAS = {
+    k.lower(): v for k, v in {
+        'são paulo': 'SP',
+        'sp': 'SP',
+        'rio de janeiro': 'RJ',
+        'rj': 'RJ',
+        'minas gerais': 'MG',
+        'mg': 'MG',
+        'bahia': 'BA',
+        'ba': 'BA',
+        'goiás': 'GO',
+        'goias': 'GO',
+        'go': 'GO',
+        'paraná': 'PR',
+        'pr': 'PR',
+        'espírito santo': 'ES',
+        'es': 'ES',
+        'rio grande do sul': 'RS',
+        'rs': 'RS',
+        'santa catarina': 'SC',
+        'sc': 'SC',
+        'alagoas': 'AL',
+        'al': 'AL',
+        'paraíba': 'PB',
+        'paraiba': 'PB',
+        'pb': 'PB',
+        'pará': 'PA',
+        'pa': 'PA',
+        'maranhão': 'MA',
+        'ma': 'MA',
+        'pernambuco': 'PE',
+        'pe': 'PE',
+        'amazonas': 'AM',
+        'am': 'AM',
+        'rio grande do norte': 'RN',
+        'rn': 'RN',
+        'distrito federal': 'DF',
+        'df': 'DF',
+        'boa vista': 'RR',
+        'rr': 'RR',
+        'ceará': 'CE',
+        'brasília': 'DF',
+        'brasilia': 'DF',
+        'florianopolis': 'SC',
+        'guarulhos': 'SP',
+        'guarujá': 'SP',
+        'Rio das ostras': 'RJ',
+        'Granja': 'RJ',
+        'Ceara': 'CE',
+        'Tocantins': 'TO',
+        'Belém': 'PA',
+        'Acre': 'AC',
+        'Rondônia': 'RO',
+        'Itanhaém': 'SP',
+        'Rio de janriro': 'RJ',
+        'Volta redonda': 'RJ',
+        'Botucatu': 'SP',
+        'Mogi mirim': 'SP',
+        'Feira de Santana': 'BA',
+        'Recife': 'PE',
+        'Joinville': 'SC',
+        'São Bento do Sul': 'SC',
+        'Juazeiro do norte': 'CE'
+    }.items()
+}
+
+def normalizar_estado(valor):
+    if pd.isna(valor):
+        return None
+    texto = str(valor).lower().strip()
+    for nome, sigla in ESTADO_SIGLAS.items():
+        if nome in texto:
+            return sigla
+    return valor
+
+
+# === Escolaridade ===
+
+CATEGORIAS_PERMITIDAS = {
+    'médio completo',
+    'superior completo',
+    'fundamental completo',
+    'superior incompleto',
+    'técnico',
+    'médio incompleto',
+    'fundamental incompleto'
+}
+
+# 1. Pré-processamento
+def limpar_texto_escolaridade(texto):
+    texto = str(texto).lower().strip()
+    return unicodedata.normalize('NFKD', texto).encode('ASCII', 'ignore').decode('utf-8')
+
+# 2. Substituições comuns
+SUBSTITUICOES = {
+    'imcompleto': 'incompleto',
+    'inclopeto': 'incompleto',
+    'incompleta': 'incompleto',
+    'enfetmagem': 'enfermagem',
+    'encino': 'ensino',
+    'esino': 'ensino',
+    'ensaio': 'ensino',
+    'ensino superior incomoda': 'superior incompleto',
+    'sup incompleto mais cursando': 'superior incompleto',
+    'superior curso': 'superior incompleto',
+    'superior engenharia mecanica incompleto': 'superior incompleto',
+    'comecei direito, mas nao finalizei': 'superior incompleto',
+    'faco radiologia': 'superior incompleto',
+}
+
+def aplicar_substituicoes(val):
+    for k, v in SUBSTITUICOES.items():
+        val = val.replace(k, v)
+    return val
+
+# 3. Mapeamento explícito
+MAPEAMENTO_EXPLICITO = {
+    'incompleto': 'superior incompleto',
+    'none': None,
+    'cursando': 'superior incompleto',
+    'setimo ano': 'fundamental incompleto',
+    'comecando a faculdade': 'superior incompleto',
+    'cursando terceiro ano medio': 'médio incompleto',
+    'bombeira civil': 'técnico',
+    'sim': None,
+    'auxiliar de enfermagem': 'técnico',
+    'enfermagem': 'superior incompleto',
+    '5 seria': 'fundamental incompleto',
+    '8 seria': 'fundamental incompleto',
+    'estudante': 'médio incompleto',
+    'pos graduado': 'superior completo',
+    'estou no 2°ano ensino medio': 'médio incompleto',
+    'e completo': 'médio completo',
+    'cursando pedagogia': 'superior incompleto',
+    'cursando gestao em rh': 'superior incompleto',
+    "2'ano": 'fundamental incompleto',
+    'tec enfermagem': 'técnico',
+    'ciencias contabeis': 'superior incompleto',
+    'ensino medio completando': 'médio incompleto',
+    '2': 'fundamental incompleto',
+    'cursando o supervisor': 'superior incompleto',
+    'estudar ainda': 'médio incompleto',
+    'cursando gestao agronegocio': 'superior incompleto',
+    'terapeuta ocupacional ( cursando)': 'superior incompleto',
+    'engenharia nao concluida': 'superior incompleto',
+    'preciso terminar o ensino fundamental': 'fundamental incompleto',
+    'alguns certificados na area da seguranca': 'técnico',
+}
+
+def aplicar_mapeamento_explicito(val):
+    return MAPEAMENTO_EXPLICITO.get(val)
+
+# 4. Categorização padrão
+def categorizar_padrao(val):
+    if any(p in val for p in ['fundamental incompleto', 'parei no', 'nao terminei fundamental', 'nono ano', 'quint', 'sere', 'serie']) \
+       or re.search(r'\b[1-9]{1,2}[ºo]?\s*(ano|serie)', val) and 'medio' not in val:
+        return 'fundamental incompleto'
+
+    if 'fundamental completo' in val or 'primeiro grau completo' in val:
+        return 'fundamental completo'
+
+    if any(p in val for p in ['ensino medio incompleto', 'medio incompleto', '2º colegial incompleto', 'eja', 'ensino medio nao']):
+        return 'médio incompleto'
+
+    if any(p in val for p in ['ensino medio completo', 'medio completo', 'magisterio']):
+        return 'médio completo'
+
+    if any(p in val for p in ['superior completo', 'graduacao completa', 'nivel superior completo', 'pos-graduacao', 'pos graduacao']) \
+       or ('graduacao' in val and 'cursando' not in val and 'incompleto' not in val):
+        return 'superior completo'
+
+    if any(p in val for p in ['tecnico', 'tecnologo', 'tecnologia', 'curso tec']):
+        return 'técnico'
+
+    if any(v in val for v in ['cursando', 'concluindo', 'fazendo', 'em andamento', 'graduando', 'estudando', 'terminando']):
+        if any(n in val for n in ['superior', 'faculdade', 'universidade', 'direito', 'biomedicina', 'administracao']):
+            return 'superior incompleto'
+        elif 'ensino medio' in val or 'medio' in val or 'colegial' in val:
+            return 'médio incompleto'
+        elif 'fundamental' in val or 'serie' in val:
+            return 'fundamental incompleto'
+
+    if re.search(r'[0-9]{1,2}.*semestre', val) or 'periodo' in val:
+        return 'superior incompleto'
+
+    return val
+
+# 5. Ajustes finais
+AJUSTES_FINAIS = {
+    'pos graduado': 'superior completo',
+    'pos graduada': 'superior completo',
+    'pos-graduacao': 'superior completo',
+    'pos-graduada': 'superior completo',
+    'pos graduado em gestao de projetos': 'superior completo',
+    'mestrado': 'superior completo',
+    'mba': 'superior completo',
+    'cursando graduacao': 'superior incompleto',
+    'cursando graduacao em radiologia': 'superior incompleto',
+    'cursando graduacao em enfermagem': 'superior incompleto',
+    'cursanso ensino superior': 'superior incompleto',
+    'cursanso faculdade': 'superior incompleto',
+    'superior incompleto ☹️': 'superior incompleto',
+    'estou, termiando o ensino medio!': 'médio incompleto',
+    '8 incompleto': 'fundamental incompleto',
+}
+
+def aplicar_ajustes_finais(val):
+    return AJUSTES_FINAIS.get(val, val)
+
+def normalizar_escolaridade(valor, limpar=limpar_texto_escolaridade):
+    if pd.isna(valor):
+        return None
+
+    val = limpar(valor)
+    val = aplicar_substituicoes(val)
+
+    mapeado = aplicar_mapeamento_explicito(val)
+    if mapeado:
+        val = mapeado
+    else:
+        val = categorizar_padrao(val)
+
+    val = aplicar_ajustes_finais(val)
+
+    if val not in CATEGORIAS_PERMITIDAS:
+        return None
+
+    return val
+
+def normalizar_escolaridade_sem_pontuacao(valor):
+    """
+    normalizar_escolaridade com a limpeza do estado civil (sem pontuação), como os notebooks
+    normalizavam as bases do Google e do Elementor (L28–L33) e o df_leads_l34.
+    """
+    return normalizar_escolaridade(valor, limpar=limpar_texto_estado_civil)
+
+
+# === Estado civil ===
+
+CATEGORIAS_VALIDAS_ESTADO_CIVIL = {
+    'solteiro(a)',
+    'casado(a)',
+    'divorciado(a)',
+    'união estável',
+    'viúvo(a)'
+}
+
+def limpar_texto_estado_civil(texto):
+    texto = str(texto).strip().lower()
+    texto = unicodedata.normalize('NFKD', texto).encode('ASCII', 'ignore').decode('utf-8')
+    texto = re.sub(r'[^\w\s]', '', texto)  # remove pontuação
+    return texto
+
+def normalizar_estado_civil(valor):
+    if pd.isna(valor):
+        return None
+
+    val = limpar_texto_estado_civil(valor)
+
+    if val in {'solteiroa', 'solteiro', 'viuvo solteiro'}:
+        return 'solteiro(a)'
+
+    if val in {'casadoa', 'tenho esposa e filhos mais nao casado formalmente'}:
+        return 'casado(a)'
+
+    if val in {
+        'divorciadoa ou separadora', 'divorciadoa', 'separado', 'separada', 'em processo de separacao',
+        'divorciando', 'divorciado uniao estavel'
+    }:
+        return 'divorciado(a)'
+
+    if val in {
+        'uniao estavel', 'moro junto', 'mora junto', 'moramos juntos', 'morando junto',
+        'morando com alguem', 'convivente', 'amigado', 'amigada', 'amaziado',
+        'moro com um pessoal', 'tenho companheira e filhos', 'moro a 20 anos',
+        'moro a mais de 5 anos com minha conjuge', 'ajuntado sem uniao estavel', 'namorando'
+    } or 'moro junto' in val or 'com meu parceiro' in val:
+        return 'união estável'
+
+    if val in {'viuva', 'viuvo', 'viuva de companheiro'}:
+        return 'viúvo(a)'
+
+    return valor  # mantém valor original se não reconhecido
+
+# Ajustes finais de exceções residuais
+AJUSTES_FINAIS_ESTADO_CIVIL = {
+    'vendendor autonomo e sou vigilante': None,
+    'estou terminado o ensino medio': None,
+    '5serie': None,
+    'enrolada': 'união estável',
+    'leandro alves': None
+}
+
+def aplicar_ajustes_finais_estado_civil(valor):
+    if valor in CATEGORIAS_VALIDAS_ESTADO_CIVIL:
+        return valor  # já está padronizado
+
+    val_limpo = limpar_texto_estado_civil(valor)
+    return AJUSTES_FINAIS_ESTADO_CIVIL.get(val_limpo, None)  # se não reconhecido, descarta
+
+
+# === Profissão e dificuldade (respostas simples) ===
+
+CATEGORIAS_VALIDAS_PROFISSAO = {
+    'sonho de criança',
+    'gosta da profissão',
+    'estabilidade de emprego',
+    'prestígio da carreira',
+    'segurança'
+}
+
+def limpar_profissao_simples(valor):
+    if pd.isna(valor):
+        return None
+
+    val = str(valor).strip().lower().strip("., ")
+    return val if val in CATEGORIAS_VALIDAS_PROFISSAO else None
+
+DIFICULDADES_VALIDAS = {
+    'financeiro / dinheiro',
+    'falta de tempo',
+    'falta de base escolar',
+    'falta de oportunidade',
+    'idade'
+}
+
+def limpar_dificuldade_simples(valor):
+    if pd.isna(valor):
+        return None
+
+    val = str(valor).strip().lower().strip("., ")
+    return val if val in DIFICULDADES_VALIDAS else None
+
+# Variações conhecidas do formulário do Elementor
+SUBSTITUICOES_DIFICULDADE = {
+    'falta de oportunidades na vida': 'falta de oportunidade',
+    'financeiro \\/ dinheiro': 'financeiro / dinheiro'
+}
+
+def normalizar_dificuldade(valor):
+    if pd.isna(valor):
+        return None
+    val = str(valor).strip().lower()
+
+    for k, v in SUBSTITUICOES_DIFICULDADE.items():
+        val = val.replace(k, v)
+
+    if ',' in val:
+        return None
+
+    return val if val in DIFICULDADES_VALIDAS else None
+
+
+# === Aplicação por valor distinto ===
+
+_memos = {}            # funcao -> {resposta: resultado}, vale para a sessão inteira
+_memos_carregados = set()
+
+def _versao_regras():
+    """Hash do código deste módulo: mudou uma regra, o memo em disco deixa de valer."""
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+def _arquivo_memo(pasta_memo, funcao):
+    return Path(pasta_memo) / f"{funcao.__name__}.json"
+
+def _carregar_memo(pasta_memo, funcao, memo):
+    arquivo = _arquivo_memo(pasta_memo, funcao)
+    if (arquivo, funcao) in _memos_carregados or not arquivo.exists():
+        return
+    _memos_carregados.add((arquivo, funcao))
+    dados = json.loads(arquivo.read_text(encoding="utf-8"))
+    if dados.get("versao") == _versao_regras():
+        for resposta, resultado in dados["valores"].items():
+            memo.setdefault(resposta, resultado)
+
+def _salvar_memo(pasta_memo, funcao, memo):
+    arquivo = _arquivo_memo(pasta_memo, funcao)
+    arquivo.parent.mkdir(parents=True, exist_ok=True)
+    temporario = arquivo.with_suffix(".tmp")
+    dados = {"versao": _versao_regras(), "valores": memo}
+    temporario.write_text(json.dumps(dados, ensure_ascii=False), encoding="utf-8")
+    temporario.replace(arquivo)
+    _memos_carregados.add((arquivo, funcao))
+
+def normalizar_coluna(serie, funcao, pasta_memo=None):
+    """
+    Equivalente a serie.apply(funcao), mas funcao roda uma vez por resposta distinta
+    (pd.factorize + take), com memo na sessão. Com pasta_memo, as respostas em texto
+    já normalizadas pelas funções deste módulo ficam salvas para as próximas execuções.
+    """
+    codigos, unicos = pd.factorize(serie)
+    memo = _memos.setdefault(funcao, {})
+    persistir = pasta_memo is not None and funcao.__module__ == __name__
+    if persistir:
+        _carregar_memo(pasta_memo, funcao, memo)
+
+    novos = 0
+    resultados = []
+    for valor in unicos:
+        if not isinstance(valor, str):
+            resultados.append(funcao(valor))
+            continue
+        if valor not in memo:
+            memo[valor] = funcao(valor)
+            novos += 1
+        resultados.append(memo[valor])
+
+    resultado = np.empty(len(resultados) + 1, dtype=object)
+    resultado[:-1] = resultados
+    resultado = resultado[codigos]
+
+    # Nulos ficam fora do factorize: um resultado por tipo (None, NaN, NaT...)
+    nulos = codigos == -1
+    if nulos.any():
+        valores_nulos = serie[nulos]
+        tipos = pd.factorize(valores_nulos.map(type))[0]
+        primeiros = np.flatnonzero(~pd.Index(tipos).duplicated())
+        por_tipo = np.empty(len(primeiros), dtype=object)
+        por_tipo[:] = [funcao(valor) for valor in valores_nulos.iloc[primeiros]]
+        resultado[nulos] = por_tipo[tipos]
+
+    if persistir and novos:
+        _salvar_memo(pasta_memo, funcao, memo)
+    return pd.Series(resultado, index=serie.index, name=serie.name)
@@ -0,0 +1,45 @@
+# === Atualização do monitor de drift do Leadscore ===
+#
+# Lê os leads de dados/leads_leadscore.parquet e acrescenta ao monitor
+# (modelos/monitor_drift.json) só os que ele ainda não contou (por e-mail e lançamento).
+# Grava o resumo em dados/drift_leadscore.json, servido pela API em
+# /dados/drift_leadscore.json (enviado junto com os .parquet por upload_dados.py).
+#
+# Uso:
+#   python scripts/atualizar_drift.py
+
+import json
+import sys
+
+from pathlib import Path
+
+import pandas as pd
+
+# Garante que a pasta raiz esteja no sys.path
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_dir))
+base_path = root_dir
+
+from notebooks.src.leadscore_drift import (
+    atualizar_monitor_drift, carregar_monitor_drift, resumo_drift_json, salvar_monitor_drift
+)
+
+caminho_monitor = base_path / "modelos" / "monitor_drift.json"
+caminho_leads = base_path / "dados" / "leads_leadscore.parquet"
+caminho_resumo = base_path / "dados" / "drift_leadscore.json"
+
+if not caminho_monitor.exists():
+    sys.exit(f"❌ Monitor não encontrado: {caminho_monitor}. Exporte os modelos pelo notebook de leadscore.")
+
+estado = carregar_monitor_drift(caminho_monitor)
+df_leads = pd.read_parquet(caminho_leads, columns=["data", "lancamentos", "email", "leadscore_mapeado"])
+
+novos = atualizar_monitor_drift(estado, df_leads)
+salvar_monitor_drift(estado, caminho_monitor)
+
+resumo = resumo_drift_json(estado)
+caminho_resumo.write_text(json.dumps(resumo, ensure_ascii=False, indent=2), encoding="utf-8")
+
+print(f"✅ {novos} leads novos incluídos no monitor (até {estado['ultima_data']})")
+for linha in resumo["por_lancamento"]:
+    print(f"   {linha['lancamento']}: PSI {linha['psi_score']:.3f} | KS {linha['ks_score']:.3f} | {linha['situacao']}")
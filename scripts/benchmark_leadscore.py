@@ -0,0 +1,241 @@
+# === Benchmark do Leadscore ===
+#
+# Mede o tempo das tabelas, gráficos, cálculo do score e endpoints da API sobre dados
+# sintéticos (notebooks/src/dados_sinteticos.py) e acrescenta o resultado a um
+# histórico JSON, comparando com a execução anterior para acusar regressões.
+#
+# Uso:
+#   python scripts/benchmark_leadscore.py
+#   python scripts/benchmark_leadscore.py --tamanhos 10k 1M --etapas tabelas score --repeticoes 5
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+
+import matplotlib
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+
+# Garante que a pasta raiz esteja no sys.path
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_dir))
+sys.path.append(str(root_dir / "scripts"))
+base_path = root_dir
+
+from notebooks.src import leadscore_plot_app, leadscore_tabelas
+from notebooks.src.dados_sinteticos import gerar_dados_sinteticos, salvar_dados_sinteticos
+from notebooks.src.leadscore_lift import calcular_estatisticas_lift, gerar_tabelas_lift_e_score_map
+from notebooks.src.leadscore_score import calcular_leadscore, classificar_faixas, compilar_score_map
+from prerender_relatorios import BackendEstatico
+
+TAMANHOS = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000, "10M": 10_000_000}
+ETAPAS = ["tabelas", "graficos", "score", "api"]
+CAMPOS_UTM = ["utm_source", "utm_campaign", "utm_medium", "utm_content", "utm_term"]
+VARIAVEIS = ["renda", "escolaridade", "idade", "filhos", "estado_civil", "escolheu_profissao"]
+LIMIAR_REGRESSAO = 1.20
+
+
+def cronometrar(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return {"mediana_s": statistics.median(tempos), "min_s": min(tempos), "repeticoes": repeticoes}
+
+
+# === Casos por etapa ===
+
+def casos_tabelas(dados):
+    df_leads, df_alunos = dados["leads_leadscore"], dados["alunos_leadscore"]
+    tabelas_cpl = {
+        plataforma: leadscore_tabelas.preparar_tabela_cpl(dados[config["arquivo_cpl"].removesuffix(".parquet")], plataforma)
+        for plataforma, config in leadscore_tabelas.PLATAFORMAS_ANUNCIO.items()
+    }
+    casos = {
+        "gerar_tabela_faixas_leads_alunos": lambda: leadscore_tabelas.gerar_tabela_faixas_leads_alunos(df_leads, df_alunos),
+        "exibir_tabela_faixa_origem": lambda: leadscore_tabelas.exibir_tabela_faixa_origem(df_leads, df_leads, df_alunos),
+        "calcular_matriz_faixas": lambda: leadscore_tabelas.calcular_matriz_faixas(df_leads, VARIAVEIS),
+        "gerar_comparativo_faixas": lambda: leadscore_tabelas.gerar_comparativo_faixas(df_leads),
+        "gerar_tabela_estatisticas_leadscore": lambda: leadscore_tabelas.gerar_tabela_estatisticas_leadscore(df_leads),
+        "calcular_contribuicoes_leadscore": lambda: leadscore_tabelas.calcular_contribuicoes_leadscore(
+            df_leads, dados["score_map"], dados["limites"]
+        ),
+    }
+    for campo in CAMPOS_UTM:
+        casos[f"gerar_tabela_utm_personalizada[{campo}]"] = (
+            lambda campo=campo: leadscore_tabelas.gerar_tabela_utm_personalizada(df_leads, campo)
+        )
+    for plataforma in leadscore_tabelas.PLATAFORMAS_ANUNCIO:
+        casos[f"gerar_tabela_atribuicao_com_cpl[{plataforma}]"] = (
+            lambda plataforma=plataforma: leadscore_tabelas.gerar_tabela_atribuicao_com_cpl(
+                df_leads, tabelas_cpl[plataforma], plataforma
+            )
+        )
+    return casos
+
+
+def casos_graficos(dados):
+    df_leads, df_alunos, limites = dados["leads_leadscore"], dados["alunos_leadscore"], dados["limites"]
+    return {
+        "plot_entrada_leads": lambda: leadscore_plot_app.plot_entrada_leads(df_leads),
+        "plot_utm_source_por_faixa": lambda: leadscore_plot_app.plot_utm_source_por_faixa(df_leads),
+        "plot_histograma_leadscore": lambda: leadscore_plot_app.st.pyplot(leadscore_plot_app.plot_histograma_leadscore(
+            df_leads, limites["limite_a"], limites["limite_b"], limites["limite_c"], limites["limite_d"]
+        )),
+        "plot_comparativo_leads_alunos": lambda: leadscore_plot_app.plot_comparativo_leads_alunos(df_leads, df_alunos),
+        "plot_stacked_100_percent[renda]": lambda: leadscore_plot_app.plot_stacked_100_percent(df_leads, "renda"),
+    }
+
+
+def casos_score(dados):
+    df_leads, df_alunos, score_map, limites = (
+        dados["leads_leadscore"], dados["alunos_leadscore"], dados["score_map"], dados["limites"]
+    )
+    compilado = compilar_score_map(score_map)
+    estatisticas = calcular_estatisticas_lift(df_leads, df_alunos, VARIAVEIS)
+    return {
+        "calcular_leadscore": lambda: calcular_leadscore(df_leads, score_map, compilado),
+        "classificar_faixas": lambda: classificar_faixas(df_leads["leadscore_mapeado"], limites),
+        "calcular_estatisticas_lift": lambda: calcular_estatisticas_lift(df_leads, df_alunos, VARIAVEIS),
+        "gerar_tabelas_lift_e_score_map": lambda: gerar_tabelas_lift_e_score_map(estatisticas, VARIAVEIS),
+    }
+
+
+def casos_api(dados, pasta):
+    os.environ.setdefault("API_TOKEN", "benchmark")
+    # Serve a pasta com os dados sintéticos em vez de dados/ (definido antes do import,
+    # que cria a pasta; a atribuição cobre as importações anteriores, de outros tamanhos)
+    os.environ["DADOS_PATH"] = str(pasta)
+    from fastapi.testclient import TestClient
+    from api import main as api_main
+
+    api_main.base_path = Path(pasta)
+    cliente = TestClient(api_main.app)
+    cabecalho = {"Authorization": f"Bearer {api_main.API_TOKEN}"}
+    conteudo = (Path(pasta) / "leads_leadscore.parquet").read_bytes()
+
+    def baixar():
+        resposta = cliente.get("/dados/leads_leadscore.parquet", headers=cabecalho)
+        resposta.raise_for_status()
+        pd.read_parquet(BytesIO(resposta.content))
+
+    def enviar():
+        resposta = cliente.put(
+            "/dados/upload_benchmark.parquet",
+            files={"file": ("upload_benchmark.parquet", conteudo)},
+            headers=cabecalho
+        )
+        resposta.raise_for_status()
+
+    return {
+        "GET /dados/leads_leadscore.parquet (+ read_parquet)": baixar,
+        "PUT /dados/{filename}": enviar,
+        "GET /dados/inexistente.parquet (404)": lambda: cliente.get("/dados/inexistente.parquet", headers=cabecalho),
+    }
+
+
+# === Histórico ===
+
+def commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=base_path, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def comparar_com_anterior(historico, execucao):
+    """Imprime a variação de cada caso em relação à última execução com o mesmo caso e tamanho."""
+    anteriores = {}
+    for antiga in historico:
+        for r in antiga["resultados"]:
+            anteriores[(r["tamanho"], r["etapa"], r["nome"])] = r
+
+    regressoes = 0
+    for r in execucao["resultados"]:
+        anterior = anteriores.get((r["tamanho"], r["etapa"], r["nome"]))
+        if anterior is None:
+            print(f"  🆕 [{r['tamanho']}] {r['nome']}: {r['mediana_s'] * 1000:.1f} ms")
+            continue
+        razao = r["mediana_s"] / anterior["mediana_s"] if anterior["mediana_s"] else float("inf")
+        icone = "⚠️" if razao > LIMIAR_REGRESSAO else "✅"
+        regressoes += razao > LIMIAR_REGRESSAO
+        print(f"  {icone} [{r['tamanho']}] {r['nome']}: {r['mediana_s'] * 1000:.1f} ms ({razao:.2f}x)")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das tabelas, gráficos, score e API do Leadscore.")
+    parser.add_argument("--tamanhos", nargs="+", default=["10k"], choices=list(TAMANHOS), help="Quantidade de leads sintéticos")
+    parser.add_argument("--etapas", nargs="+", default=ETAPAS, choices=ETAPAS)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--historico", default=str(base_path / "benchmarks" / "historico.json"))
+    args = parser.parse_args()
+
+    caminho_historico = Path(args.historico)
+    historico = json.loads(caminho_historico.read_text(encoding="utf-8")) if caminho_historico.exists() else []
+
+    execucao = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit_atual(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "maquina": platform.platform(),
+        "cpus": os.cpu_count(),
+        "resultados": [],
+    }
+
+    with tempfile.TemporaryDirectory() as pasta:
+        backend = BackendEstatico(Path(pasta) / "saida")
+        leadscore_tabelas.st = backend
+        leadscore_plot_app.st = backend
+
+        for rotulo in args.tamanhos:
+            inicio = time.perf_counter()
+            dados = gerar_dados_sinteticos(TAMANHOS[rotulo], seed=args.seed)
+            print(f"📦 {rotulo}: {len(dados['leads_leadscore']):,} leads gerados em {time.perf_counter() - inicio:.1f}s")
+
+            if "api" in args.etapas:
+                salvar_dados_sinteticos(dados, pasta)
+
+            for etapa in args.etapas:
+                casos = {
+                    "tabelas": casos_tabelas,
+                    "graficos": casos_graficos,
+                    "score": casos_score,
+                    "api": lambda d: casos_api(d, pasta),
+                }[etapa](dados)
+
+                for nome, funcao in casos.items():
+                    medida = cronometrar(funcao, args.repeticoes)
+                    backend.partes.clear()
+                    backend.arquivos.clear()
+                    execucao["resultados"].append({"tamanho": rotulo, "etapa": etapa, "nome": nome, **medida})
+
+    print("\n📊 Resultado (mediana) x execução anterior:")
+    regressoes = comparar_com_anterior(historico, execucao)
+
+    historico.append(execucao)
+    caminho_historico.parent.mkdir(parents=True, exist_ok=True)
+    caminho_historico.write_text(json.dumps(historico, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n✅ Histórico salvo em {caminho_historico} ({len(historico)} execuções, {regressoes} possíveis regressões)")
+
+
+if __name__ == "__main__":
+    main()
@@ -44,13 +44,16 @@ from notebooks.src.leadscore_tabelas import (
     destacar_total_linha,
     top1_utms_por_leads_A,
     gerar_tabela_utm_personalizada,
-    gerar_tabela_facebook_com_cpl,
-    gerar_tabela_google_com_cpl,
+    PLATAFORMAS_ANUNCIO,
+    preparar_tabela_cpl,
+    gerar_tabela_atribuicao_com_cpl,
     gerar_tabela_estatisticas_leadscore,
     detalhar_leadscore_por_variavel,
     gerar_comparativo_faixas,
     mostrar_lift_e_calculo_individual,
-    exibir_tabela_faixa_origem
+    exibir_tabela_faixa_origem,
+    carregar_monitor_drift_atualizado,
+    mostrar_monitor_drift
 )
 
 # === Configuração Inicial do Streamlit ===
@@ -102,8 +105,12 @@ try:
 
     df_leads = carregar_parquet_com_fallback("leads_leadscore.parquet")
     df_alunos = carregar_parquet_com_fallback("alunos_leadscore.parquet")
-    df_cpl_face = carregar_parquet_com_fallback("invest_trafego_face.parquet")
-    df_cpl_google = carregar_parquet_com_fallback("invest_trafego_google.parquet")
+
+    # Tabelas de CPL por plataforma, já normalizadas e indexadas pela chave de junção
+    tabelas_cpl = {
+        plataforma: preparar_tabela_cpl(carregar_parquet_com_fallback(config["arquivo_cpl"]), plataforma)
+        for plataforma, config in PLATAFORMAS_ANUNCIO.items()
+    }
     
     df_leads['data'] = pd.to_datetime(df_leads['data'], errors='coerce')
 
@@ -163,9 +170,11 @@ try:
         texto = f.read().strip()
         dt = datetime.strptime(texto, "%Y-%m-%d %H:%M:%S")
         data_atualizacao_formatada = dt.strftime("%d/%m/%Y %H:%M")
+        versao_dados = texto
 except Exception as e:
     logger.warning("Erro ao ler data de atualização")
     data_atualizacao_formatada = "Desconhecida"
+    versao_dados = None
     st.error(f"[ERRO ao ler data de atualização]: {e}")
 
 logger.info("Interface Streamlit carregada com sucesso")
@@ -264,18 +273,13 @@ with aba1:
     st.markdown("---")
     st.markdown("### Análises de Criativos e Campanhas no Google")
     
-    col1, col2 = st.columns(2)
-    with col1:
-        st.markdown("#### Facebook Ads")
-        tabela_face = gerar_tabela_facebook_com_cpl(df_filtrado, df_cpl_face)
-        tabela_face = tabela_face.sort_values(by="total leads", ascending=False)
-        st.dataframe(tabela_face, use_container_width=True, hide_index=True)
-    
-    with col2:
-        st.markdown("#### Google Ads")
-        tabela_google = gerar_tabela_google_com_cpl(df_filtrado, df_cpl_google)
-        tabela_google = tabela_google.sort_values(by="total leads", ascending=False)
-        st.dataframe(tabela_google, use_container_width=True, hide_index=True)
+    colunas_plataformas = st.columns(len(PLATAFORMAS_ANUNCIO))
+    for coluna, (plataforma, config) in zip(colunas_plataformas, PLATAFORMAS_ANUNCIO.items()):
+        with coluna:
+            st.markdown(f"#### {config['titulo']}")
+            tabela_plataforma = gerar_tabela_atribuicao_com_cpl(df_filtrado, tabelas_cpl[plataforma], plataforma)
+            tabela_plataforma = tabela_plataforma.sort_values(by="total leads", ascending=False)
+            st.dataframe(tabela_plataforma, use_container_width=True, hide_index=True)
 
     st.markdown("---")
     st.markdown("### 🔍 Análises por UTM's")
@@ -387,7 +391,7 @@ with aba2:
     """)
     st.write("")
         
-    mostrar_lift_e_calculo_individual(tabelas_lift, df_leads, score_map, limites)
+    mostrar_lift_e_calculo_individual(tabelas_lift, df_leads, score_map, limites, versao_dados=versao_dados)
     
     st.markdown("---")
     st.markdown("### Distribuição Percentual das Categorias por Faixa de Leadscore")
@@ -401,4 +405,19 @@ with aba2:
     
     plot_stacked_100_percent(df_leads, variavel_selecionada)
 
-    gerar_comparativo_faixas(df_leads)
\ No newline at end of file
+    gerar_comparativo_faixas(df_leads, versao_dados=versao_dados)
+
+    st.markdown("---")
+    st.markdown("### Monitoramento de Drift do Leadscore")
+    st.markdown("**Compara a distribuição do `leadscore_mapeado` e das faixas de cada lançamento (ou dia) com os leads usados no treino (PSI e KS).**")
+
+    caminho_monitor = base_path / "modelos" / "monitor_drift.json"
+    if not caminho_monitor.exists():
+        st.info("Monitor de drift ainda não criado. Exporte os modelos pelo notebook de leadscore.")
+    else:
+        try:
+            estado_drift = carregar_monitor_drift_atualizado(str(caminho_monitor), df_leads, versao_dados)
+            mostrar_monitor_drift(estado_drift)
+        except Exception as e:
+            logger.exception("Erro ao carregar monitor de drift")
+            st.error(f"Erro ao carregar monitor de drift: {e}")
\ No newline at end of file
@@ -0,0 +1,333 @@
+# === Pipeline de atualização do Leadscore ===
+#
+# Executa as etapas trat_leads_antigos → entrada_leads → trat_leads_novos → leadscore →
+# drift → upload (e a pré-renderização dos relatórios) na ordem dada pelas entradas e
+# saídas que cada etapa declara. Uma etapa só roda se o hash das suas entradas (e do seu
+# código) mudou desde a última execução bem-sucedida ou se alguma saída não existe;
+# etapas que dependem de fontes externas (API do ActiveCampaign, Google Sheets) rodam
+# sempre, mas as seguintes só rodam se os arquivos que elas geraram mudaram de fato.
+# Etapas independentes rodam em paralelo. Os notebooks são executados com
+# jupyter nbconvert (nbconvert e ipykernel estão no requirements.txt).
+#
+# Uso:
+#   python scripts/pipeline.py
+#   python scripts/pipeline.py --simular
+#   python scripts/pipeline.py --etapas leadscore upload_dados --forcar
+
+import argparse
+import hashlib
+import json
+import logging
+import subprocess
+import sys
+import time
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+# Garante que a pasta raiz esteja no sys.path
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_dir))
+base_path = root_dir
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    stream=sys.stdout
+)
+logger = logging.getLogger(__name__)
+
+FORMATO_ESTADO = 1
+MODULOS_NOTEBOOKS = "notebooks/src/*.py"  # código compartilhado pelos notebooks
+
+# Caminhos relativos à raiz do projeto. "externa": lê fontes fora do projeto (roda sempre).
+ETAPAS = [
+    {
+        "nome": "trat_leads_antigos",
+        "notebook": "notebooks/trat_leads_antigos.ipynb",
+        "entradas": [
+            "dados/RESPOSTAS PESQUISA L28^0L29^0L30.csv",
+            "dados/COMPRADORES L28,L29 E L30.csv",
+            "dados/LISTA LEADS UTM L28,L29 E L30.csv",
+            "dados/lista alunos dez-24 a atual.xlsx",
+            "dados/LISTA DE CADASTRO L31 - L32 - L33  COM UTM.xlsx",
+            "dados/RESPOSTAS PESQUISAS ELEMENTOR E FORMS - COM DATA.xlsx",
+        ],
+        "saidas": ["dados/leads_antigos.parquet", "dados/alunos_antigos.parquet"],
+    },
+    {
+        "nome": "entrada_leads",
+        "notebook": "notebooks/entrada_leads.ipynb",
+        "entradas": ["dados/elementor-submissions.csv"],
+        "saidas": ["dados/leads_l34.parquet"],
+        "externa": True,
+    },
+    {
+        "nome": "trat_leads_novos",
+        "notebook": "notebooks/trat_leads_novos.ipynb",
+        "entradas": ["dados/leads_antigos.parquet", "dados/alunos_antigos.parquet", "dados/leads_l34.parquet"],
+        "saidas": [
+            "dados/leads.parquet", "dados/alunos.parquet", "dados/invest_face.parquet", "dados/invest_google.parquet",
+            "dados/invest_trafego_face.parquet", "dados/invest_trafego_google.parquet",
+        ],
+        "externa": True,
+    },
+    {
+        "nome": "leadscore",
+        "notebook": "notebooks/leadscore.ipynb",
+        "entradas": ["dados/leads.parquet", "dados/alunos.parquet", "dados/invest_face.parquet", "dados/invest_google.parquet"],
+        "saidas": [
+            "dados/leads_leadscore.parquet", "dados/alunos_leadscore.parquet",
+            "modelos/modelo_regressao_leadscore_total.pkl", "modelos/modelo_conversao_calibrado.pkl",
+            "modelos/limites_faixa.pkl", "modelos/score_map.pkl", "modelos/tabelas_lift.pkl",
+            "modelos/monitor_drift.json",
+        ],
+    },
+    {
+        "nome": "atualizar_drift",
+        "script": "scripts/atualizar_drift.py",
+        "entradas": ["dados/leads_leadscore.parquet", "modelos/monitor_drift.json"],
+        "saidas": ["dados/drift_leadscore.json"],
+    },
+    {
+        "nome": "prerender_relatorios",
+        "script": "scripts/prerender_relatorios.py",
+        "entradas": [
+            "dados/leads_leadscore.parquet", "dados/alunos_leadscore.parquet",
+            "dados/invest_trafego_face.parquet", "dados/invest_trafego_google.parquet", "modelos/limites_faixa.pkl",
+        ],
+        "saidas": ["relatorios/manifest.json"],
+    },
+    {
+        "nome": "upload_dados",
+        "script": "scripts/upload_dados.py",
+        "entradas": [
+            "dados/leads_leadscore.parquet", "dados/alunos_leadscore.parquet",
+            "dados/invest_trafego_face.parquet", "dados/invest_trafego_google.parquet", "dados/drift_leadscore.json",
+        ],
+        "saidas": [],
+    },
+]
+
+
+# === Grafo das etapas ===
+
+def montar_dependencias(etapas):
+    """{etapa: etapas que produzem alguma das suas entradas}; erro se uma saída tiver dois produtores ou houver ciclo."""
+    produtor = {}
+    for etapa in etapas:
+        for saida in etapa["saidas"]:
+            if saida in produtor:
+                raise ValueError(f"❌ {saida} é saída de {produtor[saida]} e de {etapa['nome']}")
+            produtor[saida] = etapa["nome"]
+
+    dependencias = {
+        etapa["nome"]: {produtor[e] for e in etapa["entradas"] if e in produtor and produtor[e] != etapa["nome"]}
+        for etapa in etapas
+    }
+
+    visitando, concluidas = set(), set()
+    def visitar(nome):
+        if nome in concluidas:
+            return
+        if nome in visitando:
+            raise ValueError(f"❌ Ciclo entre as etapas envolvendo {nome}")
+        visitando.add(nome)
+        for dependencia in dependencias[nome]:
+            visitar(dependencia)
+        visitando.discard(nome)
+        concluidas.add(nome)
+    for nome in dependencias:
+        visitar(nome)
+    return dependencias
+
+def _com_dependencias(nomes, dependencias):
+    selecionadas, pendentes = set(), list(nomes)
+    while pendentes:
+        nome = pendentes.pop()
+        if nome not in selecionadas:
+            selecionadas.add(nome)
+            pendentes.extend(dependencias[nome])
+    return selecionadas
+
+
+# === Hashes ===
+
+def hash_arquivo(caminho, cache):
+    """sha256 do arquivo; reaproveita o valor do cache quando tamanho e mtime não mudaram."""
+    info = caminho.stat()
+    chave = str(caminho)
+    anterior = cache.get(chave)
+    if anterior and anterior["tamanho"] == info.st_size and anterior["mtime_ns"] == info.st_mtime_ns:
+        return anterior["sha256"]
+
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            sha.update(bloco)
+    cache[chave] = {"tamanho": info.st_size, "mtime_ns": info.st_mtime_ns, "sha256": sha.hexdigest()}
+    return cache[chave]["sha256"]
+
+def _arquivos_codigo(etapa, raiz):
+    """O notebook ou script da etapa e os módulos de notebooks/src (os scripts também os importam)."""
+    return [raiz / (etapa.get("notebook") or etapa["script"])] + sorted(raiz.glob(MODULOS_NOTEBOOKS))
+
+def assinatura_etapa(etapa, raiz, cache):
+    """Hash das entradas e do código da etapa (entradas ausentes entram como ausentes)."""
+    sha = hashlib.sha256()
+    for caminho in [raiz / e for e in etapa["entradas"]] + _arquivos_codigo(etapa, raiz):
+        sha.update(str(caminho.relative_to(raiz)).encode("utf-8"))
+        sha.update(hash_arquivo(caminho, cache).encode() if caminho.exists() else b"ausente")
+    return sha.hexdigest()[:16]
+
+
+# === Estado ===
+
+def carregar_estado(caminho):
+    caminho = Path(caminho)
+    if caminho.exists():
+        estado = json.loads(caminho.read_text(encoding="utf-8"))
+        if estado.get("formato_versao") == FORMATO_ESTADO:
+            return estado
+        logger.warning("⚠️ Estado do pipeline em formato antigo: todas as etapas serão refeitas.")
+    return {"formato_versao": FORMATO_ESTADO, "etapas": {}, "hashes": {}}
+
+def salvar_estado(estado, caminho):
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    temporario = caminho.with_suffix(".tmp")
+    temporario.write_text(json.dumps(estado, ensure_ascii=False, indent=2), encoding="utf-8")
+    temporario.replace(caminho)
+
+
+# === Execução ===
+
+def _comando(etapa, raiz, pasta_execucoes):
+    if "script" in etapa:
+        return [sys.executable, str(raiz / etapa["script"])], raiz
+    notebook = raiz / etapa["notebook"]
+    # Executa numa cópia em pasta_execucoes; o kernel roda na pasta do notebook (os caminhos são relativos a ela)
+    return [
+        sys.executable, "-m", "jupyter", "nbconvert", "--to", "notebook", "--execute", str(notebook),
+        "--output-dir", str(pasta_execucoes), "--ExecutePreprocessor.timeout=-1",
+    ], notebook.parent
+
+def executar_etapa(etapa, raiz, pasta_execucoes):
+    """Roda a etapa em um subprocesso; o log completo fica em pasta_execucoes/<etapa>.log."""
+    pasta_execucoes.mkdir(parents=True, exist_ok=True)
+    comando, pasta = _comando(etapa, raiz, pasta_execucoes)
+    inicio = time.time()
+    with open(pasta_execucoes / f"{etapa['nome']}.log", "w", encoding="utf-8") as log:
+        resultado = subprocess.run(comando, cwd=pasta, stdout=log, stderr=subprocess.STDOUT)
+    return resultado.returncode, round(time.time() - inicio, 2)
+
+def _motivo_execucao(etapa, raiz, estado, assinatura, forcar):
+    if forcar:
+        return "forçada"
+    if etapa.get("externa"):
+        return "fonte externa"
+    faltando = [s for s in etapa["saidas"] if not (raiz / s).exists()]
+    if faltando:
+        return f"saída ausente ({faltando[0]})"
+    if estado["etapas"].get(etapa["nome"], {}).get("assinatura") != assinatura:
+        return "entradas alteradas"
+    return None
+
+def executar_pipeline(etapas, raiz, caminho_estado, pasta_execucoes, somente=None, forcar=False, paralelo=2, simular=False):
+    """
+    Roda as etapas necessárias respeitando as dependências. `somente` restringe às etapas
+    indicadas e às que elas dependem; `forcar` refaz as etapas selecionadas mesmo sem mudança.
+    Retorna {etapa: situação} (executada, pulada, falhou, bloqueada).
+    """
+    raiz = Path(raiz)
+    por_nome = {etapa["nome"]: etapa for etapa in etapas}
+    dependencias = montar_dependencias(etapas)
+    selecionadas = _com_dependencias(somente, dependencias) if somente else set(por_nome)
+    estado = carregar_estado(caminho_estado)
+    situacao = {}
+
+    def decidir(nome):
+        """Decide (ao ficar pronta) se a etapa roda; a assinatura já considera as saídas novas das anteriores."""
+        etapa = por_nome[nome]
+        assinatura = assinatura_etapa(etapa, raiz, estado["hashes"])
+        motivo = _motivo_execucao(etapa, raiz, estado, assinatura, forcar and (not somente or nome in somente))
+        if motivo is None:
+            logger.info(f"⏭️ {nome}: sem mudanças nas entradas")
+            situacao[nome] = "pulada"
+        return motivo
+
+    pendentes = [n for n in por_nome if n in selecionadas]
+    em_execucao = {}
+    with ThreadPoolExecutor(max_workers=max(1, paralelo)) as executor:
+        while pendentes or em_execucao:
+            for nome in list(pendentes):
+                deps = dependencias[nome] & selecionadas
+                falhas = sorted(d for d in deps if situacao.get(d) in ("falhou", "bloqueada"))
+                if falhas:
+                    logger.error(f"⛔ {nome}: bloqueada por falha em {falhas}")
+                    situacao[nome] = "bloqueada"
+                    pendentes.remove(nome)
+                elif all(d in situacao for d in deps):
+                    pendentes.remove(nome)
+                    simuladas = sorted(d for d in deps if situacao[d] == "simulada")
+                    motivo = f"depois de {', '.join(simuladas)}" if simuladas else decidir(nome)
+                    if motivo is None:
+                        continue
+                    if simular:
+                        logger.info(f"📝 {nome}: rodaria ({motivo})")
+                        situacao[nome] = "simulada"
+                        continue
+                    logger.info(f"▶️ {nome}: {motivo}")
+                    em_execucao[executor.submit(executar_etapa, por_nome[nome], raiz, Path(pasta_execucoes))] = nome
+
+            if not em_execucao:
+                continue
+            concluidos, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                nome = em_execucao.pop(futuro)
+                codigo, duracao = futuro.result()
+                if codigo != 0:
+                    logger.error(f"❌ {nome}: falhou (código {codigo}) em {duracao:.1f}s — veja {Path(pasta_execucoes) / (nome + '.log')}")
+                    situacao[nome] = "falhou"
+                    continue
+                # Assinatura registrada depois da execução: entradas que a própria etapa altera não a invalidam
+                estado["etapas"][nome] = {
+                    "assinatura": assinatura_etapa(por_nome[nome], raiz, estado["hashes"]),
+                    "executada_em": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "duracao_s": duracao,
+                }
+                salvar_estado(estado, caminho_estado)
+                situacao[nome] = "executada"
+                logger.info(f"✅ {nome}: concluída em {duracao:.1f}s")
+
+    if not simular:
+        salvar_estado(estado, caminho_estado)
+    return situacao
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa as etapas do Leadscore que foram afetadas por dados novos.")
+    parser.add_argument("--etapas", nargs="*", choices=[etapa["nome"] for etapa in ETAPAS],
+                        help="Executa só estas etapas (e as que elas dependem)")
+    parser.add_argument("--forcar", action="store_true", help="Refaz as etapas mesmo sem mudança nas entradas")
+    parser.add_argument("--paralelo", type=int, default=2, help="Número de etapas independentes em paralelo")
+    parser.add_argument("--simular", action="store_true", help="Só mostra o que seria executado")
+    parser.add_argument("--estado", default=str(base_path / "dados" / "pipeline_estado.json"), help="Arquivo de estado")
+    parser.add_argument("--execucoes", default=str(base_path / "relatorios" / "execucoes"),
+                        help="Pasta dos notebooks executados e dos logs")
+    args = parser.parse_args()
+
+    inicio = time.time()
+    situacao = executar_pipeline(
+        ETAPAS, base_path, args.estado, args.execucoes,
+        somente=args.etapas, forcar=args.forcar, paralelo=args.paralelo, simular=args.simular
+    )
+    resumo = ", ".join(f"{nome}: {s}" for nome, s in situacao.items())
+    logger.info(f"🏁 Pipeline finalizado em {time.time() - inicio:.1f}s — {resumo}")
+    if any(s in ("falhou", "bloqueada") for s in situacao.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
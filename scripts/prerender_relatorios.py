@@ -0,0 +1,390 @@
+# === Pré-renderização estática dos relatórios do Leadscore ===
+#
+# Gera, para cada lançamento (e para "Todos"), as mesmas tabelas e gráficos do painel
+# Streamlit em HTML/PNG estáticos, usando um backend que substitui o `st` dos módulos
+# de tabelas e gráficos. Os lançamentos são renderizados em paralelo (um processo por
+# lançamento) e o resultado é descrito em um manifest.json.
+#
+# Uso:
+#   python scripts/prerender_relatorios.py
+#   python scripts/prerender_relatorios.py --saida relatorios --processos 4 --forcar
+
+import argparse
+import hashlib
+import html
+import json
+import logging
+import os
+import re
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+import matplotlib
+matplotlib.use("Agg")
+
+import joblib
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from pandas.io.formats.style import Styler
+
+# Garante que a pasta raiz esteja no sys.path
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_dir))
+base_path = root_dir
+
+from notebooks.src import leadscore_plot_app, leadscore_tabelas
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    stream=sys.stdout
+)
+logger = logging.getLogger(__name__)
+
+ORDEM_LANCAMENTOS = ["L28", "L29", "L30", "L31", "L32", "L33", "L34"]
+ARQUIVOS_DADOS = ["leads_leadscore.parquet", "alunos_leadscore.parquet"] + [
+    config["arquivo_cpl"] for config in leadscore_tabelas.PLATAFORMAS_ANUNCIO.values()
+]
+VARIAVEIS_LEADSCORE = ["renda", "escolaridade", "idade", "filhos", "estado_civil", "escolheu_profissao"]
+CAMPOS_UTM = ["utm_source", "utm_campaign", "utm_medium", "utm_content", "utm_term"]
+
+ESTILO_HTML = """
+body { background: #0e1117; color: #fafafa; font-family: sans-serif; margin: 2rem; }
+table { border-collapse: collapse; font-size: 13px; margin: 0.5rem 0 1.5rem 0; }
+th, td { border: 1px solid #31333f; padding: 4px 8px; text-align: right; }
+th { background: #262730; }
+img { max-width: 100%; margin: 0.5rem 0 1.5rem 0; }
+a { color: #8ab4f8; }
+.aviso { color: #f0ad4e; }
+.erro { color: #ff6b6b; }
+.legenda { color: #a3a8b8; font-size: 13px; }
+"""
+
+
+class RelatorioInterrompido(Exception):
+    """Levantada quando um builder chama st.stop()."""
+
+
+class BackendEstatico:
+    """
+    Substituto do módulo `streamlit` para os builders de tabelas e gráficos:
+    textos e tabelas viram HTML e figuras viram PNG salvos na pasta do relatório.
+    Widgets devolvem a resposta configurada para o rótulo ou o valor padrão.
+    """
+
+    def __init__(self, pasta, respostas=None):
+        self.pasta = Path(pasta)
+        self.pasta.mkdir(parents=True, exist_ok=True)
+        self.respostas = respostas or {}
+        self.partes = []
+        self.arquivos = []
+
+    # --- Layout ---
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def columns(self, spec, **kwargs):
+        quantidade = spec if isinstance(spec, int) else len(spec)
+        return [self] * quantidade
+
+    def tabs(self, nomes):
+        return [self] * len(nomes)
+
+    # --- Texto ---
+    def title(self, texto, **kwargs):
+        self.partes.append(f"<h1>{html.escape(str(texto))}</h1>")
+
+    def subheader(self, texto, **kwargs):
+        self.partes.append(f"<h3>{html.escape(str(texto))}</h3>")
+
+    def markdown(self, texto, unsafe_allow_html=False, **kwargs):
+        self.partes.append(texto if unsafe_allow_html else _markdown_para_html(texto))
+
+    def caption(self, texto, **kwargs):
+        self.partes.append(f"<p class='legenda'>{html.escape(str(texto))}</p>")
+
+    def warning(self, texto, **kwargs):
+        self.partes.append(f"<p class='aviso'>{html.escape(str(texto))}</p>")
+
+    info = warning
+    success = caption
+
+    def error(self, texto, **kwargs):
+        self.partes.append(f"<p class='erro'>{html.escape(str(texto))}</p>")
+
+    def write(self, obj, **kwargs):
+        if isinstance(obj, (pd.DataFrame, Styler)):
+            self.dataframe(obj)
+        elif str(obj).strip():
+            self.markdown(str(obj))
+
+    # --- Widgets ---
+    def selectbox(self, label, options, index=0, **kwargs):
+        opcoes = list(options)
+        if label in self.respostas:
+            return self.respostas[label]
+        return opcoes[index] if opcoes else None
+
+    def number_input(self, label, min_value=None, max_value=None, value=0, **kwargs):
+        return self.respostas.get(label, value)
+
+    def text_input(self, label, value="", **kwargs):
+        return self.respostas.get(label, value)
+
+    def date_input(self, label, value=None, **kwargs):
+        return self.respostas.get(label, value)
+
+    # --- Saídas ---
+    def dataframe(self, dados, hide_index=False, **kwargs):
+        if isinstance(dados, Styler):
+            self.partes.append(dados.to_html())
+        else:
+            self.partes.append(dados.to_html(index=not hide_index, border=0, na_rep="-"))
+
+    table = dataframe
+
+    def pyplot(self, fig=None, **kwargs):
+        fig = fig if fig is not None else plt.gcf()
+        nome = f"figura_{len(self.arquivos) + 1:02d}.png"
+        fig.savefig(self.pasta / nome, dpi=100, bbox_inches="tight", facecolor=fig.get_facecolor())
+        plt.close(fig)
+        self.arquivos.append(nome)
+        self.partes.append(f"<img src='{nome}' alt='{nome}'>")
+
+    def stop(self):
+        raise RelatorioInterrompido()
+
+    def cache_data(self, func=None, **kwargs):
+        return func if func is not None else (lambda f: f)
+
+    def salvar(self, titulo):
+        conteudo = (
+            "<!DOCTYPE html><html lang='pt-BR'><head><meta charset='utf-8'>"
+            f"<title>{html.escape(titulo)}</title><style>{ESTILO_HTML}</style></head>"
+            "<body>" + "\n".join(self.partes) + "</body></html>"
+        )
+        (self.pasta / "index.html").write_text(conteudo, encoding="utf-8")
+        return ["index.html"] + self.arquivos
+
+
+def _markdown_para_html(texto):
+    linhas = []
+    for linha in str(texto).strip().splitlines():
+        linha = linha.strip()
+        if not linha:
+            continue
+        if linha == "---":
+            linhas.append("<hr>")
+            continue
+        nivel = len(linha) - len(linha.lstrip("#"))
+        conteudo = html.escape(linha.lstrip("#").strip())
+        conteudo = re.sub(r"\*\*(.+?)\*\*", r"<b>\1</b>", conteudo)
+        conteudo = re.sub(r"`(.+?)`", r"<code>\1</code>", conteudo)
+        linhas.append(f"<h{nivel}>{conteudo}</h{nivel}>" if 0 < nivel <= 6 else f"<p>{conteudo}</p>")
+    return "\n".join(linhas)
+
+
+def calcular_versao_dados(dados_dir, config_dir):
+    """Hash do conteúdo dos parquets de entrada + data de atualização do painel."""
+    sha = hashlib.sha256()
+    for nome in ARQUIVOS_DADOS:
+        caminho = Path(dados_dir) / nome
+        sha.update(nome.encode())
+        if caminho.exists():
+            with open(caminho, "rb") as f:
+                for bloco in iter(lambda: f.read(1 << 20), b""):
+                    sha.update(bloco)
+    atualizacao = Path(config_dir) / "ultima_atualizacao.txt"
+    if atualizacao.exists():
+        sha.update(atualizacao.read_bytes().strip())
+    return sha.hexdigest()[:16]
+
+
+def _nome_pasta(lancamento):
+    return re.sub(r"[^\w-]", "_", str(lancamento))
+
+
+# === Estado de cada processo do pool ===
+_DADOS = {}
+
+
+def _inicializar_worker(dados_dir, modelos_dir, saida):
+    _DADOS["df_leads"] = pd.read_parquet(Path(dados_dir) / "leads_leadscore.parquet")
+    _DADOS["df_alunos"] = pd.read_parquet(Path(dados_dir) / "alunos_leadscore.parquet")
+    _DADOS["df_leads"]["data"] = pd.to_datetime(_DADOS["df_leads"]["data"], errors="coerce")
+    _DADOS["tabelas_cpl"] = {
+        plataforma: leadscore_tabelas.preparar_tabela_cpl(pd.read_parquet(Path(dados_dir) / config["arquivo_cpl"]), plataforma)
+        for plataforma, config in leadscore_tabelas.PLATAFORMAS_ANUNCIO.items()
+    }
+    _DADOS["limites"] = joblib.load(Path(modelos_dir) / "limites_faixa.pkl")
+    _DADOS["saida"] = Path(saida)
+
+
+def _secao(backend, titulo, builder, *args, **kwargs):
+    backend.markdown("---")
+    if titulo:
+        backend.subheader(titulo)
+    try:
+        return builder(*args, **kwargs)
+    except RelatorioInterrompido:
+        return None
+    except Exception as e:
+        logger.exception(f"Erro ao renderizar '{titulo or builder.__name__}'")
+        backend.error(f"Erro ao renderizar esta seção: {e}")
+        return None
+
+
+def renderizar_lancamento(lancamento):
+    inicio = time.time()
+    df_leads = _DADOS["df_leads"]
+    df_alunos = _DADOS["df_alunos"]
+    limites = _DADOS["limites"]
+
+    pasta = _DADOS["saida"] / _nome_pasta(lancamento)
+    backend = BackendEstatico(pasta, respostas={
+        "Selecione o Lançamento:": lancamento,
+        "Selecione a Faixa:": "Todos",
+    })
+    leadscore_tabelas.st = backend
+    leadscore_plot_app.st = backend
+
+    if lancamento == "Todos":
+        df_filtrado = df_leads.copy()
+        df_alunos_filtrado = df_alunos.copy()
+    else:
+        df_filtrado = df_leads[df_leads["lancamentos"] == lancamento].copy()
+        df_alunos_filtrado = df_alunos[df_alunos["lancamentos"] == lancamento].copy()
+
+    backend.title(f"📈 Leadscore QG Concursos — {lancamento}")
+    backend.caption(f"Gerado em {datetime.now().strftime('%d/%m/%Y %H:%M')} | {len(df_filtrado):,} leads".replace(",", "."))
+
+    # === Visão do lançamento (Aba 1) ===
+    resultado = _secao(backend, "Entrada de Leads", leadscore_plot_app.plot_entrada_leads, df_filtrado)
+    if resultado is not None:
+        df_filtrado = resultado
+
+    backend.markdown("---")
+    backend.dataframe(
+        leadscore_tabelas.gerar_tabela_faixas_leads_alunos(df_filtrado, df_alunos_filtrado),
+        hide_index=True
+    )
+    _secao(backend, None, leadscore_tabelas.exibir_tabela_faixa_origem, df_filtrado, df_leads.copy(), df_alunos.copy())
+    _secao(backend, "Análise Detalhada de Conversão - UTM's", leadscore_plot_app.plot_utm_source_por_faixa, df_filtrado)
+
+    for plataforma, config in leadscore_tabelas.PLATAFORMAS_ANUNCIO.items():
+        tabela = _secao(
+            backend, config["titulo"], leadscore_tabelas.gerar_tabela_atribuicao_com_cpl,
+            df_filtrado, _DADOS["tabelas_cpl"][plataforma], plataforma
+        )
+        if tabela is not None:
+            backend.dataframe(tabela.sort_values(by="total leads", ascending=False), hide_index=True)
+
+    for campo in CAMPOS_UTM:
+        tabela = _secao(backend, f"🔹 Campo: {campo}", leadscore_tabelas.gerar_tabela_utm_personalizada, df_filtrado, campo)
+        if tabela is None:
+            backend.info(f"Nenhum dado disponível para {campo}.")
+        else:
+            backend.dataframe(tabela)
+
+    # === Como calculamos (Aba 2), restrito ao lançamento ===
+    if "leadscore_mapeado" in df_filtrado.columns and not df_filtrado.empty:
+        _secao(backend, None, leadscore_tabelas.gerar_tabela_estatisticas_leadscore, df_filtrado)
+        fig = _secao(
+            backend, "Distribuição das Faixas no Leadscore", leadscore_plot_app.plot_histograma_leadscore, df_filtrado,
+            limite_a=limites["limite_a"], limite_b=limites["limite_b"],
+            limite_c=limites["limite_c"], limite_d=limites["limite_d"]
+        )
+        if fig is not None:
+            backend.pyplot(fig)
+
+    _secao(backend, "Comparativo das Faixas entre Leads x Alunos", leadscore_plot_app.plot_comparativo_leads_alunos, df_leads, df_alunos)
+
+    for variavel in VARIAVEIS_LEADSCORE:
+        _secao(backend, None, leadscore_plot_app.plot_stacked_100_percent, df_filtrado, variavel)
+
+    _secao(backend, None, leadscore_tabelas.gerar_comparativo_faixas, df_filtrado)
+
+    arquivos = backend.salvar(f"Leadscore — {lancamento}")
+    return lancamento, {
+        "pasta": pasta.name,
+        "arquivos": arquivos,
+        "leads": int(len(df_filtrado)),
+        "duracao_s": round(time.time() - inicio, 2),
+    }
+
+
+def salvar_indice(saida, manifest):
+    links = "\n".join(
+        f"<li><a href='{info['pasta']}/index.html'>{html.escape(lancamento)}</a> ({info['leads']:,} leads)</li>".replace(",", ".")
+        for lancamento, info in manifest["lancamentos"].items()
+    )
+    conteudo = (
+        "<!DOCTYPE html><html lang='pt-BR'><head><meta charset='utf-8'>"
+        f"<title>Leadscore QG Concursos</title><style>{ESTILO_HTML}</style></head><body>"
+        "<h1>📈 Leadscore QG Concursos</h1>"
+        f"<p class='legenda'>Versão dos dados: {manifest['versao_dados']} | Gerado em {manifest['gerado_em']}</p>"
+        f"<ul>{links}</ul></body></html>"
+    )
+    (Path(saida) / "index.html").write_text(conteudo, encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pré-renderiza os relatórios estáticos do Leadscore por lançamento.")
+    parser.add_argument("--dados", default=str(base_path / "dados"), help="Pasta com os arquivos .parquet")
+    parser.add_argument("--modelos", default=str(base_path / "modelos"), help="Pasta com os arquivos .pkl")
+    parser.add_argument("--saida", default=str(base_path / "relatorios"), help="Pasta de saída do bundle")
+    parser.add_argument("--processos", type=int, default=os.cpu_count(), help="Número de processos em paralelo")
+    parser.add_argument("--forcar", action="store_true", help="Regenera mesmo se a versão dos dados não mudou")
+    args = parser.parse_args()
+
+    saida = Path(args.saida)
+    saida.mkdir(parents=True, exist_ok=True)
+    caminho_manifest = saida / "manifest.json"
+
+    versao_dados = calcular_versao_dados(args.dados, base_path / "config")
+    if caminho_manifest.exists() and not args.forcar:
+        manifest_anterior = json.loads(caminho_manifest.read_text(encoding="utf-8"))
+        if manifest_anterior.get("versao_dados") == versao_dados:
+            logger.info(f"✅ Relatórios já estão na versão {versao_dados}. Nada a fazer.")
+            return
+
+    df_lancamentos = pd.read_parquet(Path(args.dados) / "leads_leadscore.parquet", columns=["lancamentos"])
+    existentes = set(df_lancamentos["lancamentos"].dropna().unique())
+    lancamentos = [l for l in ORDEM_LANCAMENTOS if l in existentes]
+    lancamentos += sorted(existentes - set(ORDEM_LANCAMENTOS)) + ["Todos"]
+
+    logger.info(f"📦 Renderizando {len(lancamentos)} relatórios com {args.processos} processos...")
+    inicio = time.time()
+    resultados = {}
+    with ProcessPoolExecutor(
+        max_workers=args.processos,
+        initializer=_inicializar_worker,
+        initargs=(args.dados, args.modelos, str(saida))
+    ) as executor:
+        futuros = [executor.submit(renderizar_lancamento, lancamento) for lancamento in lancamentos]
+        for futuro in as_completed(futuros):
+            lancamento, info = futuro.result()
+            resultados[lancamento] = info
+            logger.info(f"🖼️ {lancamento}: {len(info['arquivos'])} arquivos em {info['duracao_s']:.2f}s")
+
+    manifest = {
+        "versao_dados": versao_dados,
+        "gerado_em": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "duracao_s": round(time.time() - inicio, 2),
+        "lancamentos": {lancamento: resultados[lancamento] for lancamento in lancamentos},
+    }
+    caminho_manifest.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    salvar_indice(saida, manifest)
+    logger.info(f"✅ Bundle salvo em {saida} ({manifest['duracao_s']:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -38,4 +38,5 @@ def upload_parquet(nome_arquivo):
 upload_parquet("leads_leadscore.parquet")
 upload_parquet("alunos_leadscore.parquet")
 upload_parquet("invest_trafego_face.parquet")
-upload_parquet("invest_trafego_google.parquet")
\ No newline at end of file
+upload_parquet("invest_trafego_google.parquet")
+upload_parquet("drift_leadscore.json")